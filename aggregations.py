@@ -1,7 +1,18 @@
+from __future__ import annotations
+
+import hashlib
+import math
+from abc import ABC, abstractmethod
 import statistics
-from typing import List, Any, Dict, Tuple
-from operator import itemgetter
+import sys
+from typing import List, Any, Dict, Iterable, Optional, Sequence, TextIO, Tuple, Union
 from collections import Counter
+from collections.abc import Mapping
+
+from lazy import lazy_module
+from result_cache import memoized
+
+np = lazy_module("numpy")
 
 
 def mean(values: List[Any]) -> float:
@@ -20,16 +31,365 @@ def count(data: List[Any]) -> int:
     return len(data)
 
 
-def unique_count(data: List[Dict]) -> int:
-    """кол-во уникальных элементов"""
-    if not data or not isinstance(data[0], dict):
-        return len(set(data)) if data else 0
+# числа помечаются типом: 1, 1.0 и True равны в Python, но это разные
+# значения записи. строки и None однозначны и остаются как есть
+_NUMBER_TYPES = frozenset((int, float, bool))
+# типы, которые обходит _frozen сам (остальное - листья)
+_CONTAINER_TYPES = frozenset((dict, list, tuple, set, frozenset))
+
+
+def _frozen(value: Any) -> Any:
+    """
+    неизменяемое хешируемое представление значения для точного сравнения:
+    словари - (dict, frozenset пар), порядок ключей не важен; списки,
+    кортежи и множества - с пометкой типа; числа - (тип, число).
+    два значения равны тогда и только тогда, когда равны их представления.
+    нехешируемые листья (bytearray, свои классы) - по repr
+    """
+    kind = type(value)
+    if kind is str or value is None:
+        return value
+    if kind in _NUMBER_TYPES:
+        return kind, value
+    if kind is dict or (kind not in _CONTAINER_TYPES and isinstance(value, Mapping)):
+        # строки (почти все ключи и значения) не проходят через вызов _frozen
+        return dict, frozenset(
+            [
+                (
+                    k if type(k) is str else _frozen(k),
+                    v if type(v) is str else _frozen(v),
+                )
+                for k, v in value.items()
+            ]
+        )
+    if kind is list or kind is tuple:
+        return kind, tuple([v if type(v) is str else _frozen(v) for v in value])
+    if kind is set or kind is frozenset:
+        return frozenset, frozenset([_frozen(v) for v in value])
+    try:
+        hash(value)
+    except TypeError:
+        return kind, repr(value)
+    return kind, value
+
+
+class UniqueRecords:
+    """
+    точный подсчет разных записей: запись сначала сравнивается по хешу
+    своего _frozen, а представления целиком строятся и сравниваются
+    только у записей с одинаковым хешем (дубликаты и редкие совпадения).
+    так не хранятся представления всех записей - это дорого по памяти
+    и по времени сборщика мусора. записи не должны меняться, пока идет подсчет
+    """
+
+    __slots__ = ("_first", "_clashes")
+
+    def __init__(self):
+        # хеш -> первая запись с ним; хеш -> разные представления при совпадении
+        self._first: Dict[int, Any] = {}
+        self._clashes: Dict[int, set] = {}
+
+    def add(self, record: Any) -> None:
+        frozen = _frozen(record)
+        key = hash(frozen)
+        first = self._first.get(key)
+        if first is None:
+            self._first[key] = record
+            return
+        clash = self._clashes.get(key)
+        if clash is None:
+            clash = self._clashes[key] = {_frozen(first)}
+        clash.add(frozen)
+
+    def __len__(self) -> int:
+        extra = sum(len(clash) - 1 for clash in self._clashes.values())
+        return len(self._first) + extra
+
+
+def _canonical(value: Any) -> str:
+    """
+    каноническая строка значения с пометками типов: то же равенство, что
+    у _frozen, но строка не зависит от процесса (ключи словарей
+    и элементы множеств отсортированы), поэтому ее можно хешировать
+    стабильно. нехешируемые и незнакомые листья - по repr
+    """
+    kind = type(value)
+    if kind is str:
+        return repr(value)
+    if value is None:
+        return "N"
+    if kind is bool:
+        return "T" if value else "F"
+    if kind is int:
+        return f"i{value}"
+    if kind is float:
+        return f"f{value!r}"
+    if kind is dict or (kind not in _CONTAINER_TYPES and isinstance(value, Mapping)):
+        items = sorted([f"{_canonical(k)}:{_canonical(v)}" for k, v in value.items()])
+        return "{%s}" % ",".join(items)
+    if kind is list:
+        return "[%s]" % ",".join([_canonical(v) for v in value])
+    if kind is tuple:
+        return "(%s)" % ",".join([_canonical(v) for v in value])
+    if kind is set or kind is frozenset:
+        return "<%s>" % ",".join(sorted([_canonical(v) for v in value]))
+    return f"?{kind.__qualname__}:{value!r}"
+
+
+def fingerprint(
+    record: Any,
+    cache: Optional[Dict[int, Tuple[Any, int]]] = None,
+    digest_size: int = 8,
+) -> int:
+    """
+    отпечаток записи: blake2b от канонической строки с пометками типов
+    (_canonical). одинаков у записей с одинаковым содержимым независимо
+    от порядка ключей и в любом процессе - его можно хранить на диске
+    и сравнивать между запусками. вероятность совпадения у разных записей -
+    порядка n**2 / 2**(8 * digest_size)
+
+    Args:
+        record: словарь (в т.ч. с вложенными словарями и списками) или скаляр
+        cache: словарь id(записи) -> (запись, отпечаток) для повторных вызовов;
+               после изменения записи кеш надо сбросить
+        digest_size: длина отпечатка в байтах (8 - 64 бита)
+
+    Returns:
+        целое число - отпечаток
+    """
+    if cache is not None:
+        entry = cache.get(id(record))
+        if entry is not None and entry[0] is record:
+            return entry[1]
+    digest = hashlib.blake2b(_canonical(record).encode(), digest_size=digest_size)
+    value = int.from_bytes(digest.digest(), "big")
+    if cache is not None:
+        cache[id(record)] = (record, value)
+    return value
+
+
+def _mix64(value: int) -> int:
+    """перемешивание битов (splitmix64), чтобы hash() маленьких чисел был равномерным"""
+    value = (value + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 31)
+
+
+class HyperLogLog:
+    """
+    приближенный подсчет числа различных значений (HyperLogLog):
+    память 2**precision байт, относительная ошибка около 1.04 / sqrt(2**precision)
+    (для precision=14 - около 0.8%). счетчики с разных кусков данных
+    объединяются через merge.
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision должна быть от 4 до 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Any) -> None:
+        """добавляет хешируемое значение (например, fingerprint записи)"""
+        hashed = _mix64(hash(value) & 0xFFFFFFFFFFFFFFFF)
+        idx = hashed >> (64 - self.precision)
+        rest = (hashed << self.precision) & 0xFFFFFFFFFFFFFFFF
+        # позиция первой единицы в оставшихся битах
+        rank = 65 - rest.bit_length() if rest else 65 - self.precision
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def update(self, values: Iterable[Any]) -> "HyperLogLog":
+        """добавляет много значений сразу: хеши перемешиваются векторно в NumPy"""
+        hashes = np.fromiter(map(hash, values), dtype=np.int64).view(np.uint64)
+        if not len(hashes):
+            return self
+        with np.errstate(over="ignore"):
+            hashed = hashes + np.uint64(0x9E3779B97F4A7C15)
+            hashed = (hashed ^ (hashed >> np.uint64(30))) * np.uint64(
+                0xBF58476D1CE4E5B9
+            )
+            hashed = (hashed ^ (hashed >> np.uint64(27))) * np.uint64(
+                0x94D049BB133111EB
+            )
+            hashed ^= hashed >> np.uint64(31)
+        idx = (hashed >> np.uint64(64 - self.precision)).astype(np.int64)
+        low = hashed & np.uint64((1 << (64 - self.precision)) - 1)
+        # младших бит меньше 2**53, поэтому frexp дает точную длину в битах
+        _, bit_length = np.frexp(low.astype(np.float64))
+        rank = (65 - self.precision - bit_length).astype(np.uint8)
+        registers = np.frombuffer(self.registers, dtype=np.uint8).copy()
+        np.maximum.at(registers, idx, rank)
+        self.registers = bytearray(registers.tobytes())
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("нельзя объединить HyperLogLog разной точности")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
 
-    unique_items = set()
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # на малых количествах точнее линейный подсчет
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+def unique_count(data: List[Dict], approximate: bool = False) -> int:
+    """
+    кол-во уникальных элементов.
+    словари сравниваются по содержимому точно (UniqueRecords),
+    значения разных типов (1, 1.0, True, "1") - разные.
+    approximate=True - оценка HyperLogLog без хранения всех записей
+    """
+    if not data:
+        return 0
+    if not isinstance(data[0], Mapping):
+        return HyperLogLog().update(data).count() if approximate else len(set(data))
+    if approximate:
+        return HyperLogLog().update(map(_frozen, data)).count()
+    unique = UniqueRecords()
     for item in data:
-        item_tuple = tuple(sorted((k, str(v)) for k, v in item.items()))
-        unique_items.add(item_tuple)
-    return len(unique_items)
+        unique.add(item)
+    return len(unique)
+
+
+def encode(
+    values: Iterable[Any], missing: Sequence[Any] = (None,)
+) -> Tuple[np.ndarray, List[Any]]:
+    """
+    словарное кодирование значений: код - номер значения в порядке
+    первого появления, значения из missing (по умолчанию None) кодируются как -1
+
+    Returns:
+        массив кодов и список значений (словарь)
+    """
+    values = values if isinstance(values, list) else list(values)
+    # dict.fromkeys и map работают на уровне C - это быстрее цикла с setdefault
+    seen = list(dict.fromkeys(values))
+    index = {value: i for i, value in enumerate(seen)}
+    codes = np.fromiter(map(index.__getitem__, values), np.int64, len(values))
+
+    vocab = [value for value in seen if value not in missing]
+    if len(vocab) < len(seen):
+        remap = np.full(len(seen), -1, dtype=np.int64)
+        keep = [i for i, value in enumerate(seen) if value not in missing]
+        remap[keep] = np.arange(len(keep))
+        codes = remap[codes]
+    return codes, vocab
+
+
+GROUP_REDUCERS = ("count", "sum", "mean", "median", "std", "min", "max")
+
+
+def group_by(
+    keys: Union[np.ndarray, Sequence[np.ndarray]],
+    values: Optional[np.ndarray] = None,
+    reducers: Sequence[str] = ("count",),
+) -> Dict[str, Any]:
+    """
+    группировка по кодам категорий с векторными агрегатами
+    (np.unique, np.bincount, сортировка), без циклов по записям
+
+    Args:
+        keys: массив кодов или список массивов кодов (группа - их сочетание),
+              строки с отрицательным кодом хотя бы в одном ключе пропускаются
+        values: числовые значения строк для агрегатов кроме count
+        reducers: какие агрегаты считать, из GROUP_REDUCERS
+
+    Returns:
+        словарь: "keys" - список массивов кодов групп (по одному на ключ),
+        "first" - номер строки первого появления группы,
+        "inverse" - номер группы для каждой непропущенной строки,
+        и по массиву на каждый агрегат. группы идут в порядке первого
+        появления, как ключи dict/Counter при подсчете в цикле.
+        std - выборочное (как statistics.stdev), 0 для групп из одной строки
+    """
+    single = isinstance(keys, np.ndarray)
+    key_list = [np.asarray(keys)] if single else [np.asarray(k) for k in keys]
+    unknown = set(reducers) - set(GROUP_REDUCERS)
+    if unknown:
+        raise ValueError(f"неизвестные агрегаты: {sorted(unknown)}")
+
+    mask = np.ones(len(key_list[0]), dtype=bool)
+    for k in key_list:
+        mask &= k >= 0
+    rows = np.flatnonzero(mask)
+    # сочетание ключей сворачиваем в один целочисленный ключ
+    dims = tuple(int(k[rows].max()) + 1 if len(rows) else 1 for k in key_list)
+    combined = np.ravel_multi_index(tuple(k[rows] for k in key_list), dims)
+    uniq, first, inverse = np.unique(
+        combined, return_index=True, return_inverse=True
+    )
+    inverse = inverse.reshape(-1)
+
+    # перенумеровываем группы в порядке первого появления
+    order = np.argsort(first, kind="stable")
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    inverse = rank[inverse]
+    n_groups = len(order)
+
+    result: Dict[str, Any] = {
+        "keys": list(np.unravel_index(uniq[order], dims)),
+        "first": rows[first[order]],
+        "inverse": inverse,
+    }
+    counts = np.bincount(inverse, minlength=n_groups)
+    if "count" in reducers:
+        result["count"] = counts
+    if set(reducers) == {"count"}:
+        return result
+    if values is None:
+        raise ValueError("для агрегатов кроме count нужны values")
+
+    vals = np.asarray(values, dtype=np.float64)[rows]
+    sums = np.bincount(inverse, weights=vals, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    if "sum" in reducers:
+        result["sum"] = sums
+    if "mean" in reducers:
+        result["mean"] = means
+    if "std" in reducers:
+        deviations = vals - means[inverse]
+        squares = np.bincount(inverse, weights=deviations**2, minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result["std"] = np.where(
+                counts > 1, np.sqrt(squares / np.maximum(counts - 1, 1)), 0.0
+            )
+
+    if {"median", "min", "max"} & set(reducers):
+        # сортируем значения внутри групп: группа i - sorted_vals[starts[i]:...]
+        sorted_vals = vals[np.lexsort((vals, inverse))]
+        starts = np.cumsum(counts) - counts
+        if "min" in reducers:
+            result["min"] = sorted_vals[starts]
+        if "max" in reducers:
+            result["max"] = sorted_vals[starts + counts - 1]
+        if "median" in reducers:
+            low = sorted_vals[starts + (counts - 1) // 2]
+            high = sorted_vals[starts + counts // 2]
+            result["median"] = (low + high) / 2
+    return result
+
+
+def top_k(
+    values: np.ndarray, k: Optional[int] = None, reverse: bool = True
+) -> np.ndarray:
+    """
+    номера k наибольших (reverse=False - наименьших) значений;
+    при равенстве раньше идет меньший номер, как у sorted и Counter.most_common
+    """
+    values = np.asarray(values)
+    order = np.argsort(-values if reverse else values, kind="stable")
+    return order if k is None else order[:k]
 
 
 def top_n(
@@ -47,80 +407,424 @@ def top_n(
     Returns:
         список кортежей
     """
-    counter = {}
-    for item in data:
-        value = item.get(field)
-        if value is not None:
-            counter[value] = counter.get(value, 0) + 1
+    codes, vocab = encode(item.get(field) for item in data)
+    counts = np.bincount(codes[codes >= 0], minlength=len(vocab))
+    return [(vocab[i], int(counts[i])) for i in top_k(counts, n, reverse)]
+
+
+class NumericAccumulator:
+    """
+    накопитель описательных статистик за один проход: count, mean и std
+    (Уэлфорд), min, max, а также медиана, квантили и мода.
+
+    exact=True - медиана, квантили и мода точные: значения хранятся
+    в Counter (для годов и количеств призов он маленький).
+    exact=False - квантили приближенные по сжатому набору центроидов
+    (упрощенный t-digest размера около compression), мода не считается.
+
+    значения можно подавать по одному или из генератора (add/update),
+    а частичные результаты с разных кусков данных объединять (merge).
+    """
+
+    def __init__(self, exact: bool = True, compression: int = 200):
+        self.exact = exact
+        self.compression = compression
+        self.count = 0
+        self.min: Any = None
+        self.max: Any = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        # для целых чисел держим точные сумму и сумму квадратов
+        self._all_int = True
+        self._total = 0
+        self._total_sq = 0
+        self._counter: Counter = Counter()
+        self._centroids: List[Tuple[float, float]] = []
+        self._buffer: List[float] = []
+
+    @classmethod
+    def from_counts(cls, counts: Iterable[Tuple[Any, int]]) -> "NumericAccumulator":
+        """
+        точный накопитель по парам (значение, сколько раз) без перебора
+        всех значений; пары - в порядке первого появления значений
+        (от него зависит мода при равенстве)
+        """
+        acc = cls()
+        for value, n in counts:
+            if n <= 0:
+                continue
+            if acc.count == 0 or value < acc.min:
+                acc.min = value
+            if acc.count == 0 or value > acc.max:
+                acc.max = value
+            acc.count += n
+            delta = value - acc._mean
+            acc._mean += delta * n / acc.count
+            acc._m2 += delta * delta * (acc.count - n) * n / acc.count
+            if acc._all_int and isinstance(value, int):
+                acc._total += value * n
+                acc._total_sq += value * value * n
+            else:
+                acc._all_int = False
+            acc._counter[value] += n
+        return acc
+
+    def add(self, value: Any) -> None:
+        """добавляет одно значение (None пропускается)"""
+        if value is None:
+            return
+        self.count += 1
+        if self.count == 1 or value < self.min:
+            self.min = value
+        if self.count == 1 or value > self.max:
+            self.max = value
+
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+
+        if self._all_int and isinstance(value, int):
+            self._total += value
+            self._total_sq += value * value
+        else:
+            self._all_int = False
+
+        if self.exact:
+            self._counter[value] += 1
+        else:
+            self._buffer.append(value)
+            if len(self._buffer) >= self.compression * 4:
+                self._compress()
+
+    def update(self, values: Iterable[Any]) -> "NumericAccumulator":
+        """добавляет значения из любого итерируемого объекта"""
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: "NumericAccumulator") -> "NumericAccumulator":
+        """добавляет к себе результаты другого накопителя"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.min, self.max = other.min, other.max
+        else:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
 
-    sorted_items = sorted(counter.items(), key=itemgetter(1), reverse=reverse)
-    return sorted_items[:n]
+        n = self.count + other.count
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / n
+        self._mean += delta * other.count / n
+        self.count = n
 
+        self._all_int = self._all_int and other._all_int
+        self._total += other._total
+        self._total_sq += other._total_sq
 
-def describe_numeric(values: List[Any]) -> Dict[str, Any]:
+        if self.exact and other.exact:
+            self._counter.update(other._counter)
+        else:
+            self.exact = False
+            self._buffer.extend(self._counter.elements())
+            self._buffer.extend(other._counter.elements())
+            self._buffer.extend(other._buffer)
+            self._centroids.extend(other._centroids)
+            self._counter = Counter()
+            self._compress()
+        return self
+
+    def _compress(self) -> None:
+        """сливает соседние центроиды в группы примерно равного веса"""
+        points = sorted(self._centroids + [(v, 1.0) for v in self._buffer])
+        self._buffer = []
+        if len(points) <= self.compression:
+            self._centroids = points
+            return
+        limit = sum(weight for _, weight in points) / self.compression
+        merged = []
+        current_mean, current_weight = points[0]
+        for value, weight in points[1:]:
+            if current_weight + weight <= limit:
+                current_weight += weight
+                current_mean += (value - current_mean) * weight / current_weight
+            else:
+                merged.append((current_mean, current_weight))
+                current_mean, current_weight = value, weight
+        merged.append((current_mean, current_weight))
+        self._centroids = merged
+
+    def mean(self) -> Any:
+        if self.count == 0:
+            return 0
+        if self._all_int:
+            # как statistics.mean: целое, если делится нацело
+            whole, rest = divmod(self._total, self.count)
+            return whole if rest == 0 else self._total / self.count
+        return self._mean
+
+    def std(self) -> float:
+        """выборочное стандартное отклонение (как statistics.stdev)"""
+        if self.count < 2:
+            return 0
+        if self._all_int:
+            n = self.count
+            return math.sqrt((n * self._total_sq - self._total**2) / (n * (n - 1)))
+        return math.sqrt(self._m2 / (self.count - 1))
+
+    def _sorted_counts(self) -> Tuple[List[Any], List[int]]:
+        values = sorted(self._counter)
+        cumulative = []
+        running = 0
+        for value in values:
+            running += self._counter[value]
+            cumulative.append(running)
+        return values, cumulative
+
+    def _nth(self, values: List[Any], cumulative: List[int], idx: int) -> Any:
+        """idx-е по порядку значение (с нуля) среди всех добавленных"""
+        lo, hi = 0, len(cumulative) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if cumulative[mid] > idx:
+                hi = mid
+            else:
+                lo = mid + 1
+        return values[lo]
+
+    def quantile(self, q: float) -> Any:
+        """квантиль уровня q (0..1) с линейной интерполяцией"""
+        if self.count == 0:
+            return None
+        if self.exact:
+            values, cumulative = self._sorted_counts()
+            position = q * (self.count - 1)
+            low_idx = int(math.floor(position))
+            low = self._nth(values, cumulative, low_idx)
+            if position == low_idx:
+                return low
+            high = self._nth(values, cumulative, low_idx + 1)
+            return low + (high - low) * (position - low_idx)
+
+        if self._buffer:
+            self._compress()
+        centers = []
+        running = 0.0
+        for value, weight in self._centroids:
+            centers.append(running + weight / 2)
+            running += weight
+        position = q * running
+        if position <= centers[0]:
+            return self.min if q == 0 else self._centroids[0][0]
+        if position >= centers[-1]:
+            return self.max if q == 1 else self._centroids[-1][0]
+        for i in range(1, len(centers)):
+            if position <= centers[i]:
+                left, right = self._centroids[i - 1][0], self._centroids[i][0]
+                share = (position - centers[i - 1]) / (centers[i] - centers[i - 1])
+                return left + (right - left) * share
+
+    def median(self) -> Any:
+        """медиана; в точном режиме совпадает со statistics.median"""
+        if self.count == 0:
+            return 0
+        if not self.exact:
+            return self.quantile(0.5)
+        values, cumulative = self._sorted_counts()
+        n = self.count
+        if n % 2 == 1:
+            return self._nth(values, cumulative, n // 2)
+        return (
+            self._nth(values, cumulative, n // 2 - 1)
+            + self._nth(values, cumulative, n // 2)
+        ) / 2
+
+    def mode(self) -> Any:
+        """
+        самое частое значение (первое встреченное при равенстве, как
+        statistics.mode); None, если значений нет или режим приближенный
+        """
+        if not self._counter:
+            return None
+        return self._counter.most_common(1)[0][0]
+
+    def describe(self) -> Dict[str, Any]:
+        """статистики в формате describe_numeric"""
+        if self.count == 0:
+            return {}
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "median": self.median(),
+            "min": self.min,
+            "max": self.max,
+            "std": self.std(),
+        }
+
+
+def describe_numeric(values: Iterable[Any]) -> Dict[str, Any]:
     """
-    все вместе+описательные статистики
+    все вместе+описательные статистики, за один проход (NumericAccumulator)
     """
     if not values:
         return {}
+    return NumericAccumulator().update(values).describe()
 
-    clean_values = [v for v in values if v is not None]
-    if not clean_values:
-        return {}
 
-    return {
-        "count": len(clean_values),
-        "mean": statistics.mean(clean_values),
-        "median": statistics.median(clean_values),
-        "min": min(clean_values),
-        "max": max(clean_values),
-        "std": statistics.stdev(clean_values) if len(clean_values) > 1 else 0,
-    }
+class RecordAccumulator(ABC):
+    """
+    накопитель одного анализа для однопроходного отчета (см. report):
+    получает лауреатов по одному вместе со списком его призов,
+    а в конце отдает результат для вывода и графиков.
+    накопитель без add или result не создается (TypeError)
+    """
 
+    # производные поля (derived), которые накопитель берет из стадии набора,
+    # а не считает сам; их колонки приходят в use_derived до первого add
+    derived: Tuple[str, ...] = ()
 
-def print_laureates_analysis(laureates_data: List[Dict]) -> None:
+    def use_derived(self, columns: Dict[str, Sequence[Any]]) -> None:
+        """
+        колонки производных полей derived по лауреатам набора, в порядке
+        будущих вызовов add. не вызывается, если набор - итератор
+        (стадию строить не по чему): тогда накопитель считает сам
+        """
+
+    @abstractmethod
+    def add(self, item: Dict, prizes: List[Dict]) -> None:
+        """учитывает лауреата item с его призами prizes"""
+
+    @abstractmethod
+    def result(self) -> Any:
+        """результат анализа по всем добавленным лауреатам"""
+
+
+def bind_derived(
+    laureates_data: Any, accumulators: Sequence[RecordAccumulator]
+) -> None:
     """
-    Общая инфа
+    отдает накопителям колонки их производных полей из стадии набора
+    (derived.derived_fields): значения считаются один раз на набор,
+    повторно - только у изменившихся лауреатов. итераторы пропускаются
     """
-    print(f"Всего лауреатов: {count(laureates_data)}")
+    needs = [acc for acc in accumulators if acc.derived]
+    if not needs:
+        return
+    tables = sys.modules.get("tables")
+    if not isinstance(laureates_data, list) and not (
+        tables is not None and isinstance(laureates_data, tables.LaureateTable)
+    ):
+        return
+    from derived import derived_fields
 
-    unique_laureates_count = unique_count(laureates_data)
-    print(f"Количество уникальных записей: {unique_laureates_count}")
+    stage = derived_fields(laureates_data)
+    stage.refresh()
+    for acc in needs:
+        acc.use_derived({name: stage.column(name) for name in acc.derived})
 
-    all_prizes = []
+
+def accumulate(
+    laureates_data: Iterable[Dict], accumulators: Sequence[RecordAccumulator]
+) -> List[Any]:
+    """
+    один проход по лауреатам, который кормит все накопители сразу;
+    призы каждого лауреата достаются один раз
+
+    Returns:
+        результаты накопителей в том же порядке
+    """
+    bind_derived(laureates_data, accumulators)
+    adders = [acc.add for acc in accumulators]
     for item in laureates_data:
-        all_prizes.extend(item.get("prizes_relevant", []))
-
-    top_categories = top_n(all_prizes, "category_en", n=5)
-    print("\nТоп-5 категорий призов:")
-    for cat, cnt in top_categories:
-        print(f"  {cat}: {cnt}")
-
-    all_years = [
-        p.get("award_year") for p in all_prizes if p.get("award_year") is not None
-    ]
-    year_stats = describe_numeric(all_years)
-    print(f"\nСтатистики по годам награждения:")
-    for k, v in year_stats.items():
-        print(f"  {k}: {v}")
-
-    prizes_per_laureate = [
-        len(item.get("prizes_relevant", [])) for item in laureates_data
-    ]
-    avg_prizes = mean(prizes_per_laureate)
-    print(f"\nСреднее количество призов на лауреата: {avg_prizes:.2f}")
-
-    med_prizes = median(prizes_per_laureate)
-    print(f"Медианное количество призов на лауреата: {med_prizes}")
+        prizes = item.get("prizes_relevant", [])
+        for add in adders:
+            add(item, prizes)
+    return [acc.result() for acc in accumulators]
+
+
+class SummaryAccumulator(RecordAccumulator):
+    """накопитель для summarize_laureates"""
+
+    def __init__(self):
+        self.total = 0
+        self.unique = UniqueRecords()
+        self.categories: Dict[Any, int] = {}
+        self.years = NumericAccumulator()
+        self.prizes_per_laureate = NumericAccumulator()
+        self.types: Counter = Counter()
+
+    def add(self, item: Dict, prizes: List[Dict]) -> None:
+        self.total += 1
+        self.unique.add(item)
+        for prize in prizes:
+            category = prize.get("category_en")
+            if category is not None:
+                self.categories[category] = self.categories.get(category, 0) + 1
+            self.years.add(prize.get("award_year"))
+        self.prizes_per_laureate.add(len(prizes))
+        type_ = item.get("type_")
+        if type_:  # Фильтруем None
+            self.types[type_] += 1
+
+    def result(self) -> Dict[str, Any]:
+        categories = list(self.categories.items())
+        counts = np.array([cnt for _, cnt in categories], dtype=np.int64)
+        return {
+            "total": self.total,
+            "unique": len(self.unique),
+            "top_categories": [categories[i] for i in top_k(counts, 5)],
+            "year_stats": self.years.describe(),
+            "avg_prizes": self.prizes_per_laureate.mean(),
+            "median_prizes": self.prizes_per_laureate.median(),
+            "mode_prizes": self.prizes_per_laureate.mode(),
+            "type_counts": dict(self.types),
+        }
 
-    try:
-        most_common_prize_count = mode(prizes_per_laureate)
-        print(
-            f"Наиболее частое количество призов на лауреата: {most_common_prize_count}"
-        )
-    except statistics.StatisticsError:
-        print("Наиболее частое количество призов: (множество модусов)")
 
-    types = [item.get("type_") for item in laureates_data]
-    type_counts = Counter(t for t in types if t)  # Фильтруем None
-    print(f"\nТипы лауреатов: {dict(type_counts)}")
+@memoized
+def summarize_laureates(laureates_data: List[Dict]) -> Dict[str, Any]:
+    """
+    подсчеты для print_laureates_analysis
+
+    Returns:
+        словарь: total, unique, top_categories, year_stats,
+        avg_prizes, median_prizes, mode_prizes, type_counts
+    """
+    (summary,) = accumulate(laureates_data, [SummaryAccumulator()])
+    return summary
+
+
+def print_summary(summary: Dict[str, Any], file: Optional[TextIO] = None) -> None:
+    """вывод по результату summarize_laureates"""
+    print(f"Всего лауреатов: {summary['total']}", file=file)
+    print(f"Количество уникальных записей: {summary['unique']}", file=file)
+
+    print("\nТоп-5 категорий призов:", file=file)
+    for cat, cnt in summary["top_categories"]:
+        print(f"  {cat}: {cnt}", file=file)
+
+    print(f"\nСтатистики по годам награждения:", file=file)
+    for k, v in summary["year_stats"].items():
+        print(f"  {k}: {v}", file=file)
+
+    print(
+        f"\nСреднее количество призов на лауреата: {summary['avg_prizes']:.2f}",
+        file=file,
+    )
+    print(
+        f"Медианное количество призов на лауреата: {summary['median_prizes']}",
+        file=file,
+    )
+    print(
+        f"Наиболее частое количество призов на лауреата: {summary['mode_prizes']}",
+        file=file,
+    )
+
+    print(f"\nТипы лауреатов: {summary['type_counts']}", file=file)
+
+
+def print_laureates_analysis(laureates_data: List[Dict]) -> None:
+    """
+    Общая инфа
+    """
+    print_summary(summarize_laureates(laureates_data))
@@ -0,0 +1,392 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import core
+from aggregations import describe_numeric, top_n, unique_count
+from benchmarks import make_laureates, timeit
+from dataset_helpers import (
+    add_migration_field,
+    count_age_by_category,
+    count_countries_and_categories,
+    count_gender_trends,
+    count_multiple_laureates,
+    count_refusals,
+    get_first_prize_age,
+)
+from json_dict_processing import extract_nested_value, process_dictionary_with_config
+from laureates_configs import CONFIG_ORG, CONFIG_PERSON
+
+# набор бенчмарков горячих путей на синтетических данных, полностью офлайн:
+#   python bench_suite.py run --save bench_baseline.json      записать базу
+#   python bench_suite.py run --compare bench_baseline.json   сравнить с базой
+# масштаб 1x - примерно размер настоящего набора лауреатов
+SCALES = {"1x": 1_000, "100x": 100_000, "10000x": 10_000_000}
+DEFAULT_SCALES = ("1x", "100x")
+# больше стольких разных записей не генерируется: 10000x не помещается
+# в память, поэтому записи повторяются по кругу (ссылки на те же объекты)
+DISTINCT_LIMIT = 100_000
+SEED = 0
+# относительное изменение времени, которое считается регрессией/ускорением;
+# на общей машине лучшее время из нескольких запусков гуляет на 10-20%
+THRESHOLD = 0.25
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json"
+)
+
+# путь для extract_nested_value: самый длинный путь конфига человека
+NESTED_PATH = CONFIG_PERSON["country_birth"]
+
+# имя -> (вход из make_datasets: "raw", "processed" или "migrated",
+# функция от входа); порядок - порядок вывода
+CASES: Dict[str, tuple] = {}
+
+
+def case(name: str, source: str) -> Callable:
+    """регистрирует бенчмарк name, который получает данные source"""
+
+    def decorator(func: Callable[[List[Dict]], Any]) -> Callable:
+        CASES[name] = (source, func)
+        return func
+
+    return decorator
+
+
+@case("extract_nested_value", "raw")
+def _extract(raw: List[Dict]) -> None:
+    for laureate in raw:
+        extract_nested_value(laureate, NESTED_PATH)
+
+
+@case("process_dictionary_with_config", "raw")
+def _process_interpreted(raw: List[Dict]) -> None:
+    for laureate in raw:
+        config = CONFIG_PERSON if "knownName" in laureate else CONFIG_ORG
+        process_dictionary_with_config(laureate, config)
+
+
+@case("get_laureate_data", "raw")
+def _process_compiled(raw: List[Dict]) -> None:
+    for laureate in raw:
+        core.get_laureate_data(laureate)
+
+
+@case("unique_count", "processed")
+def _unique(data: List[Dict]) -> None:
+    unique_count(data)
+
+
+@case("unique_count_approximate", "processed")
+def _unique_approximate(data: List[Dict]) -> None:
+    unique_count(data, approximate=True)
+
+
+@case("top_n", "processed")
+def _top_n(data: List[Dict]) -> None:
+    top_n(data, "country_now")
+
+
+@case("describe_numeric", "processed")
+def _describe(data: List[Dict]) -> None:
+    describe_numeric([item.get("birth_year") for item in data])
+
+
+@case("count_multiple_laureates", "processed")
+def _multiple(data: List[Dict]) -> None:
+    count_multiple_laureates(data)
+
+
+@case("count_countries_and_categories", "migrated")
+def _countries(data: List[Dict]) -> None:
+    count_countries_and_categories(data)
+
+
+@case("count_age_by_category", "processed")
+def _age(data: List[Dict]) -> None:
+    count_age_by_category(data, get_first_prize_age)
+
+
+@case("count_gender_trends", "processed")
+def _gender(data: List[Dict]) -> None:
+    count_gender_trends(data)
+
+
+@case("count_refusals", "processed")
+def _refusals(data: List[Dict]) -> None:
+    count_refusals(data)
+
+
+def _cycle(pool: List[Dict], n: int) -> List[Dict]:
+    """n записей из pool по кругу (ссылки, без копирования)"""
+    repeats, rest = divmod(n, len(pool))
+    return pool * repeats + pool[:rest]
+
+
+def make_datasets(n: int, seed: int = SEED) -> Dict[str, List[Dict]]:
+    """
+    входы бенчмарков на n лауреатов: raw - сырые в формате АПИ,
+    processed - после get_laureate_data, migrated - processed
+    с полями add_migration_field. больше DISTINCT_LIMIT записей
+    повторяются по кругу
+    """
+    raw = make_laureates(min(n, DISTINCT_LIMIT), seed)
+    processed = [core.get_laureate_data(laureate) for laureate in raw]
+    # add_migration_field дописывает поля в записи - делаем это на копиях
+    migrated = add_migration_field([dict(item) for item in processed])
+    datasets = {"raw": raw, "processed": processed, "migrated": migrated}
+    if n > len(raw):
+        datasets = {key: _cycle(pool, n) for key, pool in datasets.items()}
+    return datasets
+
+
+def environment() -> Dict[str, Any]:
+    """окружение запуска - результаты сравнимы только на одном окружении"""
+    try:
+        import numpy
+
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+    }
+
+
+def calibrate(repeat: int = 5) -> float:
+    """
+    время фиксированной эталонной нагрузки (обход словарей, как при
+    извлечении полей) - по нему compare поправляет разницу в скорости
+    машины между запуском базы и текущим
+    """
+    records = [{"a": {"b": i, "c": str(i)}} for i in range(100_000)]
+
+    def work() -> None:
+        total = 0
+        for record in records:
+            inner = record["a"]
+            total += inner["b"] + len(inner["c"])
+
+    return timeit(work, repeat)
+
+
+def run_suite(
+    scales: Sequence[str] = DEFAULT_SCALES,
+    cases: Optional[Sequence[str]] = None,
+    repeat: int = 5,
+    seed: int = SEED,
+    verbose: bool = True,
+) -> Dict[str, Any]:
+    """
+    функция прогоняет бенчмарки на каждом масштабе: данные генерируются
+    заранее и в замер не входят, берется лучшее время из repeat запусков
+    (на масштабах меньше 10 000 записей - пропорционально больше)
+
+    Args:
+        scales: масштабы из SCALES
+        cases: какие бенчмарки запускать (по умолчанию все из CASES)
+        repeat: число запусков каждого бенчмарка
+        seed: зерно генератора данных
+        verbose: печатать результаты по мере готовности
+
+    Returns:
+        словарь environment, seed, results: {"имя@масштаб": {"records",
+        "seconds", "us_per_record"}}
+    """
+    names = list(CASES) if cases is None else list(cases)
+    unknown = [name for name in names if name not in CASES]
+    unknown += [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        raise ValueError(f"неизвестные бенчмарки или масштабы: {unknown}")
+
+    results: Dict[str, Dict[str, float]] = {}
+    calibration = calibrate()
+    for scale in scales:
+        n = SCALES[scale]
+        datasets = make_datasets(n, seed)
+        if verbose:
+            print(f"Масштаб {scale} ({n} лауреатов)")
+        for name in names:
+            source, func = CASES[name]
+            data = datasets[source]
+            # маленькие масштабы гоняются чаще, чтобы лучшее время было устойчивым
+            runs = repeat * max(1, 10_000 // n)
+            seconds = timeit(lambda: func(data), runs)
+            results[f"{name}@{scale}"] = {
+                "records": n,
+                "seconds": seconds,
+                "us_per_record": seconds / n * 1e6,
+            }
+            if verbose:
+                per_record = seconds / n * 1e6
+                print(f"  {name}: {seconds:.4f} c ({per_record:.3f} мкс/запись)")
+        del datasets
+    # эталон замеряется до и после, чтобы захватить дрейф за время прогона
+    calibration = min(calibration, calibrate())
+    if verbose:
+        print(f"Эталонная нагрузка: {calibration:.4f} c")
+    return {
+        "environment": environment(),
+        "seed": seed,
+        "calibration": calibration,
+        "results": results,
+    }
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    """
+    сохраняет результаты run_suite как базу; записи других масштабов
+    и бенчмарков из прежнего файла сохраняются
+    """
+    stored: Dict[str, Any] = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            stored = json.load(f)
+    merged = dict(stored.get("results", {}))
+    merged.update(results["results"])
+    saved_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    data = dict(results, results=merged, saved_at=saved_at)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    сравнивает результаты run_suite с базой по общим бенчмаркам.
+    кроме прямого отношения времен считается отношение с поправкой
+    на эталонную нагрузку (calibrate). эталон не всегда меняется так же,
+    как бенчмарки, поэтому регрессия или ускорение засчитываются,
+    только если порог перейден по обоим отношениям
+
+    Returns:
+        список словарей name, baseline, current (секунды), raw_ratio
+        (текущее / база), ratio (с поправкой) и status: "regression",
+        "faster" или "ok"
+    """
+    speed = 1.0
+    if current.get("calibration") and baseline.get("calibration"):
+        speed = current["calibration"] / baseline["calibration"]
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        raw_ratio = result["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        ratio = raw_ratio / speed
+        if min(raw_ratio, ratio) > 1 + threshold:
+            status = "regression"
+        elif max(raw_ratio, ratio) < 1 - threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "name": name,
+                "baseline": base["seconds"],
+                "current": result["seconds"],
+                "raw_ratio": raw_ratio,
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def print_comparison(
+    rows: Iterable[Dict[str, Any]],
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    file=None,
+) -> None:
+    """печатает отчет compare; предупреждает, если окружение базы другое"""
+    differs = [
+        key
+        for key, value in current["environment"].items()
+        if baseline.get("environment", {}).get(key) != value
+    ]
+    if differs:
+        print(
+            f"Внимание: окружение отличается от базы ({', '.join(differs)}), "
+            "сравнение ориентировочное",
+            file=file,
+        )
+    if current.get("calibration") and baseline.get("calibration"):
+        speed = current["calibration"] / baseline["calibration"]
+        print(f"  эталонная нагрузка: x{speed:.2f} к базе", file=file)
+    print(
+        f"  {'бенчмарк':<44} {'база, c':>10} {'сейчас, c':>10} {'x':>6}"
+        f" {'x эталон':>9}  статус",
+        file=file,
+    )
+    for row in rows:
+        print(
+            f"  {row['name']:<44} {row['baseline']:>10.4f} {row['current']:>10.4f}"
+            f" {row['raw_ratio']:>6.2f} {row['ratio']:>9.2f}  {row['status']}",
+            file=file,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="бенчмарки извлечения, агрегаций и анализов на синтетических данных"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="прогнать бенчмарки")
+    run.add_argument(
+        "--scales", nargs="+", default=list(DEFAULT_SCALES), choices=list(SCALES)
+    )
+    run.add_argument("--cases", nargs="+", choices=list(CASES))
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--save", metavar="PATH", help="сохранить результаты как базу")
+    run.add_argument(
+        "--compare",
+        metavar="PATH",
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        help="сравнить с базой (по умолчанию bench_baseline.json)",
+    )
+    run.add_argument("--threshold", type=float, default=THRESHOLD)
+    commands.add_parser("list", help="список бенчмарков и масштабов")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name, (source, _) in CASES.items():
+            print(f"{name} ({source})")
+        for scale, n in SCALES.items():
+            print(f"{scale}: {n}")
+        return 0
+
+    results = run_suite(args.scales, args.cases, args.repeat)
+    status = 0
+    if args.compare:
+        baseline = load_results(args.compare)
+        rows = compare(results, baseline, args.threshold)
+        print(f"\nСравнение с {args.compare} (порог {args.threshold:.0%})")
+        print_comparison(rows, results, baseline)
+        regressions = [row for row in rows if row["status"] == "regression"]
+        if regressions:
+            print(f"Регрессий: {len(regressions)}")
+            status = 1
+    if args.save:
+        save_results(results, args.save)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
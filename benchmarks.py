@@ -0,0 +1,957 @@
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import Counter, defaultdict
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+import core
+import dataset_helpers
+import report
+from aggregations import summarize_laureates, top_n
+from json_dict_processing import create_processor, process_dictionary_with_config
+from laureates_configs import CONFIG_PERSON, CONFIG_ORG
+from prizes_configs import CONFIG_PRIZE
+
+# бюджет времени импорта модулей в новом интерпретаторе, мс (см. bench_import_time).
+# с запасом от замеров; импорт pyplot (~0.6 c) или requests (~0.1 c)
+# при загрузке модуля в бюджет не укладывается
+IMPORT_BUDGET_MS = {
+    "cli": 25,
+    "core": 80,
+    "ingest": 100,
+    "parallel": 100,
+    "aggregations": 50,
+    "dataset_helpers": 80,
+    "report": 150,
+    "incremental": 150,
+    "pipeline": 100,
+}
+# зависимости, которые должны грузиться лениво, при первом использовании
+LAZY_DEPENDENCIES = ("numpy", "matplotlib", "requests")
+
+CATEGORIES = [
+    "Physics",
+    "Chemistry",
+    "Physiology or Medicine",
+    "Literature",
+    "Peace",
+    "Economic Sciences",
+]
+COUNTRIES = ["USA", "United Kingdom", "Germany", "France", "Sweden", "Japan", "Russia"]
+
+
+def make_prize(rng: random.Random) -> Dict:
+    """синтетический приз в формате API"""
+    year = rng.randint(1901, 2024)
+    return {
+        "awardYear": str(year),
+        "category": {"en": rng.choice(CATEGORIES)},
+        "prizeAmount": rng.randint(100000, 11000000),
+        "prizeAmountAdjusted": rng.randint(1000000, 11000000),
+        "prizeStatus": "declined" if rng.random() < 0.01 else "received",
+    }
+
+
+def make_laureate(idx: int, rng: random.Random) -> Dict:
+    """синтетический лауреат (человек или организация) в формате API"""
+    prizes = [make_prize(rng) for _ in range(1 if rng.random() < 0.97 else 2)]
+    if rng.random() < 0.93:
+        return {
+            "id": str(idx),
+            "knownName": {"en": f"Person {idx}"},
+            "gender": "female" if rng.random() < 0.07 else "male",
+            "birth": {
+                "date": f"{rng.randint(1820, 1990)}-01-01",
+                "place": {
+                    "country": {"en": rng.choice(COUNTRIES)},
+                    "countryNow": {"en": rng.choice(COUNTRIES)},
+                },
+            },
+            "nobelPrizes": prizes,
+        }
+    return {
+        "id": str(idx),
+        "orgName": {"en": f"Organization {idx}"},
+        "founded": {
+            "date": f"{rng.randint(1800, 1990)}-01-01",
+            "place": {
+                "country": {"en": rng.choice(COUNTRIES)},
+                "countryNow": {"en": rng.choice(COUNTRIES)},
+            },
+        },
+        "nobelPrizes": prizes,
+    }
+
+
+def make_laureates(n: int, seed: int = 0) -> List[Dict]:
+    """список из n синтетических лауреатов"""
+    rng = random.Random(seed)
+    return [make_laureate(i, rng) for i in range(n)]
+
+
+def timeit(func: Callable[[], object], repeat: int = 3) -> float:
+    """лучшее время из repeat запусков (без сборщика мусора), в секундах"""
+    best = float("inf")
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+
+def bench_compiled_plan(n: int = 1_000_000) -> None:
+    """
+    сравнение скомпилированного плана (create_processor) с интерпретацией
+    конфига (process_dictionary_with_config) на n синтетических записях
+    """
+    data = make_laureates(n)
+    prizes = [prize for item in data for prize in item["nobelPrizes"]]
+
+    cases = [
+        ("person", CONFIG_PERSON, data),
+        ("org", CONFIG_ORG, data),
+        ("prize", CONFIG_PRIZE, prizes),
+    ]
+    print(f"Извлечение полей, {n} записей")
+    for name, config, records in cases:
+        processor = create_processor(config)
+        interpreted = timeit(
+            lambda: [process_dictionary_with_config(r, config) for r in records]
+        )
+        compiled = timeit(lambda: [processor(r) for r in records])
+        print(
+            f"  {name:<7} интерпретатор: {interpreted:.3f} c, "
+            f"план: {compiled:.3f} c, ускорение x{interpreted / compiled:.2f}"
+        )
+
+
+class MockLaureatesAPI:
+    """
+    локальный сервер, отдающий синтетических лауреатов в формате
+    эндпоинта /2.1/laureates (offset/limit, meta, links.next)
+    с искусственной задержкой на каждый запрос.
+
+    используется как контекстный менеджер, адрес эндпоинта - в .url
+
+    Args:
+        laureates: сырые лауреаты
+        latency: задержка ответа, с, или функция offset -> задержка
+                 (например, чтобы поздние страницы приходили раньше)
+        links: отдавать ли links.next (без нее клиент идет по meta)
+        max_limit: сервер урезает limit до этого значения, как реальный АПИ
+        errors: offset -> коды ответов: очередной запрос страницы получает
+                следующий код из списка, пока список не кончится
+    """
+
+    def __init__(
+        self,
+        laureates: List[Dict],
+        latency: Union[float, Callable[[int], float]] = 0.0,
+        links: bool = True,
+        max_limit: Optional[int] = None,
+        errors: Optional[Dict[int, List[int]]] = None,
+    ):
+        self.laureates = laureates
+        self.latency = latency
+        self.links = links
+        self.max_limit = max_limit
+        self.errors = {offset: list(codes) for offset, codes in (errors or {}).items()}
+        self.requests_count = 0
+        # offset каждого запроса в порядке поступления
+        self.offsets: List[int] = []
+        lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", ["25"])[0])
+                if api.max_limit is not None:
+                    limit = min(limit, api.max_limit)
+                with lock:
+                    api.requests_count += 1
+                    api.offsets.append(offset)
+                    codes = api.errors.get(offset)
+                    status = codes.pop(0) if codes else 200
+                latency = api.latency
+                time.sleep(latency(offset) if callable(latency) else latency)
+                if status != 200:
+                    self.send_error(status)
+                    return
+                body = {
+                    "laureates": api.laureates[offset : offset + limit],
+                    "meta": {
+                        "offset": offset,
+                        "limit": limit,
+                        "count": len(api.laureates),
+                    },
+                    "links": {},
+                }
+                if api.links and offset + limit < len(api.laureates):
+                    body["links"]["next"] = (
+                        f"{api.url}?offset={offset + limit}&limit={limit}"
+                    )
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/laureates"
+
+    def __enter__(self) -> "MockLaureatesAPI":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def bench_parallel_fetch(
+    n: int = 1000, page_size: int = 50, latency: float = 0.1
+) -> None:
+    """
+    сравнение последовательной и параллельной выгрузки страниц
+    с локального мок-сервера с задержкой latency на запрос
+    """
+    data = make_laureates(n)
+    print(f"Выгрузка {n} записей страницами по {page_size}, задержка {latency} c")
+    with MockLaureatesAPI(data, latency) as api:
+        expected = core.load_data(api.url, page_size)
+        sequential = timeit(lambda: core.load_data(api.url, page_size), 1)
+        print(f"  последовательно: {sequential:.3f} c")
+        for workers in (2, 4, 8, 16):
+            result = core.load_data(api.url, page_size, True, workers)
+            assert result == expected
+            parallel = timeit(
+                lambda: core.load_data(api.url, page_size, True, workers), 1
+            )
+            print(
+                f"  {workers:>2} потоков: {parallel:.3f} c, "
+                f"ускорение x{sequential / parallel:.2f}"
+            )
+
+
+def _reference_top_n(data: List[Dict], field: str, n: int = 5) -> List:
+    """прежняя реализация aggregations.top_n на словаре"""
+    counter = {}
+    for item in data:
+        value = item.get(field)
+        if value is not None:
+            counter[value] = counter.get(value, 0) + 1
+    return sorted(counter.items(), key=itemgetter(1), reverse=True)[:n]
+
+
+def _reference_countries_and_categories(data: List[Dict]) -> Any:
+    """прежние подсчеты analyze_countries_and_categories на Counter"""
+    all_countries = []
+    category_country_data = {}
+    for item in data:
+        country = item.get("country_now") or item.get("country_of_origin_adjusted")
+        if country:
+            all_countries.append(country)
+        for prize in item.get("prizes_relevant", []):
+            category = prize.get("category_en")
+            if category and country:
+                category_country_data.setdefault(category, []).append(country)
+    top_by_category = [
+        (category, Counter(countries).most_common(3))
+        for category, countries in category_country_data.items()
+    ]
+    return {
+        "top_countries": Counter(all_countries).most_common(5),
+        "top_by_category": top_by_category,
+    }
+
+
+def _reference_gender_trends(data: List[Dict]) -> Dict[str, List]:
+    """прежние подсчеты analyze_gender_trends на вложенных defaultdict"""
+    decade_gender_data = defaultdict(lambda: defaultdict(int))
+    category_gender_recent = defaultdict(lambda: defaultdict(int))
+    for item in data:
+        if item.get("type_") != "person":
+            continue
+        gender = item.get("gender")
+        for prize in item.get("prizes_relevant", []):
+            year = prize.get("award_year")
+            if year and gender:
+                decade_gender_data[(year // 10) * 10][gender] += 1
+                decade_gender_data[(year // 10) * 10]["total"] += 1
+            category = prize.get("category_en")
+            if (year or 0) >= 2000 and category and gender:
+                category_gender_recent[category][gender] += 1
+    decades = sorted(decade_gender_data)
+    return {
+        "decades": decades,
+        "women_counts": [decade_gender_data[d].get("female", 0) for d in decades],
+        "total_counts": [decade_gender_data[d]["total"] for d in decades],
+        "categories_recent": list(category_gender_recent),
+        "women_recent": [g.get("female", 0) for g in category_gender_recent.values()],
+        "total_recent": [sum(g.values()) for g in category_gender_recent.values()],
+    }
+
+
+def bench_group_by(n: int = 1000, replicas: int = 100) -> None:
+    """
+    сравнение подсчетов на group_by с прежними циклами на Counter/defaultdict
+    на наборе из n лауреатов, повторенном replicas раз (с проверкой совпадения)
+    """
+    from tables import LaureateTable
+
+    base = [core.get_laureate_data(l) for l in make_laureates(n)]
+    data = dataset_helpers.add_migration_field(base * replicas)
+    prizes = [prize for item in data for prize in item["prizes_relevant"]]
+    table = LaureateTable.from_records(data)
+    dataset_helpers.add_migration_field(table)
+
+    new_gender = dataset_helpers.count_gender_trends(data)
+    ref_gender = _reference_gender_trends(data)
+    assert all(new_gender[key] == value for key, value in ref_gender.items())
+    new_countries = dataset_helpers.count_countries_and_categories(data)
+    assert new_countries == _reference_countries_and_categories(data)
+    assert dataset_helpers.count_gender_trends(table) == new_gender
+    assert top_n(prizes, "category_en") == _reference_top_n(prizes, "category_en")
+
+    cases = [
+        (
+            "top_n",
+            lambda: _reference_top_n(prizes, "category_en"),
+            lambda: top_n(prizes, "category_en"),
+        ),
+        (
+            "страны",
+            lambda: _reference_countries_and_categories(data),
+            lambda: dataset_helpers.count_countries_and_categories(data),
+        ),
+        (
+            "гендер",
+            lambda: _reference_gender_trends(data),
+            lambda: dataset_helpers.count_gender_trends(data),
+        ),
+        (
+            "гендер*",
+            lambda: _reference_gender_trends(data),
+            lambda: dataset_helpers.count_gender_trends(table),
+        ),
+    ]
+    print(f"Группировки, {len(data)} лауреатов ({n} x {replicas}), * - LaureateTable")
+    for name, reference, grouped in cases:
+        old = timeit(reference)
+        new = timeit(grouped)
+        print(
+            f"  {name:<8} циклы: {old:.3f} c, group_by: {new:.3f} c, "
+            f"ускорение x{old / new:.2f}"
+        )
+
+
+def _separate_analyses(data: List[Dict]) -> Dict[str, Any]:
+    """подсчеты отчета отдельными проходами, как в ноутбуке"""
+    data_with_migration = dataset_helpers.add_migration_field(data)
+    return {
+        "summary": summarize_laureates(data),
+        "multiple": dataset_helpers.count_multiple_laureates(data),
+        "countries": dataset_helpers.count_countries_and_categories(
+            data_with_migration
+        ),
+        "age": dataset_helpers.count_age_by_category(
+            data, dataset_helpers.get_first_prize_age
+        ),
+        "gender": dataset_helpers.count_gender_trends(data),
+        "refusals": dataset_helpers.count_refusals(data),
+    }
+
+
+def bench_report(n: int = 1000, replicas: int = 100) -> None:
+    """
+    сравнение подсчетов отчета отдельными проходами и одним проходом
+    (report.run_analyses) на списке словарей и на LaureateTable
+    """
+    from tables import LaureateTable
+
+    data = [core.get_laureate_data(l) for l in make_laureates(n)] * replicas
+    table = LaureateTable.from_records(data)
+    separate = _separate_analyses(data)
+    assert report.run_analyses(data) == separate
+    assert report.run_analyses(table) == separate
+
+    print(f"Подсчеты отчета, {len(data)} лауреатов ({n} x {replicas})")
+    for name, records in (("список", data), ("таблица", table)):
+        old = timeit(lambda: _separate_analyses(records))
+        new = timeit(lambda: report.run_analyses(records))
+        print(
+            f"  {name:<8} 6 проходов: {old:.3f} c, один проход: {new:.3f} c, "
+            f"ускорение x{old / new:.2f}"
+        )
+
+    # из файла: отдельным проходам нужен весь набор в памяти, один проход
+    # читает JSONL потоком
+    import tempfile
+    import tracemalloc
+
+    import ingest
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "laureates.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for item in data:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        runs = (
+            ("6 проходов", lambda: _separate_analyses(list(ingest.iter_jsonl(path)))),
+            ("один проход", lambda: report.run_analyses(ingest.iter_jsonl(path))),
+        )
+        measured = []
+        for name, run in runs:
+            elapsed = timeit(run, 1)
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            measured.append(f"{name}: {elapsed:.3f} c, пик памяти {peak:.0f} МБ")
+        print(f"  из JSONL  {'; '.join(measured)}")
+
+
+def bench_incremental(n: int = 100_000, delta: int = 20) -> None:
+    """
+    полный пересчет отчета против обновления IncrementalReport
+    на delta новых, delta измененных и delta удаленных лауреатов
+    """
+    import copy
+
+    from incremental import IncrementalReport
+
+    data = [core.get_laureate_data(l) for l in make_laureates(n + delta)]
+    old, new = data[:n], copy.deepcopy(data[delta:])
+    for item in new[:delta]:
+        item["name"] = f"{item['name']} (изм.)"
+
+    start = time.perf_counter()
+    state = IncrementalReport()
+    state.update(old)
+    build = time.perf_counter() - start
+
+    full = timeit(lambda: report.run_analyses(new), 1)
+    start = time.perf_counter()
+    delta_counts = state.update(new)
+    update = time.perf_counter() - start
+    results = timeit(state.results, 1)
+    assert state.results() == report.run_analyses(new)
+
+    # изменения, известные заранее, без сравнения с прошлой выгрузкой
+    changed = copy.deepcopy(new[:delta])
+    for item in changed:
+        item["name"] = f"{item['name']} (изм. 2)"
+    start = time.perf_counter()
+    state.apply(changed=changed)
+    apply = time.perf_counter() - start
+
+    print(f"Инкрементный отчет, {n} лауреатов, изменения: {delta_counts}")
+    print(f"  построение состояния: {build:.3f} c (один раз)")
+    print(f"  полный пересчет: {full:.3f} c")
+    print(
+        f"  обновление (сравнение + изменения): {update:.3f} c, "
+        f"чтение результатов: {results:.3f} c, "
+        f"ускорение x{full / (update + results):.2f}"
+    )
+    print(f"  только изменения ({delta} записей, без сравнения): {apply:.4f} c")
+
+
+def bench_sharded(n: int = 200_000, workers: Optional[List[int]] = None) -> None:
+    """
+    масштабирование parallel.get_laureate_data_parallel по числу процессов
+    (по умолчанию 1, 2, 4, ... до числа ядер), с сохранением порядка и без
+    """
+    import os
+
+    import parallel
+
+    cores = os.cpu_count() or 1
+    if workers is None:
+        workers = [w for w in (1, 2, 4, 8, 16, 32, 64) if w < cores] + [cores]
+    data = make_laureates(n)
+    expected = [core.get_laureate_data(l) for l in data]
+    serial = timeit(lambda: [core.get_laureate_data(l) for l in data], 1)
+
+    print(f"Обработка {n} лауреатов по процессам (ядер: {cores})")
+    print(f"  последовательно: {serial:.3f} c")
+    for count in workers:
+        for ordered in (True, False):
+            result = parallel.get_laureate_data_parallel(
+                data, count, ordered=ordered, threshold=0
+            )
+            if ordered:
+                assert result == expected
+            else:
+                assert len(result) == len(expected)
+            elapsed = timeit(
+                lambda: parallel.get_laureate_data_parallel(
+                    data, count, ordered=ordered, threshold=0
+                ),
+                1,
+            )
+            mode = "по порядку" if ordered else "без порядка"
+            print(
+                f"  {count:>2} процессов, {mode:<11}: {elapsed:.3f} c, "
+                f"ускорение x{serial / elapsed:.2f}"
+            )
+
+
+def bench_ingest(sizes: Tuple[int, ...] = (10_000, 100_000)) -> None:
+    """
+    потоковая обработка файлов (ingest.ingest) разного размера:
+    время и пик памяти Python (tracemalloc) - пик не должен расти с размером
+    """
+    import os
+    import tempfile
+    import tracemalloc
+
+    import ingest
+
+    print(f"Потоковая обработка файлов (ijson: {ingest.ijson is not None})")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            inputs = {
+                "jsonl": os.path.join(directory, f"{n}.jsonl"),
+                "json": os.path.join(directory, f"{n}.json"),
+            }
+            rng = random.Random(0)
+            with open(inputs["jsonl"], "w", encoding="utf-8") as f:
+                for i in range(n):
+                    f.write(json.dumps(make_laureate(i, rng)) + "\n")
+            # ответ АПИ: {"laureates": [...], "meta": {...}}
+            with open(inputs["json"], "w", encoding="utf-8") as f:
+                f.write('{"laureates": [')
+                rng = random.Random(0)
+                for i in range(n):
+                    f.write(("," if i else "") + json.dumps(make_laureate(i, rng)))
+                f.write(f'], "meta": {{"count": {n}}}}}')
+
+            output = os.path.join(directory, "out.jsonl")
+            for fmt, path in inputs.items():
+                size_mb = os.path.getsize(path) / 2**20
+                elapsed = timeit(lambda: ingest.ingest(path, output), 1)
+                # пик памяти - отдельным запуском, tracemalloc сильно замедляет
+                tracemalloc.start()
+                total = ingest.ingest(path, output)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                assert total == n
+                print(
+                    f"  {fmt:<5} {n:>7} записей ({size_mb:.0f} МБ): {elapsed:.2f} c, "
+                    f"пик памяти {peak / 2**20:.1f} МБ"
+                )
+
+
+def bench_render(n: int = 3000, slices: int = 4) -> None:
+    """
+    подсчеты отчета на slices кусках данных отдельно от рисования
+    и рисование графиков в файлы в одном процессе и в пуле процессов
+    """
+    import tempfile
+
+    data = [core.get_laureate_data(l) for l in make_laureates(n * slices)]
+    parts = [data[i * n : (i + 1) * n] for i in range(slices)]
+    compute = timeit(lambda: [report.run_analyses(part) for part in parts], 1)
+    print(f"Отчет по {slices} кускам из {n} лауреатов")
+    print(f"  подсчеты: {compute:.3f} c")
+
+    results = [report.run_analyses(part) for part in parts]
+    with tempfile.TemporaryDirectory() as directory:
+
+        def render(workers: int) -> None:
+            for i, result in enumerate(results):
+                renderer = report.FigureRenderer(
+                    f"{directory}/{i}", max_workers=workers
+                )
+                report.render_report(result, renderer)
+
+        serial = timeit(lambda: render(1), 1)
+        print(f"  графики в 1 процессе: {serial:.3f} c")
+        for workers in (2, 4):
+            parallel = timeit(lambda: render(workers), 1)
+            print(
+                f"  графики в {workers} процессах: {parallel:.3f} c, "
+                f"ускорение x{serial / parallel:.2f}"
+            )
+
+        # кеш графиков: первый прогон рисует и сохраняет, повторный копирует
+        # файлы; затем меняется один анализ - перерисовывается только он
+        from figure_cache import FigureCache
+
+        cache = FigureCache(f"{directory}/cache")
+
+        def render_cached(result: Dict[str, Any]) -> None:
+            renderer = report.FigureRenderer(
+                f"{directory}/cached", max_workers=1, cache=cache
+            )
+            report.render_report(result, renderer)
+
+        cold = timeit(lambda: render_cached(results[0]), 1)
+        warm = timeit(lambda: render_cached(results[0]))
+        changed = dict(results[0], age=results[1]["age"])
+        one = timeit(lambda: render_cached(changed), 1)
+        print(
+            f"  кеш графиков: первый прогон {cold:.3f} c, повторный {warm:.4f} c, "
+            f"с одним измененным анализом {one:.3f} c"
+        )
+
+
+def bench_profiling(n: int = 100_000) -> None:
+    """
+    цена инструментирования: обработка записей и отчет без замеров,
+    с замерами и счетчиками полей и с tracemalloc
+    """
+    import profiling
+
+    raw = make_laureates(n)
+    data = [core.get_laureate_data(l) for l in raw]
+
+    def work() -> None:
+        with profiling.span("process", records=n):
+            [core.get_laureate_data(l) for l in raw]
+        report.run_analyses(data)
+
+    print(f"Инструментирование на {n} лауреатах (обработка + отчет)")
+    base = timeit(work, 1)
+    print(f"  выключено: {base:.3f} c")
+    for label, memory in (("замеры и счетчики полей", False), ("с tracemalloc", True)):
+        profiling.enable(memory=memory)
+        try:
+            elapsed = timeit(work, 1)
+        finally:
+            profiling.disable()
+        print(f"  {label}: {elapsed:.3f} c, x{elapsed / base:.2f}")
+
+
+def bench_records(n: int = 100_000) -> None:
+    """
+    лауреаты словарями (get_laureate_data) и записями records
+    (get_laureate_record): память, обработка, доступ к полю и отчет.
+    сырые данные проходят через json, как ответ АПИ, - иначе строки
+    генератора уже общие и интернирование не видно
+    """
+    import tracemalloc
+
+    raw = json.loads(json.dumps(make_laureates(n)))
+    print(f"Словари и записи на {n} лауреатах")
+    results = {}
+    for label, process in (
+        ("словари", core.get_laureate_data),
+        ("записи", core.get_laureate_record),
+    ):
+        gc.collect()
+        tracemalloc.start()
+        data = [process(l) for l in raw]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        build = timeit(lambda: [process(l) for l in raw])
+        get = timeit(lambda: [item.get("country_now") for item in data])
+        analyses = timeit(lambda: report.run_analyses(data), 1)
+        print(
+            f"  {label}: {size / n:.0f} байт/лауреат, обработка {build:.3f} c, "
+            f".get {get:.4f} c, отчет {analyses:.3f} c"
+        )
+        results[label] = data
+    records = results["записи"]
+    attribute = timeit(lambda: [item.country_now for item in records])
+    print(f"  записи, доступ атрибутом: {attribute:.4f} c")
+
+
+def bench_vocabulary(n: int = 100_000) -> None:
+    """
+    интернирование категориальных полей при извлечении: память
+    обработанных лауреатов, Counter по стране и колонки для group_by
+    со словарем поля и без него. сырые данные проходят через json,
+    как ответ АПИ
+    """
+    import tracemalloc
+    from collections import Counter
+
+    from json_dict_processing import create_processor
+    from tables import columns_of
+    from vocabulary import CATEGORICAL_FIELDS
+
+    text = json.dumps([l for l in make_laureates(n) if "knownName" in l])
+    persons = json.loads(text)
+    print(f"Словари категориальных полей на {len(persons)} людях")
+    results = {}
+    variants = (("без словарей", ()), ("со словарями", CATEGORICAL_FIELDS))
+    for label, categorical in variants:
+        process = create_processor(CONFIG_PERSON, categorical=categorical)
+        # память - то, что остается после разбора ответа и обработки,
+        # когда сырые данные уже освобождены
+        gc.collect()
+        tracemalloc.start()
+        data = [process(l) for l in json.loads(text)]
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        build = timeit(lambda: [process(l) for l in persons])
+        values = [item["country_now"] for item in data]
+        counter = timeit(lambda: Counter(values), 5)
+        print(
+            f"  {label}: {size / len(persons):.0f} байт/лауреат, "
+            f"обработка {build:.3f} c, Counter по стране {counter:.4f} c"
+        )
+        results[label] = data
+    data = results["со словарями"]
+    fields = ("country_now", "gender")
+    prize_fields = ("category_en",)
+    encoded = timeit(lambda: columns_of(results["без словарей"], fields, prize_fields))
+    coded = timeit(lambda: columns_of(data, fields, prize_fields))
+    print(f"  columns_of: {encoded:.3f} c без словарей, {coded:.3f} c со словарями")
+
+
+
+def bench_indexes(n: int = 100_000, queries: int = 100) -> None:
+    """
+    выборки по вторичным индексам (indexes.LaureateIndex) против прохода
+    по списку: построение индекса, count_refusals, count_multiple_laureates
+    и выборка женщин-лауреатов по категории с 2000 года
+    """
+    from indexes import Between, LaureateIndex
+
+    data = [core.get_laureate_data(l) for l in make_laureates(n)]
+    print(f"Вторичные индексы на {n} лауреатах")
+    index = LaureateIndex(data)
+    build = timeit(lambda: LaureateIndex(data), 1)
+    print(f"  построение индекса: {build:.3f} c")
+
+    def scan_women() -> List[Dict]:
+        return [
+            item
+            for item in data
+            if item.get("gender") == "female"
+            and any(
+                p.get("category_en") == "Physics" and (p.get("award_year") or 0) >= 2000
+                for p in item.get("prizes_relevant", [])
+            )
+        ]
+
+    def indexed_women() -> List[Dict]:
+        return index.laureates(
+            gender="female", category_en="Physics", award_year=Between(2000)
+        )
+
+    count_refusals = dataset_helpers.count_refusals
+    count_multiple = dataset_helpers.count_multiple_laureates
+    for label, scan, indexed in (
+        ("отказы", lambda: count_refusals(data), lambda: count_refusals(index)),
+        (
+            "мультилауреаты",
+            lambda: count_multiple(data),
+            lambda: count_multiple(index),
+        ),
+        ("женщины, физика, 2000+", scan_women, indexed_women),
+    ):
+        assert indexed() == scan()
+        scan_time = timeit(lambda: [scan() for _ in range(queries)], 1) / queries
+        index_time = timeit(lambda: [indexed() for _ in range(queries)], 1) / queries
+        print(
+            f"  {label}: проход {scan_time * 1000:.2f} мс, "
+            f"индекс {index_time * 1000:.3f} мс (x{scan_time / index_time:.0f})"
+        )
+
+
+
+def bench_derived(n: int = 100_000) -> None:
+    """
+    производные поля (derived): add_migration_field через стадию -
+    первый вызов, повторный и повторный после правки одного лауреата -
+    против прежнего пересчета всех лауреатов на каждый вызов
+    """
+    from dataset_helpers import country_of_origin
+    from derived import release
+
+    def recompute(data: List[Dict]) -> None:
+        for item in data:
+            item["country_of_origin_adjusted"] = country_of_origin(item)
+            item["has_migrated"] = (
+                item.get("country_of_origin_adjusted")
+                and item.get("country_now")
+                and item["country_of_origin_adjusted"] != item["country_now"]
+            )
+
+    base = [core.get_laureate_data(l) for l in make_laureates(n)]
+    print(f"Производные поля на {n} лауреатах")
+    data = [dict(item) for item in base]
+    full = timeit(lambda: recompute(data))
+
+    def from_scratch() -> None:
+        release(data)
+        dataset_helpers.add_migration_field(data)
+
+    first = timeit(from_scratch)
+    again = timeit(lambda: dataset_helpers.add_migration_field(data))
+
+    def edit_one() -> None:
+        data[n // 2]["country_now"] = data[n // 2 - 1].get("country_now")
+        dataset_helpers.add_migration_field(data)
+
+    edited = timeit(edit_one)
+    print(
+        f"  add_migration_field: пересчет всех {full:.3f} c; стадия: первый "
+        f"{first:.3f} c, повторный {again:.3f} c, после правки {edited:.3f} c"
+    )
+
+
+def bench_pipeline(
+    n: int = 3000, page_size: int = 100, latency: float = 0.05, workers: int = 8
+) -> None:
+    """
+    конвейер pipeline (выгрузка, разбор, обработка и анализы одновременно)
+    против load_data с последующим run_analyses на мок-сервере
+    с задержкой latency на запрос
+    """
+    import pipeline
+
+    def staged() -> Dict[str, Any]:
+        data = core.load_data(api.url, page_size, True, workers)
+        return report.run_analyses(data)
+
+    data = make_laureates(n)
+    print(
+        f"Конвейер на {n} записях страницами по {page_size}, "
+        f"задержка {latency} c, {workers} запросов одновременно"
+    )
+    with MockLaureatesAPI(data, latency) as api:
+        expected = core.load_data(api.url, page_size)
+        result = pipeline.run_pipeline(api.url, page_size, max_fetches=workers)
+        assert result.laureates == expected
+        assert repr(result.results) == repr(report.run_analyses(expected))
+        sequential = timeit(
+            lambda: report.run_analyses(core.load_data(api.url, page_size)), 1
+        )
+        parallel = timeit(staged)
+        piped = timeit(
+            lambda: pipeline.run_pipeline(api.url, page_size, max_fetches=workers)
+        )
+        print(
+            f"  последовательно {sequential:.3f} c, load_data(parallel) + "
+            f"run_analyses {parallel:.3f} c, конвейер {piped:.3f} c "
+            f"(x{parallel / piped:.2f})"
+        )
+        pipeline.print_metrics(result)
+
+
+def bench_result_cache(n: int = 100_000) -> None:
+    """
+    кеш результатов анализов (result_cache): run_analyses без кеша,
+    с промахом и с попаданием, отдельно - цена отпечатка набора
+    """
+    import shutil
+    import tempfile
+
+    import result_cache
+
+    data = [core.get_laureate_data(l) for l in make_laureates(n)]
+    print(f"Кеш результатов анализов на {n} лауреатах")
+    expected = report.run_analyses(data)
+    plain = timeit(lambda: report.run_analyses(data))
+    fingerprint = timeit(lambda: result_cache.dataset_fingerprint(data))
+    directory = tempfile.mkdtemp()
+    try:
+        with result_cache.cached(directory) as cache:
+            miss = timeit(lambda: report.run_analyses(data), 1)
+            hit = timeit(lambda: report.run_analyses(data))
+            assert repr(report.run_analyses(data)) == repr(expected)
+            assert cache.misses == 1
+    finally:
+        shutil.rmtree(directory)
+    print(
+        f"  run_analyses: без кеша {plain:.3f} c, промах {miss:.3f} c, "
+        f"попадание {hit:.3f} c (отпечаток {fingerprint:.3f} c), "
+        f"x{plain / hit:.1f}"
+    )
+
+
+def import_time(module: str, repeat: int = 3) -> Tuple[float, List[str]]:
+    """
+    время импорта модуля в новом интерпретаторе по -X importtime
+
+    Returns:
+        лучшее из repeat время в мс и загруженные при импорте
+        зависимости из LAZY_DEPENDENCIES
+    """
+    best = float("inf")
+    loaded: List[str] = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        # строки вида "import time: self [us] | cumulative | имя модуля"
+        names = []
+        for line in proc.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name = parts[2].strip()
+            names.append(name)
+            if name == module:
+                best = min(best, int(parts[1]) / 1000)
+        loaded = [dep for dep in LAZY_DEPENDENCIES if dep in names]
+    return best, loaded
+
+
+def bench_import_time(budgets: Dict[str, float] = IMPORT_BUDGET_MS) -> bool:
+    """
+    время импорта модулей против бюджета IMPORT_BUDGET_MS
+
+    Returns:
+        True, если все модули уложились в бюджет
+    """
+    print("Время импорта, мс")
+    ok = True
+    for module, budget in budgets.items():
+        elapsed, loaded = import_time(module)
+        status = "ok" if elapsed <= budget else "ПРЕВЫШЕН"
+        ok = ok and elapsed <= budget
+        extra = f", загружены {', '.join(loaded)}" if loaded else ""
+        print(f"  {module}: {elapsed:.1f} из {budget} ({status}{extra})")
+    return ok
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["imports"]:
+        # python benchmarks.py imports - только проверка бюджета импорта
+        sys.exit(0 if bench_import_time() else 1)
+    bench_import_time()
+    bench_compiled_plan()
+    bench_parallel_fetch()
+    bench_group_by()
+    bench_report()
+    bench_render()
+    bench_incremental()
+    bench_sharded()
+    bench_ingest()
+    bench_profiling()
+    bench_records()
+    bench_vocabulary()
+    bench_indexes()
+    bench_derived()
+    bench_pipeline()
+    bench_result_cache()
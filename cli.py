@@ -0,0 +1,145 @@
+import argparse
+import sys
+from typing import List, Optional
+
+# точка входа командной строки:
+#   python cli.py fetch                      загрузка лауреатов из АПИ
+#   python cli.py fetch --pipeline           то же конвейером сразу с отчетом
+#   python cli.py ingest INPUT OUTPUT ...    потоковая обработка файла
+#   python cli.py report INPUT ...           отчет по обработанным лауреатам
+# с --profile / --trace PATH / --trace-memory перед командой - замеры этапов
+# (см. profiling)
+# модули команд импортируются только при запуске самой команды, поэтому
+# запуск и --help не ждут загрузки requests, numpy и matplotlib
+# (бюджет времени импорта - см. benchmarks.IMPORT_BUDGET_MS)
+
+
+def _fetch(args: argparse.Namespace) -> None:
+    if not args.pipeline:
+        import core
+
+        core.main()
+        return
+
+    import pipeline
+    import report
+
+    result = pipeline.run_pipeline(keep=False)
+    report.render_report(result.results, report.TextRenderer())
+    pipeline.print_metrics(result, sys.stderr)
+
+
+def _ingest(args: argparse.Namespace) -> None:
+    import ingest
+
+    total = ingest.ingest(
+        args.input, args.output, args.batch_size, args.fmt, args.prefix
+    )
+    print(f"Обработано лауреатов: {total}")
+
+
+def _report(args: argparse.Namespace) -> None:
+    import ingest
+    import report
+
+    if args.format == "text":
+        renderer = report.TextRenderer()
+    elif args.format == "json":
+        renderer = report.JsonRenderer(args.output)
+    else:
+        cache = None
+        if args.figure_cache:
+            from figure_cache import FigureCache
+
+            cache = FigureCache(args.figure_cache)
+        renderer = report.FigureRenderer(args.output or "figures", cache=cache)
+    if args.result_cache:
+        import result_cache
+
+        result_cache.enable(args.result_cache)
+    records = ingest.iter_jsonl(args.input)
+    rendered = report.run_report(records, args.names, renderer)
+    if isinstance(rendered, str):
+        print(rendered)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="лауреаты Нобелевской премии")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="замерить этапы и извлечение полей, сводку напечатать в stderr",
+    )
+    parser.add_argument(
+        "--trace", metavar="PATH", help="записать замеры в формате Chrome trace"
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="отслеживать память через tracemalloc (медленно)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch = commands.add_parser("fetch", help="загрузить и обработать лауреатов")
+    fetch.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="конвейером: загрузка, обработка и анализы одновременно, "
+        "вывести отчет и замеры этапов",
+    )
+    fetch.set_defaults(handler=_fetch)
+
+    ingest = commands.add_parser(
+        "ingest", help="потоковая обработка лауреатов из JSONL/JSON в JSONL"
+    )
+    ingest.add_argument("input", help="входной файл: JSONL, JSON-массив или ответ АПИ")
+    ingest.add_argument("output", help="выходной файл JSONL")
+    # то же значение, что ingest.DEFAULT_BATCH_SIZE (модуль здесь не импортируем)
+    ingest.add_argument("--batch-size", type=int, default=1000)
+    ingest.add_argument("--format", choices=("jsonl", "json"), dest="fmt")
+    ingest.add_argument(
+        "--prefix", help='путь к массиву для JSON, например "laureates.item"'
+    )
+    ingest.set_defaults(handler=_ingest)
+
+    report = commands.add_parser(
+        "report", help="отчет по обработанным лауреатам из JSONL (вывод ingest)"
+    )
+    report.add_argument("input", help="файл JSONL с обработанными лауреатами")
+    report.add_argument(
+        "--format", choices=("text", "json", "figures"), default="text"
+    )
+    report.add_argument(
+        "--output", help="файл для json или папка для figures (по умолчанию figures)"
+    )
+    report.add_argument(
+        "--names", nargs="+", help="какие анализы выводить (по умолчанию все)"
+    )
+    report.add_argument(
+        "--figure-cache",
+        metavar="DIR",
+        help="кеш графиков для figures: неизмененные графики берутся из DIR",
+    )
+    report.add_argument(
+        "--result-cache",
+        metavar="DIR",
+        help="кеш результатов анализов: на тех же данных они берутся из DIR",
+    )
+    report.set_defaults(handler=_report)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    if not (args.profile or args.trace or args.trace_memory):
+        args.handler(args)
+        return
+
+    import profiling
+
+    with profiling.profiled(memory=args.trace_memory, trace_path=args.trace):
+        args.handler(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,8 +1,29 @@
-import requests
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Union
+
+import profiling
+from http_cache import ResponseCache
 from laureates_configs import process_persons, process_orgs
+from lazy import lazy_module
+from records import Organization, Person, process_org_record, process_person_record
 
-# URL API Нобелевской премии
-URL_LAUREATES = "https://api.nobelprize.org/2.1/laureates?limit=1200"
+# requests нужен только для загрузки из АПИ, обработке записей он не нужен
+requests = lazy_module("requests")
+
+# URL API Нобелевской премии (limit и offset - параметрами запроса)
+URL_LAUREATES_API = "https://api.nobelprize.org/2.1/laureates"
+# страница для потоковой выгрузки (iter_laureates)
+PAGE_SIZE = 100
+# страница для load_data: список нужен целиком, поэтому весь набор
+# (~1000 лауреатов) приходит одним запросом, как раньше с limit=1200;
+# если лауреатов станет больше, остаток догрузится по links.next
+LOAD_PAGE_SIZE = 1200
+MAX_WORKERS = 8
+RETRIES = 3
+BACKOFF = 0.5
 
 
 def get_laureate_data(laureate: dict) -> dict:
@@ -28,34 +49,240 @@ def get_laureate_data(laureate: dict) -> dict:
     return processed
 
 
-def load_data():
+def get_laureate_record(laureate: dict) -> Union[Person, Organization, dict]:
+    """
+    то же, что get_laureate_data, но лауреаты и призы - компактные
+    записи records.Person / records.Organization / records.Prize
+    со словарным доступом (неизвестный тип - по-прежнему словарь).
+    записи экономят только память: анализы читают поля через .get,
+    а у записей он медленнее, чем у словаря, поэтому отчет по ним
+    считается дольше
+    """
+    if "knownName" in laureate:
+        processed = process_person_record(laureate)
+        processed.type_ = "person"
+    elif "orgName" in laureate:
+        processed = process_org_record(laureate)
+        processed.type_ = "organization"
+    else:
+        return {"id": laureate.get("id", "unknown"), "type_": "unknown"}
+    return processed
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    повторять стоит только временные сбои: обрыв соединения, таймаут,
+    ответ 5xx или 429 (слишком много запросов). остальные 4xx (404, 400)
+    повтор не исправит - они сразу уходят вызывающему
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return False
+
+
+def _get_json(
+    session: requests.Session,
+    url: str,
+    params: Optional[dict] = None,
+    retries: int = RETRIES,
+    backoff: float = BACKOFF,
+    cache: Optional[ResponseCache] = None,
+) -> dict:
+    """
+    GET-запрос с повторами: при временной ошибке (см. _is_retryable)
+    ждет backoff, 2*backoff, 4*backoff... и пробует снова.
+    если передан cache, страница берется через дисковый кеш.
+    """
+    for attempt in range(retries + 1):
+        try:
+            if cache is not None:
+                with profiling.span("fetch", url=url, params=params, cache=True):
+                    return cache.get_json(session, url, params)
+            with profiling.span("fetch", url=url, params=params):
+                response = session.get(url, params=params)
+                response.raise_for_status()
+            with profiling.span("decode", bytes=len(response.content)):
+                return response.json()
+        except requests.RequestException as error:
+            if attempt == retries or not _is_retryable(error):
+                raise
+            time.sleep(backoff * 2**attempt)
+
+
+def _get_content(
+    session: requests.Session,
+    url: str,
+    params: Optional[dict] = None,
+    retries: int = RETRIES,
+    backoff: float = BACKOFF,
+) -> bytes:
+    """
+    как _get_json, но без кеша и разбора: тело ответа байтами,
+    чтобы разбирать его отдельно (см. pipeline)
+    """
+    for attempt in range(retries + 1):
+        try:
+            with profiling.span("fetch", url=url, params=params):
+                response = session.get(url, params=params)
+                response.raise_for_status()
+            return response.content
+        except requests.RequestException as error:
+            if attempt == retries or not _is_retryable(error):
+                raise
+            time.sleep(backoff * 2**attempt)
+
+
+def _make_session(pool_size: int) -> requests.Session:
+    """сессия с пулом keep-alive соединений нужного размера"""
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def iter_laureate_pages(
+    url: str = URL_LAUREATES_API,
+    page_size: int = PAGE_SIZE,
+    cache: Optional[ResponseCache] = None,
+) -> Iterator[List[dict]]:
+    """
+    функция постранично выгружает сырых лауреатов из АПИ (offset/limit),
+    переходя по ссылке links.next, а если ее нет - по meta.
+
+    Args:
+        url: адрес эндпоинта лауреатов
+        page_size: сколько записей запрашивать за раз
+        cache: дисковый кеш ответов (None - всегда качать из сети)
+
+    Yields:
+        список сырых лауреатов очередной страницы
+    """
+    params: Optional[dict] = {"offset": 0, "limit": page_size}
+    with _make_session(1) as session:
+        while url:
+            page = _get_json(session, url, params, cache=cache)
+            laureates = page.get("laureates", [])
+            if not laureates:
+                return
+            yield laureates
+
+            next_url = page.get("links", {}).get("next")
+            if next_url:
+                # в ссылке уже есть offset и limit
+                url, params = next_url, None
+                continue
+
+            meta = page.get("meta", {})
+            offset = meta.get("offset", 0) + meta.get("limit", len(laureates))
+            if "count" not in meta or offset >= meta["count"]:
+                return
+            params = {"offset": offset, "limit": page_size}
+
+
+def fetch_laureate_pages_parallel(
+    url: str = URL_LAUREATES_API,
+    page_size: int = PAGE_SIZE,
+    max_workers: int = MAX_WORKERS,
+    retries: int = RETRIES,
+    backoff: float = BACKOFF,
+    cache: Optional[ResponseCache] = None,
+) -> List[List[dict]]:
+    """
+    функция выгружает все страницы параллельно: по meta первой страницы
+    узнает общее количество записей, остальные страницы запрашивает
+    пулом потоков через общую сессию и собирает их в исходном порядке.
+
+    Args:
+        url: адрес эндпоинта лауреатов
+        page_size: сколько записей запрашивать за раз
+        max_workers: сколько страниц качать одновременно
+        retries: число повторов запроса страницы при ошибке
+        backoff: базовая пауза перед повтором, в секундах
+        cache: дисковый кеш ответов (None - всегда качать из сети)
+
+    Returns:
+        список страниц (списков сырых лауреатов) в порядке offset
+    """
+    with _make_session(max_workers) as session:
+        params = {"offset": 0, "limit": page_size}
+        first = _get_json(session, url, params, retries, backoff, cache)
+        pages = [first.get("laureates", [])]
+        meta = first.get("meta", {})
+        # сервер может урезать limit - шагаем по тому, что он вернул
+        step = meta.get("limit") or page_size
+        total = meta.get("count", len(pages[0]))
+
+        def fetch_page(offset: int) -> List[dict]:
+            params = {"offset": offset, "limit": step}
+            page = _get_json(session, url, params, retries, backoff, cache)
+            return page.get("laureates", [])
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # map сохраняет порядок offset независимо от порядка ответов
+            pages.extend(pool.map(fetch_page, range(step, total, step)))
+    return pages
+
+
+def iter_laureates(
+    url: str = URL_LAUREATES_API,
+    page_size: int = PAGE_SIZE,
+    cache: Optional[ResponseCache] = None,
+) -> Iterator[dict]:
     """
-    функция загружает и возвращает список обработанных лауреатов для ноутбука
+    функция отдает обработанных лауреатов по мере загрузки страниц,
+    не дожидаясь выгрузки всего набора
     """
-    response = requests.get(URL_LAUREATES)
-    response.raise_for_status()
-    raw = response.json()
-    return [get_laureate_data(l) for l in raw["laureates"]]
+    for page in iter_laureate_pages(url, page_size, cache):
+        # страница обрабатывается целиком, чтобы в замер не попадало
+        # время потребителя между yield
+        with profiling.span("process", records=len(page)):
+            processed = [get_laureate_data(laureate) for laureate in page]
+        yield from processed
+
+
+def load_data(
+    url: str = URL_LAUREATES_API,
+    page_size: int = LOAD_PAGE_SIZE,
+    parallel: bool = False,
+    max_workers: int = MAX_WORKERS,
+    cache: Optional[ResponseCache] = None,
+):
+    """
+    функция загружает и возвращает список обработанных лауреатов для ноутбука.
+    по умолчанию - одним запросом на весь набор; мелкие страницы нужны
+    только потоковой обработке (iter_laureates) и параллельной загрузке.
+    при parallel=True страницы качаются одновременно (fetch_laureate_pages_parallel),
+    с cache=ResponseCache() повторные запуски ходят в сеть только за изменениями
+    """
+    if parallel:
+        pages = fetch_laureate_pages_parallel(
+            url, page_size, max_workers, cache=cache
+        )
+        with profiling.span("process", records=sum(map(len, pages))):
+            return [get_laureate_data(l) for page in pages for l in page]
+    return list(iter_laureates(url, page_size, cache))
 
 
 # для запуска из терминала
 def main():
     print("Выгрузка данных из АПИ о лауреатах...")
-    laureates_response = requests.get(URL_LAUREATES)
-    laureates_response.raise_for_status()
-    laureates = laureates_response.json()
-
-    print(f"Выгружено из АПИ {len(laureates['laureates'])} записей о лауретах")
-
-    laureates_data = []
-    for laureate in laureates["laureates"]:
-        processed = get_laureate_data(laureate)
-        laureates_data.append(processed)
+    total = 0
+    first_laureates = []
+    for processed in iter_laureates():
+        total += 1
+        # выведу первых 2-х
+        if len(first_laureates) < 2:
+            first_laureates.append(processed)
 
-    print(f"Обработано {len(laureates_data)} записей о лауреатах")
+    print(f"Обработано {total} записей о лауреатах")
 
-    # выведу первых 2-х
-    for i, item in enumerate(laureates_data[:2]):
+    for i, item in enumerate(first_laureates):
         print(f"\nЛауреат {i+1}")
         print(item)
 
@@ -1,29 +1,42 @@
-import matplotlib.pyplot as plt
-import numpy as np
+from __future__ import annotations
+
 from collections import Counter, defaultdict
 import statistics
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
 
+from aggregations import RecordAccumulator, accumulate, group_by, top_k
+from derived import derived_field, derived_fields
+from indexes import Between, LaureateIndex
+from lazy import lazy_module
+from result_cache import memoized
 
-def add_migration_field(data: List[Dict]) -> List[Dict]:
-    """для анализа миграции"""
+# pyplot нужен только графикам, а грузится дольше всего остального
+plt = lazy_module("matplotlib.pyplot")
+np = lazy_module("numpy")
 
-    def get_country_of_origin(item: Dict) -> str:
-        if item.get("type_") == "person":
-            return item.get("country_birth")
-        elif item.get("type_") == "organization":
-            return item.get("country_founded")
-        return None
 
-    for item in data:
-        item["country_of_origin_adjusted"] = get_country_of_origin(item)
-        item["has_migrated"] = (
-            item.get("country_of_origin_adjusted")
-            and item.get("country_now")
-            and item["country_of_origin_adjusted"] != item["country_now"]
-        )
+def country_of_origin(item: Dict) -> Optional[str]:
+    """страна рождения человека или основания организации"""
+    if item.get("type_") == "person":
+        return item.get("country_birth")
+    elif item.get("type_") == "organization":
+        return item.get("country_founded")
+    return None
 
-    return data
+
+# поля, которые дописывает add_migration_field
+MIGRATION_FIELDS = ("country_of_origin_adjusted", "has_migrated")
+
+
+def add_migration_field(data: List[Dict]) -> List[Dict]:
+    """
+    для анализа миграции. поля считаются стадией derived_fields:
+    при повторном вызове на том же списке пересчитываются и пишутся
+    только лауреаты с изменившимися странами или типом
+    """
+    stage = derived_fields(data)
+    stage.refresh()
+    return stage.materialize(MIGRATION_FIELDS)
 
 
 def get_first_prize_age(item, prize):
@@ -39,244 +52,470 @@ def get_first_prize_age(item, prize):
     return None
 
 
-def analyze_multiple_laureates(data: List[Dict]):
-    """мультилауреаты"""
-    print(f"Всего лауреатов: {len(data)}")
-    data_with_migration = add_migration_field(data)
-
-    multi_laureates = [
-        item
-        for item in data_with_migration
-        if len(item.get("prizes_relevant", [])) >= 2
-    ]
-    print(f"Лауреатов с ≥2 призами: {len(multi_laureates)}")
+# производные поля (см. derived): функции получают значения входов
 
-    super_multi = [
-        item
-        for item in data_with_migration
-        if len(item.get("prizes_relevant", [])) >= 3
-    ]
 
-    two_time_laureates = [
-        item
-        for item in data_with_migration
-        if len(item.get("prizes_relevant", [])) == 2
-    ]
+@derived_field(
+    "country_of_origin_adjusted", ("type_", "country_birth", "country_founded")
+)
+def _origin_field(type_, country_birth, country_founded) -> Optional[str]:
+    if type_ == "person":
+        return country_birth
+    elif type_ == "organization":
+        return country_founded
+    return None
 
-    same_category_count = 0
-    time_differences = []
-    same_category_laureates = []
-    different_category_laureates = []
 
-    for laureate in two_time_laureates:
-        prizes = sorted(
-            laureate.get("prizes_relevant", []), key=lambda x: x.get("award_year", 0)
-        )
-
-        if len(prizes) >= 2:
-            first_prize = prizes[0]
-            second_prize = prizes[1]
-
-            if first_prize.get("category_en") == second_prize.get("category_en"):
-                same_category_count += 1
-                same_category_laureates.append(
-                    laureate.get("name", "Неизвестно")
-                )  # Добавляем имя
-            else:
-                different_category_laureates.append(
-                    laureate.get("name", "Неизвестно")
-                )  # Добавляем имя
-
-            year1 = first_prize.get("award_year")
-            year2 = second_prize.get("award_year")
-            if year1 and year2:
-                time_differences.append(year2 - year1)
-
-    print("\n--- Имена лауреатов ---")
-    print(f"\nВсе мульти-лауреаты (2+ приза):")
-    for laureate in multi_laureates:
-        print(
-            f"  - {laureate.get('name', 'Неизвестно')} (Количество призов: {len(laureate.get('prizes_relevant', []))})"
-        )
+@derived_field("has_migrated", ("country_of_origin_adjusted", "country_now"))
+def _migrated_field(country_of_origin_adjusted, country_now) -> Any:
+    return (
+        country_of_origin_adjusted
+        and country_now
+        and country_of_origin_adjusted != country_now
+    )
 
-    print(f"\nСупер-мульти лауреаты (3+ приза):")
-    for laureate in super_multi:
-        print(
-            f"  - {laureate.get('name', 'Неизвестно')} (Количество призов: {len(laureate.get('prizes_relevant', []))})"
-        )
 
-    print(f"\nДважды лауреаты, награжденные в одной категории:")
-    for name in same_category_laureates:
-        print(f"  - {name}")
+@derived_field("age_at_award", ("type_", "birth_year", "award_year"), "prize")
+def _age_field(type_, birth_year, award_year) -> Optional[int]:
+    return get_first_prize_age(
+        {"type_": type_, "birth_year": birth_year}, {"award_year": award_year}
+    )
 
-    print(f"\nДважды лауреаты, награжденные в разных категориях:")
-    for name in different_category_laureates:
-        print(f"  - {name}")
 
-    prize_counts = [
-        len(item.get("prizes_relevant", []))
-        for item in data_with_migration
-        if item.get("type_") == "person"
-    ]
-    prize_counts = [pc for pc in prize_counts if pc >= 2]
+@derived_field("decade", ("award_year",), "prize")
+def _decade_field(award_year) -> Optional[int]:
+    return (award_year // 10) * 10 if award_year and award_year > 0 else None
+
+
+class MultipleLaureatesAccumulator(RecordAccumulator):
+    """накопитель для count_multiple_laureates"""
+
+    def __init__(self):
+        self.total = 0
+        self.multi_laureates = []
+        self.super_multi = []
+        self.same_category = []
+        self.different_category = []
+        self.time_differences = []
+        self.person_prize_counts = Counter()
+
+    def add(self, item: Dict, prizes: List[Dict]) -> None:
+        self.total += 1
+        n_prizes = len(prizes)
+        if n_prizes < 2:
+            return
+        name = item.get("name", "Неизвестно")
+        self.multi_laureates.append((name, n_prizes))
+        if n_prizes >= 3:
+            self.super_multi.append((name, n_prizes))
+        if item.get("type_") == "person":
+            self.person_prize_counts[n_prizes] += 1
+        if n_prizes != 2:
+            return
 
-    if prize_counts:
-        counter = Counter(prize_counts)
-        counts, freqs = zip(*sorted(counter.items()))
+        first_prize, second_prize = sorted(
+            prizes, key=lambda x: x.get("award_year", 0)
+        )
+        if first_prize.get("category_en") == second_prize.get("category_en"):
+            self.same_category.append(name)
+        else:
+            self.different_category.append(name)
+
+        year1 = first_prize.get("award_year")
+        year2 = second_prize.get("award_year")
+        if year1 and year2:
+            self.time_differences.append(year2 - year1)
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "multi_laureates": self.multi_laureates,
+            "super_multi": self.super_multi,
+            "same_category": self.same_category,
+            "different_category": self.different_category,
+            "time_differences": self.time_differences,
+            "prize_count_distribution": sorted(self.person_prize_counts.items()),
+        }
+
+
+@memoized
+def count_multiple_laureates(data: List[Dict]) -> Dict[str, Any]:
+    """
+    подсчеты для analyze_multiple_laureates
 
-        plt.figure(figsize=(10, 6))
+    Returns:
+        словарь: total, multi_laureates и super_multi - пары (имя, число призов)
+        для 2+ и 3+ призов, same_category/different_category - имена дважды
+        лауреатов, time_differences - годы между первым и вторым призом,
+        prize_count_distribution - пары (число призов, сколько людей) для 2+
+    """
+    if isinstance(data, LaureateIndex):
+        # по индексу проходят только лауреаты с 2+ призами
+        accumulator = MultipleLaureatesAccumulator()
+        accumulate(data.laureates(prize_count=Between(2)), [accumulator])
+        accumulator.total = len(data)
+        return accumulator.result()
+    (result,) = accumulate(data, [MultipleLaureatesAccumulator()])
+    return result
+
+
+def print_multiple_laureates(
+    result: Dict[str, Any], file: Optional[TextIO] = None
+) -> None:
+    """текстовая часть вывода по результату count_multiple_laureates"""
+    print(f"Всего лауреатов: {result['total']}", file=file)
+    print(f"Лауреатов с ≥2 призами: {len(result['multi_laureates'])}", file=file)
+
+    print("\n--- Имена лауреатов ---", file=file)
+    print(f"\nВсе мульти-лауреаты (2+ приза):", file=file)
+    for name, n_prizes in result["multi_laureates"]:
+        print(f"  - {name} (Количество призов: {n_prizes})", file=file)
+
+    print(f"\nСупер-мульти лауреаты (3+ приза):", file=file)
+    for name, n_prizes in result["super_multi"]:
+        print(f"  - {name} (Количество призов: {n_prizes})", file=file)
+
+    print(f"\nДважды лауреаты, награжденные в одной категории:", file=file)
+    for name in result["same_category"]:
+        print(f"  - {name}", file=file)
+
+    print(f"\nДважды лауреаты, награжденные в разных категориях:", file=file)
+    for name in result["different_category"]:
+        print(f"  - {name}", file=file)
+
+
+def plot_multiple_laureates(result: Dict[str, Any]) -> Iterator[plt.Figure]:
+    """графики по результату count_multiple_laureates, по одному за шаг"""
+    if result["prize_count_distribution"]:
+        counts, freqs = zip(*result["prize_count_distribution"])
+
+        fig = plt.figure(figsize=(10, 6))
         plt.bar(counts, freqs)
         plt.title("Распределение лауреатов по количеству призов (2+)")
         plt.xlabel("Количество призов")
         plt.ylabel("Количество лауреатов")
-        plt.show()
+        yield fig
 
+    time_differences = result["time_differences"]
     if time_differences:
-        plt.figure(figsize=(10, 6))
+        fig = plt.figure(figsize=(10, 6))
         plt.hist(time_differences, bins=20, edgecolor="black")
         plt.title("Распределение времени между первым и вторым призом")
         plt.xlabel("Количество лет между призами")
         plt.ylabel("Частота")
-        plt.show()
+        yield fig
 
-    different_category_count = len(two_time_laureates) - same_category_count
+    same_category_count = len(result["same_category"])
+    different_category_count = len(result["different_category"])
     labels = ["Одна категория", "Разные категории"]
     sizes = [same_category_count, different_category_count]
     colors = ["lightblue", "lightcoral"]
 
     if same_category_count > 0 or different_category_count > 0:
-        plt.figure(figsize=(8, 6))
+        fig = plt.figure(figsize=(8, 6))
         plt.pie(sizes, labels=labels, colors=colors, autopct="%1.1f%%", startangle=90)
         plt.title("Распределение дважды награжденных по смене категории")
+        yield fig
+
+
+def show_multiple_laureates(result: Dict[str, Any]) -> None:
+    """вывод и графики по результату count_multiple_laureates"""
+    print_multiple_laureates(result)
+    for _ in plot_multiple_laureates(result):
         plt.show()
 
 
-def analyze_refusals(data: List[Dict]):
-    """Анализ отказов от премий"""
-    print("\n---ОТКАЗЫ ОТ ПРЕМИЙ---")
+def analyze_multiple_laureates(data: List[Dict]):
+    """мультилауреаты"""
+    data_with_migration = add_migration_field(data)
+    show_multiple_laureates(count_multiple_laureates(data_with_migration))
+
+
+REFUSAL_STATUSES = ["declined", "refused"]
+
+
+def _is_refusal(status: str) -> bool:
+    status = status.lower()
+    return any(refusal in status for refusal in REFUSAL_STATUSES)
 
-    refusal_statuses = ["declined", "refused"]
 
-    category_refusals = defaultdict(lambda: {"count": 0, "names": []})
-    total_refusals = 0
-    org_refusals = 0
-    org_refusal_names = []
+class RefusalsAccumulator(RecordAccumulator):
+    """накопитель для count_refusals"""
 
-    for item in data:
-        prizes = item.get("prizes_relevant", [])
+    def __init__(self):
+        self.category_refusals = defaultdict(lambda: {"count": 0, "names": []})
+        self.total_refusals = 0
+        self.org_refusal_names = []
+
+    def add(self, item: Dict, prizes: List[Dict]) -> None:
         for prize in prizes:
-            status = prize.get("prize_status", "").lower()
-            if any(refusal in status for refusal in refusal_statuses):
+            if _is_refusal(prize.get("prize_status", "")):
                 category = prize.get("category_en", "Unknown")
                 name = item.get("name", "Неизвестно")
 
-                category_refusals[category]["count"] += 1
-                category_refusals[category]["names"].append(name)
-                total_refusals += 1
+                self.category_refusals[category]["count"] += 1
+                self.category_refusals[category]["names"].append(name)
+                self.total_refusals += 1
 
                 if item.get("type_") == "organization":
-                    org_refusals += 1
-                    org_refusal_names.append(name)
+                    self.org_refusal_names.append(name)
+
+    def result(self) -> Dict[str, Any]:
+        by_category = [
+            (category, info["count"], info["names"])
+            for category, info in sorted(
+                self.category_refusals.items(),
+                key=lambda x: x[1]["count"],
+                reverse=True,
+            )
+        ]
+        return {
+            "total": self.total_refusals,
+            "by_category": by_category,
+            "org_refusals": len(self.org_refusal_names),
+            "org_names": self.org_refusal_names,
+        }
 
-    print(f"Всего отказов от премий: {total_refusals}")
 
-    if category_refusals:
-        print("\nОтказы по категориям:")
-        for category, data in sorted(
-            category_refusals.items(), key=lambda x: x[1]["count"], reverse=True
-        ):
-            print(f"\n  {category}: {data['count']}")
-            print(f"    Имена: {', '.join(data['names'])}")
+@memoized
+def count_refusals(data: List[Dict]) -> Dict[str, Any]:
+    """
+    подсчеты для analyze_refusals
 
-    print(f"\nОтказов среди организаций: {org_refusals}")
-    if org_refusal_names:
-        print(f"  Имена организаций: {', '.join(org_refusal_names)}")
+    Returns:
+        словарь: total, by_category - тройки (категория, число, имена)
+        по убыванию числа отказов, org_refusals и org_names
+    """
+    if isinstance(data, LaureateIndex):
+        # по индексу проходят только лауреаты с отказами
+        data = data.laureates(prize_status=_is_refusal)
+    (result,) = accumulate(data, [RefusalsAccumulator()])
+    return result
 
 
-def analyze_countries_and_categories(data_with_migration):
+def print_refusals(result: Dict[str, Any], file: Optional[TextIO] = None) -> None:
+    """вывод по результату count_refusals"""
+    print("\n---ОТКАЗЫ ОТ ПРЕМИЙ---", file=file)
+    print(f"Всего отказов от премий: {result['total']}", file=file)
+
+    if result["by_category"]:
+        print("\nОтказы по категориям:", file=file)
+        for category, count, names in result["by_category"]:
+            print(f"\n  {category}: {count}", file=file)
+            print(f"    Имена: {', '.join(names)}", file=file)
+
+    print(f"\nОтказов среди организаций: {result['org_refusals']}", file=file)
+    if result["org_names"]:
+        print(f"  Имена организаций: {', '.join(result['org_names'])}", file=file)
+
+
+def show_refusals(result: Dict[str, Any]) -> None:
+    """вывод по результату count_refusals"""
+    print_refusals(result)
+
+
+def analyze_refusals(data: List[Dict]):
+    """Анализ отказов от премий"""
+    show_refusals(count_refusals(data))
+
+
+def _code_of(vocab: Optional[List[Any]], value: Any) -> int:
+    """код значения в словаре колонки (-1, если значения нет)"""
+    try:
+        return vocab.index(value)
+    except (AttributeError, ValueError):
+        return -1
+
+
+def _laureate_countries(columns: Dict) -> Tuple[np.ndarray, List[str]]:
     """
-    функция анализирует распределение лауреатов по странам и категориям.
+    страна лауреата по тому же правилу, что у CountriesAccumulator:
+    country_now, а если ее нет - country_of_origin (страна рождения
+    человека или основания организации), в виде кодов общего словаря.
+    поле country_of_origin_adjusted не нужно - оно считается из тех же полей
+    """
+    vocab: List[str] = []
+    index: Dict[str, int] = {}
+
+    def shared_codes(field: str) -> np.ndarray:
+        # перевод кодов поля в общий словарь, -1 остается пропуском
+        codes, field_vocab = columns["laureates"][field]
+        for country in field_vocab:
+            if country not in index:
+                index[country] = len(vocab)
+                vocab.append(country)
+        remap = np.array([index[c] for c in field_vocab] + [-1], dtype=np.int64)
+        return remap[codes]
+
+    now = shared_codes("country_now")
+    birth = shared_codes("country_birth")
+    founded = shared_codes("country_founded")
+    type_codes, type_vocab = columns["laureates"]["type_"]
+    person = _code_of(type_vocab, "person")
+    organization = _code_of(type_vocab, "organization")
+    origin = np.where(
+        (type_codes == person) & (person >= 0),
+        birth,
+        np.where((type_codes == organization) & (organization >= 0), founded, -1),
+    )
+    return np.where(now >= 0, now, origin), vocab
 
-    Args:
-        data_with_migration (list): Список словарей с данными о лауреатах, включая информацию о стране и категориях.
+
+@memoized
+def count_countries_and_categories(data_with_migration) -> Dict[str, Any]:
     """
-    all_countries = []
-    for item in data_with_migration:
-        country = item.get("country_now") or item.get("country_of_origin_adjusted")
-        if country:
-            all_countries.append(country)
+    подсчеты для analyze_countries_and_categories через group_by;
+    поля миграции не обязательны - страна считается как в
+    CountriesAccumulator (см. _laureate_countries)
+
+    Returns:
+        словарь: top_countries - топ-5 пар (страна, число лауреатов),
+        top_by_category - для каждой категории в порядке появления
+        пара (категория, топ-3 пар (страна, число призов))
+    """
+    from tables import columns_of
+
+    columns = columns_of(
+        data_with_migration,
+        laureate_fields=("country_now", "country_birth", "country_founded", "type_"),
+        prize_fields=("category_en",),
+    )
+    countries, country_vocab = _laureate_countries(columns)
+
+    by_country = group_by(countries)
+    (country_keys,) = by_country["keys"]
+    top_countries = [
+        (country_vocab[country_keys[i]], int(by_country["count"][i]))
+        for i in top_k(by_country["count"], 5)
+    ]
+
+    category_codes, category_vocab = columns["prizes"]["category_en"]
+    parents, _ = columns["prizes"]["laureate"]
+    prize_countries = countries[parents] if len(parents) else parents
+    pairs = group_by([category_codes, prize_countries])
+    pair_categories, pair_countries = pairs["keys"]
+
+    # категории в порядке первого появления, внутри - по убыванию количества
+    _, category_first = np.unique(pair_categories, return_index=True)
+    category_order = pair_categories[np.sort(category_first)]
+    category_rank = np.empty(len(category_vocab), dtype=np.int64)
+    category_rank[category_order] = np.arange(len(category_order))
+    order = np.lexsort(
+        (
+            np.arange(len(pair_categories)),
+            -pairs["count"],
+            category_rank[pair_categories],
+        )
+    )
 
-    country_counts = Counter(all_countries)
-    top_countries = country_counts.most_common(5)
+    top_by_category = []
+    for category in category_order:
+        in_category = order[pair_categories[order] == category][:3]
+        top_by_category.append(
+            (
+                category_vocab[category],
+                [
+                    (country_vocab[pair_countries[i]], int(pairs["count"][i]))
+                    for i in in_category
+                ],
+            )
+        )
+    return {"top_countries": top_countries, "top_by_category": top_by_category}
+
+
+class CountriesAccumulator(RecordAccumulator):
+    """
+    построчный вариант count_countries_and_categories для однопроходного
+    отчета; страна - country_now или country_of_origin (то же правило,
+    что в _laureate_countries), поэтому add_migration_field заранее не нужен
+    """
+
+    def __init__(self):
+        self.countries: Dict[str, int] = {}
+        self.category_countries: Dict[str, Dict[str, int]] = {}
+
+    def add(self, item: Dict, prizes: List[Dict]) -> None:
+        country = item.get("country_now") or country_of_origin(item)
+        if not country:
+            return
+        self.countries[country] = self.countries.get(country, 0) + 1
+        for prize in prizes:
+            category = prize.get("category_en")
+            if category:
+                counts = self.category_countries.setdefault(category, {})
+                counts[country] = counts.get(country, 0) + 1
+
+    def result(self) -> Dict[str, Any]:
+        def most_common(counts: Dict[str, int], n: int) -> List[Tuple[str, int]]:
+            return sorted(counts.items(), key=lambda x: x[1], reverse=True)[:n]
+
+        return {
+            "top_countries": most_common(self.countries, 5),
+            "top_by_category": [
+                (category, most_common(counts, 3))
+                for category, counts in self.category_countries.items()
+            ],
+        }
+
+
+def print_countries_and_categories(
+    result: Dict[str, Any], file: Optional[TextIO] = None
+) -> None:
+    """текстовая часть вывода по результату count_countries_and_categories"""
+    if not result["top_by_category"]:
+        print("Нет данных для построения графика по категориям.", file=file)
+
+
+def plot_countries_and_categories(result: Dict[str, Any]) -> Iterator[plt.Figure]:
+    """графики по результату count_countries_and_categories"""
+    top_countries = result["top_countries"]
+    top_by_category = result["top_by_category"]
 
     if top_countries:
         countries, counts = zip(*top_countries)
-        plt.figure(figsize=(10, 6))
+        fig = plt.figure(figsize=(10, 6))
         plt.bar(countries, counts)
         plt.title("Топ-5 стран по общему количеству лауреатов")
         plt.xlabel("Страна")
         plt.ylabel("Количество лауреатов")
         plt.xticks(rotation=45, ha="right")
         plt.tight_layout()
-        plt.show()
-
-    category_country_data = {}
-    for item in data_with_migration:
-        prizes = item.get("prizes_relevant", [])
-        country = item.get("country_now") or item.get("country_of_origin_adjusted")
-        for prize in prizes:
-            category = prize.get("category_en")
-            if category and country:
-                if category not in category_country_data:
-                    category_country_data[category] = []
-                category_country_data[category].append(country)
+        yield fig
 
-    if not category_country_data:
-        print("Нет данных для построения графика по категориям.")
+    if not top_by_category:
         return
 
     fig, ax = plt.subplots(figsize=(14, 8))
 
-    all_categories = []
-    all_countries_plot = []
-    all_counts_plot = []
-    colors = plt.cm.Set3(range(len(category_country_data)))
+    colors = plt.cm.Set3(range(len(top_by_category)))
 
     current_bottom = {}
-    total_counts_by_country = {}
-
-    top_countries_all_categories = set()
-    for category, countries in category_country_data.items():
-        cat_country_counts = Counter(countries)
-        top_3 = cat_country_counts.most_common(3)
-        for country, count in top_3:
-            top_countries_all_categories.add(country)
-            total_counts_by_country[country] = (
-                total_counts_by_country.get(country, 0) + count
-            )
 
-    for idx, (category, countries) in enumerate(category_country_data.items()):
-        cat_country_counts = Counter(countries)
-        top_3 = cat_country_counts.most_common(3)
-
-        for country, count in top_3:
-            bottom_for_this_bar = current_bottom.get(country, 0)
-            ax.bar(
-                country,
-                count,
-                label=category,
-                bottom=bottom_for_this_bar,
-                color=colors[idx],
-                edgecolor="black",
-                linewidth=0.5,
-            )
-            current_bottom[country] = bottom_for_this_bar + count
+    # один вызов bar на категорию (серию), а не на каждую пару
+    # (категория, страна)
+    for idx, (category, top_3) in enumerate(top_by_category):
+        if not top_3:
+            continue
+        countries = [country for country, _ in top_3]
+        counts = [count for _, count in top_3]
+        bottoms = [current_bottom.get(country, 0) for country in countries]
+        ax.bar(
+            countries,
+            counts,
+            label=category,
+            bottom=bottoms,
+            color=colors[idx],
+            edgecolor="black",
+            linewidth=0.5,
+        )
+        for country, bottom, count in zip(countries, bottoms, counts):
+            current_bottom[country] = bottom + count
 
     ax.set_title("Топ-3 стран по категориям (с накоплением)")
     ax.set_xlabel("Страна")
     ax.set_ylabel("Количество лауреатов")
 
-    unique_categories = list(category_country_data.keys())
+    unique_categories = [category for category, _ in top_by_category]
     legend_handles = [
         plt.Rectangle((0, 0), 1, 1, color=colors[i])
         for i in range(len(unique_categories))
@@ -291,36 +530,103 @@ def analyze_countries_and_categories(data_with_migration):
 
     plt.xticks(rotation=45, ha="right")
     plt.tight_layout()
-    plt.show()
+    yield fig
 
 
-def analyze_age_by_category(laureates_data, get_first_prize_age):
+def show_countries_and_categories(result: Dict[str, Any]) -> None:
+    """графики по результату count_countries_and_categories"""
+    for _ in plot_countries_and_categories(result):
+        plt.show()
+    print_countries_and_categories(result)
+
+
+def analyze_countries_and_categories(data_with_migration):
     """
-    функция анализирует распределение лауреатов по категориям и возрасту
+    функция анализирует распределение лауреатов по странам и категориям.
 
     Args:
-        laureates_data, get_first_prize_age
+        data_with_migration (list): Список словарей с данными о лауреатах, включая информацию о стране и категориях.
     """
+    show_countries_and_categories(count_countries_and_categories(data_with_migration))
 
-    age_by_category = defaultdict(list)
-    for item in laureates_data:
-        prizes = item.get("prizes_relevant", [])
-        for prize in prizes:
-            age = get_first_prize_age(item, prize)
+
+class AgeAccumulator(RecordAccumulator):
+    """накопитель для count_age_by_category"""
+
+    derived = ("age_at_award",)
+
+    def __init__(self, get_age=get_first_prize_age):
+        self.get_age = get_age
+        self.age_by_category = defaultdict(list)
+        # возрасты по призам лауреатов из стадии (поле age_at_award)
+        self._ages: Optional[Iterator[List[Optional[int]]]] = None
+
+    def use_derived(self, columns: Dict[str, Any]) -> None:
+        # age_at_award считается get_first_prize_age; другую функцию
+        # возраста накопитель вызывает сам
+        if self.get_age is get_first_prize_age:
+            self._ages = iter(columns["age_at_award"])
+
+    def add(self, item: Dict, prizes: List[Dict]) -> None:
+        if self._ages is not None:
+            ages = next(self._ages)
+        else:
+            ages = [self.get_age(item, prize) for prize in prizes]
+        for prize, age in zip(prizes, ages):
             if age is not None:
                 category = prize.get("category_en")
                 if category:
-                    age_by_category[category].append(age)
+                    self.age_by_category[category].append(age)
 
-    category_stats = {}
-    for category, ages in age_by_category.items():
-        mean_age = sum(ages) / len(ages)
-        median_age = statistics.median(ages)
-        category_stats[category] = {"mean": mean_age, "median": median_age}
+    def result(self) -> Dict[str, Any]:
+        return age_stats(self.age_by_category)
 
-    categories = list(category_stats.keys())
-    mean_ages = [stats["mean"] for stats in category_stats.values()]
-    median_ages = [stats["median"] for stats in category_stats.values()]
+
+@memoized
+def count_age_by_category(laureates_data, get_first_prize_age) -> Dict[str, Any]:
+    """
+    подсчеты для analyze_age_by_category. возраст, который считает
+    get_first_prize_age, берется из производного поля age_at_award
+    стадии набора (для списка и LaureateTable), другая функция
+    возраста вызывается на каждый приз
+
+    Returns:
+        словарь: categories, mean, median - списки по категориям
+        в порядке появления, ages_by_category - возрасты по категориям
+    """
+    (result,) = accumulate(laureates_data, [AgeAccumulator(get_first_prize_age)])
+    return result
+
+
+def age_stats(age_by_category: Dict[str, List[int]]) -> Dict[str, Any]:
+    """средний и медианный возраст по спискам возрастов категорий"""
+    return {
+        "categories": list(age_by_category),
+        "mean": [sum(ages) / len(ages) for ages in age_by_category.values()],
+        "median": [statistics.median(ages) for ages in age_by_category.values()],
+        "ages_by_category": dict(age_by_category),
+    }
+
+
+def print_age_by_category(
+    result: Dict[str, Any], file: Optional[TextIO] = None
+) -> None:
+    """средний и медианный возраст по категориям текстом"""
+    print("\nВозраст при награждении по категориям:", file=file)
+    for category, mean_age, median_age in zip(
+        result["categories"], result["mean"], result["median"]
+    ):
+        print(
+            f"  {category}: средний {mean_age:.1f}, медианный {median_age}", file=file
+        )
+
+
+def plot_age_by_category(result: Dict[str, Any]) -> Iterator[plt.Figure]:
+    """графики по результату count_age_by_category"""
+    categories = result["categories"]
+    mean_ages = result["mean"]
+    median_ages = result["median"]
+    age_by_category = result["ages_by_category"]
 
     x = np.arange(len(categories))
     width = 0.35
@@ -339,9 +645,9 @@ def analyze_age_by_category(laureates_data, get_first_prize_age):
     ax.legend()
 
     plt.tight_layout()
-    plt.show()
+    yield fig
 
-    n_categories = len(category_stats)
+    n_categories = len(categories)
     if n_categories > 0:
         cols = 2
         rows = (n_categories + 1) // 2
@@ -361,44 +667,177 @@ def analyze_age_by_category(laureates_data, get_first_prize_age):
             axes[idx].set_visible(False)
 
         plt.tight_layout()
+        yield fig
+
+
+def show_age_by_category(result: Dict[str, Any]) -> None:
+    """графики по результату count_age_by_category"""
+    for _ in plot_age_by_category(result):
         plt.show()
 
 
-def analyze_gender_trends(laureates_data):
+def analyze_age_by_category(laureates_data, get_first_prize_age):
     """
-    функция анализирует гендерные тенденции среди лауреатов по десятилетиям и за последние годы по категориям.
+    функция анализирует распределение лауреатов по категориям и возрасту
+
+    Args:
+        laureates_data, get_first_prize_age
     """
-    from collections import defaultdict
-    import matplotlib.pyplot as plt
-    import numpy as np
+    show_age_by_category(count_age_by_category(laureates_data, get_first_prize_age))
 
-    decade_gender_data = defaultdict(lambda: defaultdict(int))
 
-    for item in laureates_data:
-        if item.get("type_") != "person":
-            continue
+def _percentages(women: List[int], totals: List[int]) -> List[float]:
+    return [(w / t * 100) if t > 0 else 0 for w, t in zip(women, totals)]
 
-        gender = item.get("gender")
-        prizes = item.get("prizes_relevant", [])
 
-        for prize in prizes:
-            year = prize.get("award_year")
-            if year and gender:
-                decade = (year // 10) * 10
-                decade_gender_data[decade][gender] += 1
-                decade_gender_data[decade]["total"] += 1
-
-    for decade in sorted(decade_gender_data.keys()):
-        women = decade_gender_data[decade].get("female", 0)
-        total = decade_gender_data[decade].get("total", 0)
-        percentage = (women / total * 100) if total > 0 else 0
-
-    decades = sorted(decade_gender_data.keys())
-    women_counts = [decade_gender_data[d].get("female", 0) for d in decades]
-    total_counts = [decade_gender_data[d].get("total", 0) for d in decades]
-    percentages = [
-        (w / t * 100) if t > 0 else 0 for w, t in zip(women_counts, total_counts)
+@memoized
+def count_gender_trends(laureates_data) -> Dict[str, List[Any]]:
+    """
+    подсчеты для analyze_gender_trends через group_by: призы людей
+    по десятилетиям (производное поле decade) и, начиная с 2000 года,
+    по категориям
+
+    Returns:
+        словарь со списками decades, women_counts, total_counts, percentages
+        и categories_recent, women_recent, total_recent, percentages_recent
+    """
+    from tables import columns_of
+
+    columns = columns_of(
+        laureates_data,
+        laureate_fields=("type_", "gender"),
+        prize_fields=("award_year", "category_en"),
+    )
+    type_codes, type_vocab = columns["laureates"]["type_"]
+    gender_codes, gender_vocab = columns["laureates"]["gender"]
+    parents, _ = columns["prizes"]["laureate"]
+    years, _ = columns["prizes"]["award_year"]
+    category_codes, category_vocab = columns["prizes"]["category_en"]
+
+    # без "person" в словаре код -1 совпал бы с пропусками типа
+    person = _code_of(type_vocab, "person")
+    is_person = (type_codes[parents] == person) & (person >= 0)
+    prize_genders = gender_codes[parents]
+    is_female = (prize_genders == _code_of(gender_vocab, "female")).astype(float)
+    valid = is_person & (prize_genders >= 0)
+
+    # десятилетия призов - производное поле decade из стадии набора
+    stage = derived_fields(laureates_data)
+    stage.refresh()
+    prize_decades = [
+        -1 if decade is None else decade
+        for decades in stage.column("decade")
+        for decade in decades
     ]
+    decades = np.where(valid, np.asarray(prize_decades, dtype=np.int64), -1)
+    by_decade = group_by(decades, is_female, ("count", "sum"))
+    (decade_keys,) = by_decade["keys"]
+    decade_order = np.argsort(decade_keys)
+
+    recent = np.where(valid & (years >= 2000), category_codes, -1)
+    by_category = group_by(recent, is_female, ("count", "sum"))
+    (category_keys,) = by_category["keys"]
+
+    women_counts = by_decade["sum"][decade_order].astype(int).tolist()
+    total_counts = by_decade["count"][decade_order].tolist()
+    women_recent = by_category["sum"].astype(int).tolist()
+    total_recent = by_category["count"].tolist()
+    return {
+        "decades": decade_keys[decade_order].tolist(),
+        "women_counts": women_counts,
+        "total_counts": total_counts,
+        "percentages": _percentages(women_counts, total_counts),
+        "categories_recent": [category_vocab[c] for c in category_keys],
+        "women_recent": women_recent,
+        "total_recent": total_recent,
+        "percentages_recent": _percentages(women_recent, total_recent),
+    }
+
+
+class GenderTrendsAccumulator(RecordAccumulator):
+    """построчный вариант count_gender_trends для однопроходного отчета"""
+
+    derived = ("decade",)
+
+    def __init__(self):
+        # десятилетие/категория -> [женщин, всего]
+        self.by_decade: Dict[int, List[int]] = {}
+        self.by_category: Dict[str, List[int]] = {}
+        # десятилетия призов лауреатов из стадии (поле decade)
+        self._decades: Optional[Iterator[List[Optional[int]]]] = None
+
+    def use_derived(self, columns: Dict[str, Any]) -> None:
+        self._decades = iter(columns["decade"])
+
+    def add(self, item: Dict, prizes: List[Dict]) -> None:
+        # колонка стадии идет по всем лауреатам, в том числе пропущенным
+        decades = None if self._decades is None else next(self._decades)
+        if item.get("type_") != "person":
+            return
+        gender = item.get("gender")
+        if not gender:
+            return
+        female = int(gender == "female")
+        if decades is None:
+            decades = [_decade_field(prize.get("award_year")) for prize in prizes]
+        for prize, decade in zip(prizes, decades):
+            if decade is not None:
+                counts = self.by_decade.setdefault(decade, [0, 0])
+                counts[0] += female
+                counts[1] += 1
+            year = prize.get("award_year")
+            category = prize.get("category_en")
+            if (year or 0) >= 2000 and category:
+                counts = self.by_category.setdefault(category, [0, 0])
+                counts[0] += female
+                counts[1] += 1
+
+    def result(self) -> Dict[str, List[Any]]:
+        decades = sorted(self.by_decade)
+        women_counts = [self.by_decade[d][0] for d in decades]
+        total_counts = [self.by_decade[d][1] for d in decades]
+        women_recent = [w for w, _ in self.by_category.values()]
+        total_recent = [t for _, t in self.by_category.values()]
+        return {
+            "decades": decades,
+            "women_counts": women_counts,
+            "total_counts": total_counts,
+            "percentages": _percentages(women_counts, total_counts),
+            "categories_recent": list(self.by_category),
+            "women_recent": women_recent,
+            "total_recent": total_recent,
+            "percentages_recent": _percentages(women_recent, total_recent),
+        }
+
+
+def print_gender_trends(
+    trends: Dict[str, List[Any]], file: Optional[TextIO] = None
+) -> None:
+    """доля женщин по десятилетиям и по категориям с 2000 года текстом"""
+    print("\nЖенщины-лауреаты по десятилетиям:", file=file)
+    for decade, women, total, share in zip(
+        trends["decades"],
+        trends["women_counts"],
+        trends["total_counts"],
+        trends["percentages"],
+    ):
+        print(f"  {decade}: {women} из {total} ({share:.1f}%)", file=file)
+
+    print("\nЖенщины-лауреаты по категориям с 2000 года:", file=file)
+    for category, women, total, share in zip(
+        trends["categories_recent"],
+        trends["women_recent"],
+        trends["total_recent"],
+        trends["percentages_recent"],
+    ):
+        print(f"  {category}: {women} из {total} ({share:.1f}%)", file=file)
+
+
+def plot_gender_trends(trends: Dict[str, List[Any]]) -> Iterator[plt.Figure]:
+    """графики по результату count_gender_trends"""
+    decades = trends["decades"]
+    women_counts = trends["women_counts"]
+    percentages = trends["percentages"]
 
     fig, ax1 = plt.subplots(figsize=(12, 6))
 
@@ -426,42 +865,12 @@ def analyze_gender_trends(laureates_data):
     ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
 
     plt.tight_layout()
-    plt.show()
-
-    recent_data = [
-        item
-        for item in laureates_data
-        if item.get("type_") == "person"
-        and any(
-            prize.get("award_year", 0) >= 2000
-            for prize in item.get("prizes_relevant", [])
-        )
-    ]
-
-    category_gender_recent = defaultdict(lambda: defaultdict(int))
-    for item in recent_data:
-        gender = item.get("gender")
-        prizes = item.get("prizes_relevant", [])
+    yield fig
 
-        for prize in prizes:
-            if prize.get("award_year", 0) >= 2000:
-                category = prize.get("category_en")
-                if category and gender:
-                    category_gender_recent[category][gender] += 1
-
-    categories_recent = []
-    women_recent = []
-    total_recent = []
-    percentages_recent = []
-
-    for category, genders in category_gender_recent.items():
-        women = genders.get("female", 0)
-        total = sum(genders.values())
-        percentage = (women / total * 100) if total > 0 else 0
-        categories_recent.append(category)
-        women_recent.append(women)
-        total_recent.append(total)
-        percentages_recent.append(percentage)
+    categories_recent = trends["categories_recent"]
+    women_recent = trends["women_recent"]
+    total_recent = trends["total_recent"]
+    percentages_recent = trends["percentages_recent"]
 
     if categories_recent:
         x = np.arange(len(categories_recent))
@@ -504,4 +913,17 @@ def analyze_gender_trends(laureates_data):
         ax.legend(loc="upper left")
 
         plt.tight_layout()
+        yield fig
+
+
+def show_gender_trends(trends: Dict[str, List[Any]]) -> None:
+    """графики по результату count_gender_trends"""
+    for _ in plot_gender_trends(trends):
         plt.show()
+
+
+def analyze_gender_trends(laureates_data):
+    """
+    функция анализирует гендерные тенденции среди лауреатов по десятилетиям и за последние годы по категориям.
+    """
+    show_gender_trends(count_gender_trends(laureates_data))
@@ -0,0 +1,442 @@
+import sys
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+from prizes_configs import CONFIG_PRIZE
+
+# производные поля: значения, которые считаются из других полей лауреата
+# или приза (страна происхождения, возраст при награждении, ...).
+# поле регистрируется вместе со своими входами (derived_field), а стадия
+# DerivedFields считает его для набора данных лениво, один раз, и
+# пересчитывает только строки, у которых изменились входы
+
+# поля призов: в производных полях уровня "prize" входы с этими именами
+# берутся из приза, остальные - из лауреата
+PRIZE_FIELDS = frozenset(CONFIG_PRIZE)
+
+
+class DerivedField:
+    """
+    описание производного поля
+
+    Args:
+        name: имя поля
+        inputs: поля, от которых зависит значение (исходные или производные)
+        compute: функция значений входов (в порядке inputs) -> значение поля
+        level: "laureate" - одно значение на лауреата,
+               "prize" - по значению на каждый приз лауреата
+    """
+
+    __slots__ = ("name", "inputs", "compute", "level")
+
+    def __init__(
+        self,
+        name: str,
+        inputs: Sequence[str],
+        compute: Callable[..., Any],
+        level: str = "laureate",
+    ):
+        if level not in ("laureate", "prize"):
+            raise ValueError(f"неизвестный уровень поля: {level!r}")
+        if not inputs:
+            raise ValueError(f"{name}: у производного поля нет входов")
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.compute = compute
+        self.level = level
+
+    def __repr__(self) -> str:
+        return f"DerivedField({self.name!r}, {self.inputs!r}, level={self.level!r})"
+
+
+# имя поля -> DerivedField; поля регистрируются в dataset_helpers
+DERIVED_FIELDS: Dict[str, DerivedField] = {}
+
+
+def derived_field(
+    name: str, inputs: Sequence[str], level: str = "laureate"
+) -> Callable[[Callable], Callable]:
+    """
+    декоратор, который регистрирует функцию как производное поле:
+
+        @derived_field("decade", ("award_year",), level="prize")
+        def _decade(award_year):
+            ...
+
+    входы уровня "laureate" не могут быть полями призов или
+    производными полями уровня "prize"
+    """
+
+    def decorator(compute: Callable[..., Any]) -> Callable:
+        field = DerivedField(name, inputs, compute, level)
+        for source in field.inputs:
+            dependency = DERIVED_FIELDS.get(source)
+            if level == "laureate" and (
+                source in PRIZE_FIELDS
+                or (dependency is not None and dependency.level == "prize")
+            ):
+                raise ValueError(f"{name}: поле лауреата зависит от приза ({source})")
+        DERIVED_FIELDS[name] = field
+        return compute
+
+    return decorator
+
+
+class DerivedFields:
+    """
+    производные поля одного набора лауреатов (список из core.load_data,
+    записи records или LaureateTable). значения считаются при первом
+    обращении (column, value) и хранятся в стадии, записи не меняются,
+    пока не вызван materialize.
+
+    пересчет - только по строкам, у которых изменились входы: изменение
+    сообщается через set/changed или находится refresh сравнением
+    с запомненными входами; зависимые поля (has_migrated от
+    country_of_origin_adjusted) сбрасываются вслед за входом.
+    новые лауреаты в конце списка досчитываются, остальные - нет;
+    если список стал короче, стадия считается заново.
+    version растет при каждом изменении входов
+    """
+
+    def __init__(
+        self,
+        laureates_data: Sequence[Dict],
+        fields: Optional[Dict[str, DerivedField]] = None,
+    ):
+        self.laureates_data = laureates_data
+        self.fields = DERIVED_FIELDS if fields is None else fields
+        self.version = 0
+        # сколько строк было посчитано (для замеров и проверок)
+        self.computed = 0
+        # поле -> производные поля, которые от него зависят напрямую
+        self._dependents: Dict[str, List[str]] = {}
+        for field in self.fields.values():
+            for source in field.inputs:
+                self._dependents.setdefault(source, []).append(field.name)
+        self._reset()
+
+    def _reset(self) -> None:
+        # значения по строкам, строки к пересчету и не записанные в лауреатов
+        self._values: Dict[str, List[Any]] = {}
+        self._stale: Dict[str, Set[int]] = {}
+        # None - не записана ни одна строка (после первого расчета)
+        self._unwritten: Dict[str, Optional[Set[int]]] = {}
+        # запомненные исходные входы: поле -> значения по строкам
+        # (для полей призов - кортеж по призам лауреата)
+        self._sources: Dict[str, List[Any]] = {}
+
+    def _field(self, name: str) -> DerivedField:
+        field = self.fields.get(name)
+        if field is None:
+            raise ValueError(f"нет производного поля {name!r}")
+        return field
+
+    def _source_value(self, item: Dict, source: str) -> Any:
+        if source in PRIZE_FIELDS:
+            prizes = item.get("prizes_relevant") or []
+            return tuple([prize.get(source) for prize in prizes])
+        return item.get(source)
+
+    def _items(self, rows: Sequence[int]) -> Sequence[Dict]:
+        data = self.laureates_data
+        if isinstance(rows, range) and rows.start == 0 and rows.stop == len(data):
+            return data
+        return [data[idx] for idx in rows]
+
+    def _rows_of(self, values: List[Any], rows: Sequence[int]) -> Sequence[Any]:
+        if isinstance(rows, range) and rows.start == 0 and rows.stop == len(values):
+            return values
+        return [values[idx] for idx in rows]
+
+    def _read(self, source: str, rows: Sequence[int]) -> List[Any]:
+        # исходный вход по строкам rows одним списком
+        data = self.laureates_data
+        tables = sys.modules.get("tables")
+        if (
+            tables is not None
+            and isinstance(data, tables.LaureateTable)
+            and isinstance(rows, range)
+        ):
+            # строки таблицы читаются через колонки медленно, берем колонку
+            return self._read_table(data, source)[rows.start : rows.stop]
+        items = self._items(rows)
+        if source in PRIZE_FIELDS:
+            # значения всех призов одним списком, затем кортежи по лауреатам:
+            # вдвое быстрее, чем отдельный список на каждого лауреата
+            prize_lists = [item.get("prizes_relevant") or () for item in items]
+            values = [prize.get(source) for prizes in prize_lists for prize in prizes]
+            offsets = [0, *accumulate(map(len, prize_lists))]
+            return [
+                tuple(values[start:stop])
+                for start, stop in zip(offsets, offsets[1:])
+            ]
+        return [item.get(source) for item in items]
+
+    @staticmethod
+    def _read_table(table: Any, source: str) -> List[Any]:
+        # колонка LaureateTable целиком, с полями, добавленными через строки
+        owner = table.prizes if source in PRIZE_FIELDS else table
+        if source in owner.columns:
+            values = owner.decoded(source)
+        else:
+            values = [None] * len(owner)
+        for idx, extra in owner._extras.items():
+            if source in extra:
+                values[idx] = extra[source]
+        if owner is table:
+            return values
+        offsets = table.prize_offsets.tolist()
+        return [
+            tuple(values[start:stop]) for start, stop in zip(offsets, offsets[1:])
+        ]
+
+    def _check_length(self, n: int) -> bool:
+        # список стал короче - строки могли сдвинуться, считаем заново
+        stored = list(self._values.values()) + list(self._sources.values())
+        if any(len(values) > n for values in stored):
+            self._reset()
+            self.version += 1
+            return True
+        return False
+
+    def _snapshot(self, source: str, start: int) -> None:
+        # запоминает исходный вход для строк с номера start
+        values = self._sources.setdefault(source, [])
+        del values[start:]
+        values.extend(self._read(source, range(start, len(self.laureates_data))))
+
+    def column(self, name: str) -> List[Any]:
+        """
+        значения поля по лауреатам (для полей уровня "prize" - списки
+        значений по призам); список принадлежит стадии, его нельзя изменять
+        """
+        field = self._field(name)
+        n = len(self.laureates_data)
+        self._check_length(n)
+        values = self._values.get(name)
+        if values is None:
+            values = self._values[name] = []
+            self._stale[name] = set()
+            self._unwritten[name] = set()
+        if len(values) == n and not self._stale[name]:
+            return values
+
+        # входы досчитываются раньше самого поля
+        inputs: Dict[str, Optional[List[Any]]] = {}
+        for source in field.inputs:
+            if source in self.fields:
+                inputs[source] = self.column(source)
+            else:
+                known = len(self._sources.get(source, ()))
+                if known < n:
+                    self._snapshot(source, known)
+                inputs[source] = None
+        stale = self._stale[name]
+        if len(values) == 0:
+            rows: Sequence[int] = range(n)
+        else:
+            rows = sorted(stale) + list(range(len(values), n))
+        computed = self._compute(field, rows, inputs)
+        if isinstance(rows, range):
+            values[:] = computed
+        else:
+            values.extend([None] * (n - len(values)))
+            for idx, value in zip(rows, computed):
+                values[idx] = value
+        self.computed += len(rows)
+        stale.clear()
+        unwritten = self._unwritten[name]
+        if isinstance(rows, range):
+            self._unwritten[name] = None
+        elif unwritten is not None:
+            unwritten.update(rows)
+        return values
+
+    def _compute(
+        self, field: DerivedField, rows: Sequence[int], inputs: Dict
+    ) -> List[Any]:
+        # значения поля для строк rows
+        compute = field.compute
+        if field.level == "laureate":
+            # исходные входы берутся из только что запомненных значений,
+            # а compute вызывается через map на уровне C
+            columns = [
+                self._rows_of(self._sources[source] if column is None else column, rows)
+                for source, column in inputs.items()
+            ]
+            return list(map(compute, *columns))
+
+        # входы уровня "prize" - кортежи/списки по призам строки, остальные -
+        # одно значение на строку; все берутся из запомненных значений
+        columns = []
+        per_prize = []
+        for source, column in inputs.items():
+            if column is None:
+                column = self._sources[source]
+                per_prize.append(source in PRIZE_FIELDS)
+            else:
+                per_prize.append(self.fields[source].level == "prize")
+            columns.append(self._rows_of(column, rows))
+        if any(per_prize):
+            counts = [len(values) for values in columns[per_prize.index(True)]]
+        else:
+            items = self._items(rows)
+            counts = [len(item.get("prizes_relevant") or []) for item in items]
+        result = []
+        for count, values in zip(counts, zip(*columns)):
+            result.append(
+                [
+                    compute(
+                        *[
+                            value[n_prize] if prize else value
+                            for value, prize in zip(values, per_prize)
+                        ]
+                    )
+                    for n_prize in range(count)
+                ]
+            )
+        return result
+
+    def value(self, position: int, name: str) -> Any:
+        """значение поля name у лауреата с номером position"""
+        return self.column(name)[position]
+
+    def changed(
+        self, fields: Iterable[str], positions: Optional[Iterable[int]] = None
+    ) -> None:
+        """
+        сообщает, что исходные поля fields изменились у лауреатов positions
+        (None - у всех): зависимые производные поля будут пересчитаны
+        только для этих строк
+        """
+        positions = None if positions is None else set(positions)
+        pending = list(fields)
+        seen: Set[str] = set()
+        while pending:
+            source = pending.pop()
+            if source in seen:
+                continue
+            seen.add(source)
+            if source in self._sources and source not in self.fields:
+                rows = (
+                    range(len(self._sources[source]))
+                    if positions is None
+                    else sorted(positions)
+                )
+                values = self._sources[source]
+                for idx in rows:
+                    if idx < len(values):
+                        values[idx] = self._source_value(
+                            self.laureates_data[idx], source
+                        )
+            for name in self._dependents.get(source, ()):
+                if name in self._values:
+                    if positions is None:
+                        self._stale[name].update(range(len(self._values[name])))
+                    else:
+                        count = len(self._values[name])
+                        self._stale[name].update(p for p in positions if p < count)
+                pending.append(name)
+        self.version += 1
+
+    def set(self, position: int, field: str, value: Any) -> None:
+        """меняет исходное поле лауреата и сбрасывает зависящие от него"""
+        if field in self.fields:
+            raise ValueError(f"{field!r} - производное поле, его нельзя задать")
+        self.laureates_data[position][field] = value
+        self.changed((field,), (position,))
+
+    def refresh(self) -> int:
+        """
+        находит лауреатов, у которых запомненные входы изменились
+        в обход set/changed (например, запись правили напрямую)
+
+        Returns:
+            сколько пар (поле, лауреат) изменилось
+        """
+        n = len(self.laureates_data)
+        if self._check_length(n):
+            return n
+        total = 0
+        for source, values in list(self._sources.items()):
+            current = self._read(source, range(n))
+            # сравнение списков целиком идет на уровне C; строки ищем,
+            # только если что-то изменилось
+            if current == values:
+                continue
+            changed = [
+                idx for idx, (new, old) in enumerate(zip(current, values)) if new != old
+            ]
+            self._sources[source] = current
+            self.changed((source,), changed)
+            total += len(changed)
+        return total
+
+    def materialize(self, names: Iterable[str]) -> Sequence[Dict]:
+        """
+        записывает поля names в лауреатов (поля уровня "prize" - в призы);
+        пишутся только строки, посчитанные после прошлой записи
+
+        Returns:
+            тот же набор лауреатов
+        """
+        for name in names:
+            field = self._field(name)
+            values = self.column(name)
+            unwritten = self._unwritten[name]
+            self._unwritten[name] = set()
+            if unwritten is None and field.level == "laureate":
+                for item, value in zip(self.laureates_data, values):
+                    item[name] = value
+                continue
+            rows = range(len(values)) if unwritten is None else sorted(unwritten)
+            for idx in rows:
+                item = self.laureates_data[idx]
+                if field.level == "laureate":
+                    item[name] = values[idx]
+                    continue
+                prizes = item.get("prizes_relevant") or []
+                for prize, value in zip(prizes, values[idx]):
+                    prize[name] = value
+        return self.laureates_data
+
+    def __repr__(self) -> str:
+        return (
+            f"DerivedFields({len(self.laureates_data)} лауреатов, "
+            f"посчитано {sorted(self._values)}, версия {self.version})"
+        )
+
+
+# стадии наборов данных: id(набора) -> стадия. стадия живет вместе
+# с набором: повторный вызов на том же объекте (второй add_migration_field
+# в ноутбуке) берет ее же, а refresh находит изменившиеся строки.
+# стадия держит набор, поэтому его id не займет другой объект; помнятся
+# последние _MAX_STAGES наборов, release отпускает набор раньше
+_STAGES: "OrderedDict[int, DerivedFields]" = OrderedDict()
+_MAX_STAGES = 4
+
+
+def derived_fields(laureates_data: Sequence[Dict]) -> DerivedFields:
+    """
+    стадия производных полей для набора лауреатов: для одного и того же
+    объекта набора возвращается одна и та же стадия, поэтому значения
+    не считаются повторно (изменения находит refresh)
+    """
+    key = id(laureates_data)
+    stage = _STAGES.get(key)
+    if stage is not None and stage.laureates_data is laureates_data:
+        _STAGES.move_to_end(key)
+        return stage
+    stage = DerivedFields(laureates_data)
+    _STAGES[key] = stage
+    while len(_STAGES) > _MAX_STAGES:
+        _STAGES.popitem(last=False)
+    return stage
+
+
+def release(laureates_data: Sequence[Dict]) -> None:
+    """забывает стадию набора (вместе со ссылкой на сам набор)"""
+    stage = _STAGES.get(id(laureates_data))
+    if stage is not None and stage.laureates_data is laureates_data:
+        del _STAGES[id(laureates_data)]
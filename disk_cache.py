@@ -0,0 +1,80 @@
+import os
+from collections.abc import Mapping
+from typing import Any, Dict, List
+
+# общее для дисковых кешей (http_cache, figure_cache, result_cache):
+# запись файлов, отметка использования и вытеснение по размеру.
+# запись кеша - файлы с общим префиксом-ключом до первой точки
+# (ключ.body + ключ.meta.json, ключ.1.png + ключ.meta.json, ключ.pickle);
+# время последнего использования записи - mtime ее файла-метки
+
+
+def write_file(path: str, data: bytes) -> None:
+    """пишет файл атомарно: читатели видят старый файл или новый целиком"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def touch(path: str) -> None:
+    """отмечает использование записи (mtime - признак для вытеснения)"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def evict(directory: str, max_bytes: int, marker: str, keep: str) -> None:
+    """
+    удаляет самые давно использованные записи, пока кеш больше max_bytes
+
+    Args:
+        directory: папка кеша
+        max_bytes: предельный размер кеша на диске
+        marker: окончание файла-метки записи (".pickle", ".meta.json"):
+                он удаляется первым, запись без него не считается готовой
+        keep: ключ записи, которую удалять нельзя (только что записанная)
+    """
+    entries: Dict[str, List[Any]] = {}
+    total = 0
+    for name in os.listdir(directory):
+        # недописанные файлы других процессов не трогаем
+        if name.endswith(".tmp"):
+            continue
+        key = name.split(".", 1)[0]
+        path = os.path.join(directory, name)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        # [последнее использование, размер, файлы]
+        entry = entries.setdefault(key, [0.0, 0, []])
+        entry[1] += size
+        entry[2].append(path)
+        if name == key + marker:
+            try:
+                entry[0] = os.path.getmtime(path)
+            except OSError:
+                pass
+        total += size
+
+    for key, (used, size, paths) in sorted(entries.items(), key=lambda e: e[1][0]):
+        if total <= max_bytes:
+            break
+        if key == keep:
+            continue
+        for path in sorted(paths, key=lambda p: not p.endswith(marker)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        total -= size
+
+
+def plain(value: Any) -> Any:
+    """
+    default для json.dumps: записи records.Record - как словари,
+    остальное незнакомое json - str
+    """
+    return dict(value) if isinstance(value, Mapping) else str(value)
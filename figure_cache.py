@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Callable, List, Optional
+
+from disk_cache import evict, touch, write_file
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "figures")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def _plot_source(plot: Callable) -> str:
+    # код функции графиков входит в ключ: правка графика - новые файлы.
+    # inspect и importlib.metadata грузятся только при расчете ключа
+    import inspect
+
+    try:
+        return inspect.getsource(plot)
+    except (OSError, TypeError):
+        return f"{getattr(plot, '__module__', '')}.{getattr(plot, '__qualname__', '')}"
+
+
+def _matplotlib_version() -> str:
+    # версия из метаданных пакета, без импорта самого matplotlib
+    from importlib import metadata
+
+    try:
+        return metadata.version("matplotlib")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def figure_key(
+    plot: Callable, result: Any, fmt: str, dpi: int, default: Callable = str
+) -> str:
+    """
+    ключ графиков по содержимому: хеш результата анализа (в виде JSON,
+    порядок ключей сохраняется - он влияет на графики), кода функции
+    графиков, формата, разрешения и версии matplotlib
+
+    Args:
+        plot: функция графиков анализа (REGISTRY[имя]["plot"])
+        result: результат анализа
+        fmt: формат файлов
+        dpi: разрешение
+        default: преобразование незнакомых json типов (как в json.dumps)
+    """
+    payload = json.dumps(
+        [result, _plot_source(plot), fmt, dpi, _matplotlib_version()],
+        ensure_ascii=False,
+        default=default,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class FigureCache:
+    """
+    дисковый кеш файлов графиков по ключу figure_key: одинаковые данные
+    и параметры - те же файлы, без matplotlib и перерисовки. размер кеша
+    ограничен вытеснением давно не использованных записей.
+
+    Args:
+        directory: папка кеша
+        max_bytes: предельный размер кеша на диске
+    """
+
+    def __init__(
+        self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.meta.json")
+
+    def _file_path(self, key: str, number: int, fmt: str) -> str:
+        return os.path.join(self.directory, f"{key}.{number}.{fmt}")
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Returns:
+            пути к файлам графиков в кеше или None, если записи нет
+        """
+        try:
+            with open(self._meta_path(key), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        paths = [
+            self._file_path(key, number, meta["fmt"])
+            for number in range(1, meta["count"] + 1)
+        ]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        touch(self._meta_path(key))
+        return paths
+
+    def put(self, key: str, paths: List[str], fmt: str) -> None:
+        """сохраняет копии файлов графиков под ключом key"""
+        for number, path in enumerate(paths, start=1):
+            with open(path, "rb") as f:
+                write_file(self._file_path(key, number, fmt), f.read())
+        # meta пишется последней: без нее запись не считается готовой
+        meta = {"count": len(paths), "fmt": fmt}
+        write_file(self._meta_path(key), json.dumps(meta).encode())
+        self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        """удаляет самые давно использованные записи сверх max_bytes"""
+        # meta удаляется первой, чтобы get не нашел запись без файлов
+        evict(self.directory, self.max_bytes, ".meta.json", keep)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from disk_cache import evict, touch, write_file
+from lazy import lazy_module
+
+requests = lazy_module("requests")
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "nobel_api")
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class CacheMissError(LookupError):
+    """в офлайн-режиме запрошенной страницы нет в кеше"""
+
+
+class ResponseCache:
+    """
+    дисковый кеш ответов АПИ: сырые страницы хранятся по ключу-URL,
+    устаревшие записи перепроверяются условным GET (ETag/Last-Modified),
+    размер кеша ограничен вытеснением давно не использованных записей.
+
+    Args:
+        directory: папка кеша
+        ttl: сколько секунд запись считается свежей без похода в сеть
+        max_bytes: предельный размер кеша на диске
+        offline: если True - сеть не используется вообще, только кеш
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        offline: bool = False,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[dict] = None) -> str:
+        """полный URL запроса вместе с параметрами"""
+        return requests.Request("GET", url, params=params).prepare().url
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, self._name(key))
+        return base + ".body", base + ".meta.json"
+
+    def _read(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def _store(self, key: str, meta: Dict[str, Any], body: Optional[bytes]) -> None:
+        body_path, meta_path = self._paths(key)
+        if body is not None:
+            write_file(body_path, body)
+        write_file(meta_path, json.dumps(meta).encode())
+
+    def _touch(self, key: str) -> None:
+        """отмечает использование записи (mtime тела - признак для вытеснения)"""
+        touch(self._paths(key)[0])
+
+    def _evict(self, keep: str) -> None:
+        """удаляет самые давно использованные записи сверх max_bytes"""
+        evict(self.directory, self.max_bytes, ".body", self._name(keep))
+
+    def get_json(
+        self, session: requests.Session, url: str, params: Optional[dict] = None
+    ) -> Any:
+        """
+        возвращает JSON страницы: свежая запись отдается из кеша,
+        устаревшая перепроверяется условным запросом (304 - берем кеш),
+        иначе страница скачивается и сохраняется.
+
+        Raises:
+            CacheMissError: офлайн-режим и страницы нет в кеше
+            requests.RequestException: ошибка сети или ответа
+        """
+        key = self.cache_key(url, params)
+        meta, body = self._read(key)
+        now = time.time()
+
+        if body is not None and (self.offline or now - meta["stored_at"] < self.ttl):
+            self._touch(key)
+            return json.loads(body)
+        if self.offline:
+            raise CacheMissError(key)
+
+        headers = {}
+        if body is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = session.get(url, params=params, headers=headers)
+        if response.status_code == 304 and body is not None:
+            meta["stored_at"] = now
+            self._store(key, meta, None)
+            self._touch(key)
+            return json.loads(body)
+
+        response.raise_for_status()
+        meta = {
+            "url": key,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "stored_at": now,
+        }
+        self._store(key, meta, response.content)
+        self._evict(keep=key)
+        return response.json()
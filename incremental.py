@@ -0,0 +1,550 @@
+import heapq
+import os
+import pickle
+import statistics
+from abc import ABC, abstractmethod
+from collections import Counter
+from fractions import Fraction
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from aggregations import NumericAccumulator, accumulate, fingerprint, top_k
+from dataset_helpers import (
+    MultipleLaureatesAccumulator,
+    RefusalsAccumulator,
+    country_of_origin,
+    get_first_prize_age,
+    _decade_field,
+    _is_refusal,
+    _percentages,
+)
+from lazy import lazy_module
+
+np = lazy_module("numpy")
+
+# позиция значения: (место лауреата в наборе, номер приза у лауреата).
+# места - целые с шагом PLACE_STEP, чтобы новых лауреатов можно было
+# вставить между старыми; если промежуток кончился - дроби
+PLACE_STEP = 2**32
+Place = Union[int, Fraction]
+Position = Tuple[Place, int]
+
+
+class OrderedTally:
+    """
+    счетчик, который помнит порядок первого появления ключей: ключ стоит
+    на месте самой ранней позиции среди записей, которые его сейчас дают.
+    так items() совпадает с порядком dict/Counter при подсчете в цикле
+    по всему набору, но add/remove стоят O(log n), а не пересчет.
+    """
+
+    def __init__(self):
+        self.counts: Dict[Any, int] = {}
+        self._positions: Dict[Any, Counter] = {}
+        self._heaps: Dict[Any, List[Position]] = {}
+
+    def add(self, key: Any, position: Position) -> None:
+        self.counts[key] = self.counts.get(key, 0) + 1
+        positions = self._positions.setdefault(key, Counter())
+        if not positions[position]:
+            heapq.heappush(self._heaps.setdefault(key, []), position)
+        positions[position] += 1
+
+    def remove(self, key: Any, position: Position) -> None:
+        self.counts[key] -= 1
+        if not self.counts[key]:
+            del self.counts[key], self._positions[key], self._heaps[key]
+            return
+        positions = self._positions[key]
+        positions[position] -= 1
+        if not positions[position]:
+            del positions[position]
+            heap = self._heaps[key]
+            # удаленные позиции вычищаются из кучи лениво, в first
+            if len(heap) > 2 * len(positions) + 8:
+                self._heaps[key] = sorted(positions)
+
+    def first(self, key: Any) -> Position:
+        """самая ранняя позиция ключа"""
+        heap = self._heaps[key]
+        positions = self._positions[key]
+        while heap[0] not in positions:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def items(self) -> List[Tuple[Any, int]]:
+        """пары (ключ, количество) в порядке первого появления"""
+        return sorted(self.counts.items(), key=lambda kv: self.first(kv[0]))
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+class OrderedValues:
+    """значения по позициям; values() отдает их в порядке позиций"""
+
+    def __init__(self):
+        self._values: Dict[Position, Any] = {}
+        self._order: Optional[List[Position]] = None
+
+    def add(self, position: Position, value: Any) -> None:
+        self._values[position] = value
+        self._order = None
+
+    def remove(self, position: Position) -> None:
+        del self._values[position]
+        self._order = None
+
+    def values(self) -> List[Any]:
+        if self._order is None:
+            self._order = sorted(self._values)
+        return [self._values[position] for position in self._order]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+def _change(tally: OrderedTally, key: Any, position: Position, sign: int) -> None:
+    if sign > 0:
+        tally.add(key, position)
+    else:
+        tally.remove(key, position)
+
+
+class SummaryState:
+    """инкрементный вариант aggregations.SummaryAccumulator"""
+
+    def __init__(self):
+        self.total = 0
+        self.fingerprints: Counter = Counter()
+        self.categories = OrderedTally()
+        self.years = OrderedTally()
+        self.prizes_per_laureate = OrderedTally()
+        self.types = OrderedTally()
+
+    def apply(self, place: Place, item: Dict, prizes: List[Dict], sign: int) -> None:
+        self.total += sign
+        # 128-битный отпечаток не зависит от процесса - состояние
+        # сохраняется на диск (save) и читается в другом запуске
+        key = fingerprint(item, digest_size=16)
+        self.fingerprints[key] += sign
+        if not self.fingerprints[key]:
+            del self.fingerprints[key]
+        for number, prize in enumerate(prizes):
+            category = prize.get("category_en")
+            if category is not None:
+                _change(self.categories, category, (place, number), sign)
+            year = prize.get("award_year")
+            if year is not None:
+                _change(self.years, year, (place, number), sign)
+        _change(self.prizes_per_laureate, len(prizes), (place, 0), sign)
+        type_ = item.get("type_")
+        if type_:
+            _change(self.types, type_, (place, 0), sign)
+
+    def result(self) -> Dict[str, Any]:
+        categories = self.categories.items()
+        counts = np.array([cnt for _, cnt in categories], dtype=np.int64)
+        per_laureate = NumericAccumulator.from_counts(self.prizes_per_laureate.items())
+        return {
+            "total": self.total,
+            "unique": len(self.fingerprints),
+            "top_categories": [categories[i] for i in top_k(counts, 5)],
+            "year_stats": NumericAccumulator.from_counts(self.years.items()).describe(),
+            "avg_prizes": per_laureate.mean(),
+            "median_prizes": per_laureate.median(),
+            "mode_prizes": per_laureate.mode(),
+            "type_counts": dict(self.types.items()),
+        }
+
+
+class _SparseState(ABC):
+    """
+    анализ, который зависит только от немногих лауреатов (мультилауреаты,
+    отказы): такие лауреаты хранятся по позициям, а результат - это
+    обычный накопитель, прогнанный только по ним
+    """
+
+    accumulator: Callable[[], Any]
+
+    def __init__(self):
+        self.total = 0
+        self.relevant = OrderedValues()
+
+    @abstractmethod
+    def is_relevant(self, item: Dict, prizes: List[Dict]) -> bool:
+        """нужен ли лауреат анализу (хранится ли он в relevant)"""
+
+    def apply(self, place: Place, item: Dict, prizes: List[Dict], sign: int) -> None:
+        self.total += sign
+        if not self.is_relevant(item, prizes):
+            return
+        if sign > 0:
+            self.relevant.add((place, 0), item)
+        else:
+            self.relevant.remove((place, 0))
+
+    def result(self) -> Dict[str, Any]:
+        (result,) = accumulate(self.relevant.values(), [self.accumulator()])
+        return result
+
+
+class MultipleLaureatesState(_SparseState):
+    """инкрементный вариант MultipleLaureatesAccumulator"""
+
+    accumulator = MultipleLaureatesAccumulator
+
+    def is_relevant(self, item: Dict, prizes: List[Dict]) -> bool:
+        return len(prizes) >= 2
+
+    def result(self) -> Dict[str, Any]:
+        result = super().result()
+        result["total"] = self.total
+        return result
+
+
+class RefusalsState(_SparseState):
+    """инкрементный вариант RefusalsAccumulator"""
+
+    accumulator = RefusalsAccumulator
+
+    def is_relevant(self, item: Dict, prizes: List[Dict]) -> bool:
+        return any(_is_refusal(prize.get("prize_status", "")) for prize in prizes)
+
+
+class CountriesState:
+    """инкрементный вариант CountriesAccumulator"""
+
+    def __init__(self):
+        self.countries = OrderedTally()
+        self.categories = OrderedTally()
+        self.category_countries: Dict[str, OrderedTally] = {}
+
+    def apply(self, place: Place, item: Dict, prizes: List[Dict], sign: int) -> None:
+        country = item.get("country_now") or country_of_origin(item)
+        if not country:
+            return
+        _change(self.countries, country, (place, 0), sign)
+        for number, prize in enumerate(prizes):
+            category = prize.get("category_en")
+            if category:
+                position = (place, number)
+                _change(self.categories, category, position, sign)
+                tally = self.category_countries.setdefault(category, OrderedTally())
+                _change(tally, country, position, sign)
+                if not tally:
+                    del self.category_countries[category]
+
+    def result(self) -> Dict[str, Any]:
+        def most_common(tally: OrderedTally, n: int) -> List[Tuple[str, int]]:
+            return sorted(tally.items(), key=lambda x: x[1], reverse=True)[:n]
+
+        return {
+            "top_countries": most_common(self.countries, 5),
+            "top_by_category": [
+                (category, most_common(self.category_countries[category], 3))
+                for category, _ in self.categories.items()
+            ],
+        }
+
+
+class AgeState:
+    """инкрементный вариант AgeAccumulator"""
+
+    def __init__(self, get_age=get_first_prize_age):
+        self.get_age = get_age
+        self.categories = OrderedTally()
+        self.ages: Dict[str, OrderedValues] = {}
+        # категория -> (возрасты, средний, медианный) с прошлого result;
+        # пересчитываются только категории, которых коснулось обновление
+        self._stats: Dict[str, Tuple[List[int], float, float]] = {}
+
+    def apply(self, place: Place, item: Dict, prizes: List[Dict], sign: int) -> None:
+        for number, prize in enumerate(prizes):
+            age = self.get_age(item, prize)
+            category = prize.get("category_en")
+            if age is None or not category:
+                continue
+            position = (place, number)
+            _change(self.categories, category, position, sign)
+            self._stats.pop(category, None)
+            ages = self.ages.setdefault(category, OrderedValues())
+            if sign > 0:
+                ages.add(position, age)
+            else:
+                ages.remove(position)
+                if not ages:
+                    del self.ages[category]
+
+    def _category_stats(self, category: str) -> Tuple[List[int], float, float]:
+        stats = self._stats.get(category)
+        if stats is None:
+            ages = self.ages[category].values()
+            stats = (ages, sum(ages) / len(ages), statistics.median(ages))
+            self._stats[category] = stats
+        return stats
+
+    def result(self) -> Dict[str, Any]:
+        # то же, что age_stats, но без пересчета неизменившихся категорий
+        categories = [category for category, _ in self.categories.items()]
+        stats = [self._category_stats(category) for category in categories]
+        return {
+            "categories": categories,
+            "mean": [mean for _, mean, _ in stats],
+            "median": [median for _, _, median in stats],
+            "ages_by_category": {
+                category: ages for category, (ages, _, _) in zip(categories, stats)
+            },
+        }
+
+
+class GenderTrendsState:
+    """инкрементный вариант GenderTrendsAccumulator"""
+
+    def __init__(self):
+        # десятилетие -> [женщин, всего]; порядок не важен, они сортируются
+        self.by_decade: Dict[int, List[int]] = {}
+        self.categories = OrderedTally()
+        self.women_by_category: Counter = Counter()
+
+    def apply(self, place: Place, item: Dict, prizes: List[Dict], sign: int) -> None:
+        if item.get("type_") != "person":
+            return
+        gender = item.get("gender")
+        if not gender:
+            return
+        female = int(gender == "female")
+        for number, prize in enumerate(prizes):
+            year = prize.get("award_year")
+            decade = _decade_field(year)
+            if decade is not None:
+                counts = self.by_decade.setdefault(decade, [0, 0])
+                counts[0] += sign * female
+                counts[1] += sign
+                if not counts[1]:
+                    del self.by_decade[decade]
+            category = prize.get("category_en")
+            if (year or 0) >= 2000 and category:
+                _change(self.categories, category, (place, number), sign)
+                self.women_by_category[category] += sign * female
+
+    def result(self) -> Dict[str, List[Any]]:
+        decades = sorted(self.by_decade)
+        women_counts = [self.by_decade[d][0] for d in decades]
+        total_counts = [self.by_decade[d][1] for d in decades]
+        categories = self.categories.items()
+        women_recent = [self.women_by_category[c] for c, _ in categories]
+        total_recent = [total for _, total in categories]
+        return {
+            "decades": decades,
+            "women_counts": women_counts,
+            "total_counts": total_counts,
+            "percentages": _percentages(women_counts, total_counts),
+            "categories_recent": [c for c, _ in categories],
+            "women_recent": women_recent,
+            "total_recent": total_recent,
+            "percentages_recent": _percentages(women_recent, total_recent),
+        }
+
+
+# имя анализа (как в report.REGISTRY) -> инкрементное состояние
+INCREMENTAL: Dict[str, Callable[[], Any]] = {
+    "summary": SummaryState,
+    "multiple": MultipleLaureatesState,
+    "countries": CountriesState,
+    "age": AgeState,
+    "gender": GenderTrendsState,
+    "refusals": RefusalsState,
+}
+
+
+def diff_records(
+    previous: Dict[str, Dict], current: Iterable[Dict]
+) -> Dict[str, List[Any]]:
+    """
+    функция сравнивает новую выгрузку core.load_data с прошлой по id
+
+    Args:
+        previous: прошлые записи {id: запись}
+        current: новые записи
+
+    Returns:
+        словарь: added и changed - новые и изменившиеся записи,
+        removed - id пропавших записей
+    """
+    added, changed = [], []
+    seen = set()
+    for record in current:
+        record_id = record["id"]
+        if record_id in seen:
+            raise ValueError(f"повторяющийся id лауреата: {record_id}")
+        seen.add(record_id)
+        old = previous.get(record_id)
+        if old is None:
+            added.append(record)
+        elif old != record:
+            changed.append(record)
+    removed = [record_id for record_id in previous if record_id not in seen]
+    return {"added": added, "changed": changed, "removed": removed}
+
+
+class IncrementalReport:
+    """
+    материализованные результаты анализов отчета, которые обновляются
+    изменениями лауреатов (по id), а не пересчетом всего набора.
+    results() совпадает с report.run_analyses(records()).
+
+    каждый анализ держит свое состояние (счетчики по десятилетиям и полу,
+    по странам и категориям, возрасты по категориям, отказы,
+    мультилауреаты); изменение одного лауреата стоит O(log n).
+    состояние целиком сохраняется на диск (save/load).
+
+    Args:
+        names: какие анализы вести (по умолчанию все из INCREMENTAL)
+    """
+
+    def __init__(self, names: Optional[Sequence[str]] = None):
+        names = list(INCREMENTAL) if names is None else list(names)
+        unknown = [name for name in names if name not in INCREMENTAL]
+        if unknown:
+            raise ValueError(f"неизвестные анализы: {unknown}")
+        self.states = {name: INCREMENTAL[name]() for name in names}
+        self.records: Dict[str, Dict] = {}
+        self.places: Dict[str, Place] = {}
+        self._last_place: Place = 0
+
+    def _apply(self, record: Dict, place: Place, sign: int) -> None:
+        prizes = record.get("prizes_relevant", [])
+        for state in self.states.values():
+            state.apply(place, record, prizes, sign)
+
+    def _insert(self, record: Dict, place: Place) -> None:
+        self.records[record["id"]] = record
+        self.places[record["id"]] = place
+        self._last_place = max(self._last_place, place)
+        self._apply(record, place, 1)
+
+    def _delete(self, record_id: str) -> Place:
+        record = self.records.pop(record_id)
+        place = self.places.pop(record_id)
+        self._apply(record, place, -1)
+        return place
+
+    def _insert_between(
+        self, records: List[Dict], left: Place, right: Optional[Place]
+    ) -> None:
+        """вставляет записи по порядку между местами left и right"""
+        if right is None:
+            places = [left + PLACE_STEP * k for k in range(1, len(records) + 1)]
+        elif right - left > len(records):
+            step = (right - left) // (len(records) + 1)
+            places = [left + step * k for k in range(1, len(records) + 1)]
+        else:
+            step = Fraction(right - left, len(records) + 1)
+            places = [left + step * k for k in range(1, len(records) + 1)]
+        for record, place in zip(records, places):
+            self._insert(record, place)
+
+    def apply(
+        self,
+        added: Iterable[Dict] = (),
+        changed: Iterable[Dict] = (),
+        removed: Iterable[str] = (),
+    ) -> None:
+        """
+        применяет изменения: новые лауреаты встают в конец набора,
+        измененные остаются на своем месте, removed - id удаленных
+        """
+        for record_id in removed:
+            self._delete(record_id)
+        for record in changed:
+            place = self._delete(record["id"])
+            self._insert(record, place)
+        for record in added:
+            if record["id"] in self.records:
+                raise ValueError(f"лауреат уже есть: {record['id']}")
+            self._insert(record, self._last_place + PLACE_STEP)
+
+    def update(self, laureates_data: List[Dict]) -> Dict[str, int]:
+        """
+        приводит состояние к новой выгрузке core.load_data: сравнение
+        с прошлой - один линейный проход со сравнением словарей,
+        а пересчитываются только добавленные, измененные и удаленные.
+        новые лауреаты встают на свое место в порядке выгрузки.
+
+        Returns:
+            сколько записей добавлено, изменено и удалено
+        """
+        delta = diff_records(self.records, laureates_data)
+        for record_id in delta["removed"]:
+            self._delete(record_id)
+        changed_ids = {record["id"] for record in delta["changed"]}
+
+        # старые записи остаются на своих местах, пока их порядок совпадает
+        # с порядком выгрузки; остальные встают между соседями. все, что
+        # переезжает или меняется, сначала убирается, чтобы новые места
+        # не пересекались со старыми
+        kept: Dict[int, Place] = {}
+        last: Place = 0
+        for idx, record in enumerate(laureates_data):
+            record_id = record["id"]
+            place = self.places.get(record_id)
+            if place is None:
+                continue
+            if place > last:
+                kept[idx] = last = place
+                if record_id in changed_ids:
+                    self._delete(record_id)
+            else:
+                self._delete(record_id)
+
+        left: Place = 0
+        pending: List[Dict] = []
+        for idx, record in enumerate(laureates_data):
+            place = kept.get(idx)
+            if place is None:
+                pending.append(record)
+                continue
+            if pending:
+                self._insert_between(pending, left, place)
+                pending = []
+            if record["id"] not in self.records:
+                self._insert(record, place)
+            left = place
+        if pending:
+            self._insert_between(pending, left, None)
+
+        return {
+            "added": len(delta["added"]),
+            "changed": len(delta["changed"]),
+            "removed": len(delta["removed"]),
+        }
+
+    def records_in_order(self) -> List[Dict]:
+        """лауреаты в порядке набора"""
+        return sorted(self.records.values(), key=lambda r: self.places[r["id"]])
+
+    def results(self) -> Dict[str, Any]:
+        """результаты анализов в формате report.run_analyses"""
+        return {name: state.result() for name, state in self.states.items()}
+
+    def save(self, path: str) -> None:
+        """сохраняет состояние целиком (pickle)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalReport":
+        with open(path, "rb") as f:
+            return pickle.load(f)
@@ -0,0 +1,345 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+# вторичные индексы по выводу core.load_data: индекс строится один раз,
+# а выборки по условиям (index.laureates(category_en="physics", ...))
+# стоят O(совпадений), а не полного прохода по лауреатам
+
+# поля лауреатов и призов, по которым строятся индексы; prize_count -
+# число призов лауреата (len(prizes_relevant))
+LAUREATE_INDEX_FIELDS = (
+    "type_",
+    "gender",
+    "country_birth",
+    "country_now",
+    "country_founded",
+    "country_of_origin_adjusted",
+    "prize_count",
+)
+PRIZE_INDEX_FIELDS = ("category_en", "award_year", "prize_status")
+
+
+class Between(NamedTuple):
+    """
+    условие-диапазон для числовых полей (award_year, prize_count),
+    границы включаются, None - без границы: Between(2000) - с 2000 года
+    """
+
+    low: Optional[Any] = None
+    high: Optional[Any] = None
+
+
+class FieldIndex:
+    """
+    индекс одного поля: значение -> множество номеров строк с этим
+    значением, плюс значение каждой строки (для проверки кандидатов).
+    отсортированные значения для диапазонов строятся лениво.
+
+    условие запроса (см. select):
+        значение              - равенство
+        список/кортеж/мн-во   - любое из значений
+        Between(low, high)    - диапазон по отсортированным значениям
+        функция               - проверка каждого разного значения поля,
+                                кроме None (их мало), например подстрока
+    """
+
+    __slots__ = ("postings", "values", "_keys")
+
+    def __init__(self):
+        self.postings: Dict[Hashable, Set[int]] = {}
+        # значение поля в строке с номером i - values[i]
+        self.values: List[Any] = []
+        self._keys: Optional[List[Any]] = None
+
+    def add(self, value: Hashable) -> None:
+        """добавляет следующую строку со значением value"""
+        postings = self.postings.get(value)
+        if postings is None:
+            postings = self.postings[value] = set()
+            self._keys = None
+        postings.add(len(self.values))
+        self.values.append(value)
+
+    def keys(self) -> List[Any]:
+        """разные значения поля по возрастанию (без None)"""
+        if self._keys is None:
+            self._keys = sorted(key for key in self.postings if key is not None)
+        return self._keys
+
+    def _matching_keys(self, condition: Any) -> Iterable[Hashable]:
+        if isinstance(condition, Between):
+            keys = self.keys()
+            start = 0 if condition.low is None else bisect_left(keys, condition.low)
+            stop = (
+                len(keys)
+                if condition.high is None
+                else bisect_right(keys, condition.high)
+            )
+            return keys[start:stop]
+        if callable(condition):
+            return [key for key in self.postings if key is not None and condition(key)]
+        if isinstance(condition, (list, tuple, set, frozenset)):
+            return condition
+        return (condition,)
+
+    def select(self, condition: Any) -> "Selection":
+        """строки, подходящие под условие (множество строится по требованию)"""
+        keys = dict.fromkeys(self._matching_keys(condition))
+        return Selection(self, [key for key in keys if key in self.postings])
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        return f"FieldIndex({len(self.postings)} значений)"
+
+
+class Selection:
+    """
+    строки одного FieldIndex с подходящими значениями keys: size известен
+    сразу, а объединение множеств строится, только если выборка
+    окажется самой маленькой из пересекаемых (см. _intersect)
+    """
+
+    __slots__ = ("index", "keys", "size")
+
+    def __init__(self, index: FieldIndex, keys: List[Hashable]):
+        self.index = index
+        self.keys = keys
+        self.size = sum(len(index.postings[key]) for key in keys)
+
+    def positions(self) -> Set[int]:
+        """
+        номера строк (для одного значения - само множество из индекса,
+        его нельзя изменять)
+        """
+        postings = [self.index.postings[key] for key in self.keys]
+        if len(postings) == 1:
+            return postings[0]
+        return set().union(*postings)
+
+    def filter(self, positions: Set[int]) -> Set[int]:
+        """номера из positions, подходящие под условие, за O(len(positions))"""
+        if len(self.keys) == 1:
+            # & проходит по меньшему из множеств
+            return positions & self.index.postings[self.keys[0]]
+        keys, values = set(self.keys), self.index.values
+        return {p for p in positions if values[p] in keys}
+
+
+class _Positions:
+    # готовое множество номеров в роли Selection (id, владельцы призов)
+    __slots__ = ("size", "_positions")
+
+    def __init__(self, positions: Set[int]):
+        self._positions = positions
+        self.size = len(positions)
+
+    def positions(self) -> Set[int]:
+        return self._positions
+
+    def filter(self, positions: Set[int]) -> Set[int]:
+        return positions & self._positions
+
+
+def _intersect(selections: List[Any]) -> Set[int]:
+    # строится только самая маленькая выборка, остальные лишь проверяют
+    # ее номера, поэтому цена - O(размера самой маленькой), а не O(данных)
+    selections = sorted(selections, key=lambda selection: selection.size)
+    result = selections[0].positions()
+    for selection in selections[1:]:
+        if not result:
+            break
+        result = selection.filter(result)
+    return result
+
+
+class LaureateIndex(Sequence):
+    """
+    вторичные индексы над обработанными лауреатами (core.load_data,
+    записи records, строки tables.LaureateTable): по id, по полям
+    LAUREATE_INDEX_FIELDS и по полям призов PRIZE_INDEX_FIELDS.
+
+    запросы принимают условия по полям (см. FieldIndex) и отвечают
+    пересечением индексов. условия на поля призов относятся к одному
+    и тому же призу: laureates(category_en="physics", award_year=1911) -
+    лауреаты, у которых есть приз по физике 1911 года.
+
+    индекс сам ведет себя как список лауреатов, поэтому его можно передать
+    функциям dataset_helpers и aggregations вместо исходного списка.
+    индекс - снимок: поля, измененные в лауреатах после построения
+    (или добавленные add_migration_field позже), в нем не учтены
+    """
+
+    def __init__(
+        self,
+        laureates_data: Iterable[Dict],
+        laureate_fields: Iterable[str] = LAUREATE_INDEX_FIELDS,
+        prize_fields: Iterable[str] = PRIZE_INDEX_FIELDS,
+    ):
+        self.laureates_data: List[Dict] = []
+        self.prize_list: List[Dict] = []
+        # номер лауреата для каждого приза и призы лауреата i -
+        # prize_list[offsets[i]:offsets[i + 1]]
+        self.prize_parents: List[int] = []
+        self.prize_offsets: List[int] = [0]
+        self.ids: Dict[Any, int] = {}
+        self.laureate_indexes = {field: FieldIndex() for field in laureate_fields}
+        self.prize_indexes = {field: FieldIndex() for field in prize_fields}
+        for item in laureates_data:
+            self.add(item)
+
+    def add(self, item: Dict) -> int:
+        """
+        добавляет лауреата в конец и в индексы
+
+        Returns:
+            номер лауреата
+        """
+        position = len(self.laureates_data)
+        prizes = item.get("prizes_relevant") or []
+        self.laureates_data.append(item)
+        self.ids.setdefault(item.get("id"), position)
+        for field, index in self.laureate_indexes.items():
+            value = len(prizes) if field == "prize_count" else item.get(field)
+            index.add(value)
+        for prize in prizes:
+            self.prize_list.append(prize)
+            self.prize_parents.append(position)
+            for field, index in self.prize_indexes.items():
+                index.add(prize.get(field))
+        self.prize_offsets.append(len(self.prize_list))
+        return position
+
+    def __len__(self) -> int:
+        return len(self.laureates_data)
+
+    def __getitem__(self, position):
+        return self.laureates_data[position]
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.laureates_data)
+
+    def get(self, laureate_id: Any, default: Any = None) -> Any:
+        """лауреат по id (default, если такого нет)"""
+        position = self.ids.get(laureate_id)
+        return default if position is None else self.laureates_data[position]
+
+    def _split(self, conditions: Dict[str, Any]) -> Tuple[List[Any], List[Any]]:
+        # выборки по условиям: отдельно на лауреатов и на призы
+        laureate_selections, prize_selections = [], []
+        for field, condition in conditions.items():
+            if field == "id":
+                selection = _Positions(self._id_positions(condition))
+                laureate_selections.append(selection)
+            elif field in self.laureate_indexes:
+                selection = self.laureate_indexes[field].select(condition)
+                laureate_selections.append(selection)
+            elif field in self.prize_indexes:
+                prize_selections.append(self.prize_indexes[field].select(condition))
+            else:
+                raise ValueError(f"нет индекса по полю {field!r}")
+        return laureate_selections, prize_selections
+
+    def _id_positions(self, condition: Any) -> Set[int]:
+        if isinstance(condition, (list, tuple, set, frozenset)):
+            ids = condition
+        else:
+            ids = (condition,)
+        return {self.ids[i] for i in ids if i in self.ids}
+
+    def _prizes_of(self, laureates: Iterable[int]) -> Set[int]:
+        offsets = self.prize_offsets
+        return {p for i in laureates for p in range(offsets[i], offsets[i + 1])}
+
+    def _matching_prizes(
+        self, laureate_selections: List[Any], prize_selections: List[Any]
+    ) -> Set[int]:
+        # начинаем с той стороны, где выборка меньше: призы подходящих
+        # лауреатов проверяются условиями на призы или наоборот
+        parents = self.prize_parents
+        smallest_laureates = min(
+            (selection.size for selection in laureate_selections), default=None
+        )
+        smallest_prizes = min(selection.size for selection in prize_selections)
+        if smallest_laureates is not None and smallest_laureates < smallest_prizes:
+            prizes = self._prizes_of(_intersect(laureate_selections))
+            for selection in prize_selections:
+                prizes = selection.filter(prizes)
+            return prizes
+        prizes = _intersect(prize_selections)
+        if laureate_selections:
+            owners = _Positions({parents[p] for p in prizes})
+            laureates = _intersect(laureate_selections + [owners])
+            prizes = {p for p in prizes if parents[p] in laureates}
+        return prizes
+
+    def laureate_positions(self, **conditions: Any) -> List[int]:
+        """
+        номера лауреатов, подходящих под все условия, по возрастанию;
+        без условий - все лауреаты
+        """
+        laureate_selections, prize_selections = self._split(conditions)
+        if prize_selections:
+            parents = self.prize_parents
+            prizes = self._matching_prizes(laureate_selections, prize_selections)
+            return sorted({parents[p] for p in prizes})
+        if not laureate_selections:
+            return list(range(len(self)))
+        return sorted(_intersect(laureate_selections))
+
+    def prize_positions(self, **conditions: Any) -> List[int]:
+        """
+        номера призов (в prize_list), подходящих под все условия,
+        по возрастанию; условия на поля лауреатов относятся к владельцу приза
+        """
+        laureate_selections, prize_selections = self._split(conditions)
+        if prize_selections:
+            prizes = self._matching_prizes(laureate_selections, prize_selections)
+            return sorted(prizes)
+        if not laureate_selections:
+            return list(range(len(self.prize_list)))
+        return sorted(self._prizes_of(_intersect(laureate_selections)))
+
+    def laureates(self, **conditions: Any) -> List[Dict]:
+        """
+        лауреаты, подходящие под все условия, в исходном порядке:
+
+            index.laureates(gender="female", award_year=Between(2000))
+            index.laureates(prize_status=lambda s: "declined" in s.lower())
+        """
+        data = self.laureates_data
+        return [data[i] for i in self.laureate_positions(**conditions)]
+
+    def prizes(self, **conditions: Any) -> List[Tuple[Dict, Dict]]:
+        """пары (лауреат, приз), подходящие под все условия, в исходном порядке"""
+        data, prizes, parents = self.laureates_data, self.prize_list, self.prize_parents
+        positions = self.prize_positions(**conditions)
+        return [(data[parents[p]], prizes[p]) for p in positions]
+
+    def count(self, **conditions: Any) -> int:
+        """число лауреатов, подходящих под условия"""
+        return len(self.laureate_positions(**conditions))
+
+    def values(self, field: str) -> List[Any]:
+        """разные значения индексированного поля (без None) по возрастанию"""
+        index = self.laureate_indexes.get(field) or self.prize_indexes.get(field)
+        if index is None:
+            raise ValueError(f"нет индекса по полю {field!r}")
+        return index.keys()
+
+    def __repr__(self) -> str:
+        return f"LaureateIndex({len(self)} лауреатов, {len(self.prize_list)} призов)"
+
@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+from itertools import islice
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import profiling
+from core import get_laureate_data
+
+try:
+    import ijson
+except ImportError:  # необязательная зависимость, есть запасной разбор
+    ijson = None
+
+DEFAULT_BATCH_SIZE = 1000
+READ_SIZE = 1 << 16
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """записи из файла JSONL (по объекту на строку, пустые строки пропускаются)"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: {e.msg}") from e
+
+
+class _StreamReader:
+    """
+    запасной потоковый разбор без ijson: текст читается кусками,
+    значения разбираются json.JSONDecoder.raw_decode, прочитанное
+    из буфера выбрасывается
+    """
+
+    def __init__(self, f: IO[str]):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(READ_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """следующий непробельный символ ("" в конце файла)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"ожидался один из символов {chars!r}, а не {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> object:
+        """следующее значение JSON целиком"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # число в конце буфера могло оборваться - дочитываем и повторяем
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_json_array_stdlib(f: IO[str], key: Optional[str]) -> Iterator[object]:
+    reader = _StreamReader(f)
+    if key is not None:
+        # ищем ключ на верхнем уровне объекта, остальные значения пропускаем
+        reader.expect("{")
+        while True:
+            if reader.peek() == "}":
+                raise ValueError(f"в документе нет ключа {key!r}")
+            name = reader.value()
+            reader.expect(":")
+            if name == key:
+                break
+            reader.value()
+            reader.expect(",}")
+
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
+
+
+def iter_json_array(path: str, prefix: str = "item") -> Iterator[Dict]:
+    """
+    записи из большого JSON-массива без чтения файла целиком:
+    через ijson, если он установлен, иначе запасным разбором.
+
+    Args:
+        path: путь к файлу
+        prefix: путь к элементам в терминах ijson: "item" - массив
+                на верхнем уровне, "laureates.item" - массив по ключу
+                laureates (как в ответе АПИ). без ijson поддерживаются
+                только эти два вида
+    """
+    if ijson is not None:
+        with open(path, "rb") as f:
+            yield from ijson.items(f, prefix, use_float=True)
+        return
+
+    parts = prefix.split(".")
+    if parts == ["item"]:
+        key = None
+    elif len(parts) == 2 and parts[1] == "item":
+        key = parts[0]
+    else:
+        raise ValueError(f"для prefix={prefix!r} нужен ijson")
+    with open(path, encoding="utf-8") as f:
+        yield from _iter_json_array_stdlib(f, key)
+
+
+def detect_format(path: str) -> Tuple[str, Optional[str]]:
+    """
+    формат входного файла по расширению и первому символу
+
+    Returns:
+        ("jsonl", None) или ("json", prefix для iter_json_array)
+    """
+    with open(path, encoding="utf-8") as f:
+        head = f.read(4096).lstrip()
+    first = head[:1]
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl", None
+    if first == "[":
+        return "json", "item"
+    if extension == ".json":
+        return "json", "laureates.item"
+    return "jsonl", None
+
+
+def iter_raw_records(
+    path: str, fmt: Optional[str] = None, prefix: Optional[str] = None
+) -> Iterator[Dict]:
+    """
+    сырые лауреаты из файла по одному
+
+    Args:
+        path: файл JSONL, JSON-массив или ответ АПИ
+        fmt: "jsonl" или "json" (по умолчанию - detect_format)
+        prefix: путь к массиву для "json" (см. iter_json_array)
+    """
+    detected, detected_prefix = detect_format(path)
+    fmt = fmt or detected
+    if fmt == "jsonl":
+        return iter_jsonl(path)
+    if fmt == "json":
+        return iter_json_array(path, prefix or detected_prefix or "item")
+    raise ValueError(f"неизвестный формат: {fmt}")
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    """списки по batch_size элементов (последний может быть короче)"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def ingest(
+    input_path: str,
+    output_path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    fmt: Optional[str] = None,
+    prefix: Optional[str] = None,
+    processor: Callable[[Dict], Dict] = get_laureate_data,
+) -> int:
+    """
+    функция потоково обрабатывает лауреатов из файла: записи читаются
+    по одной, обрабатываются processor пачками по batch_size и сразу
+    дописываются в выходной JSONL, поэтому в памяти всегда не больше
+    одной пачки независимо от размера входа.
+
+    Args:
+        input_path: входной файл (см. iter_raw_records)
+        output_path: выходной файл JSONL (по обработанному лауреату на строку)
+        batch_size: размер пачки
+        fmt, prefix: формат входа (см. iter_raw_records)
+        processor: обработка одного сырого лауреата
+
+    Returns:
+        количество записанных лауреатов
+    """
+    total = 0
+    with open(output_path, "w", encoding="utf-8") as out:
+        records = iter_raw_records(input_path, fmt, prefix)
+        batches = iter_batches(records, batch_size)
+        while True:
+            # чтение с разбором, обработка и запись замеряются по отдельности
+            with profiling.span("read"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            with profiling.span("process", records=len(batch)):
+                processed = [processor(record) for record in batch]
+            with profiling.span("write", records=len(batch)):
+                out.writelines(
+                    json.dumps(record, ensure_ascii=False) + "\n"
+                    for record in processed
+                )
+            total += len(batch)
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="потоковая обработка лауреатов из JSONL/JSON в JSONL"
+    )
+    parser.add_argument(
+        "input", help="входной файл: JSONL, JSON-массив или ответ АПИ"
+    )
+    parser.add_argument("output", help="выходной файл JSONL")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--format", choices=("jsonl", "json"), dest="fmt")
+    parser.add_argument(
+        "--prefix", help='путь к массиву для JSON, например "laureates.item"'
+    )
+    args = parser.parse_args(argv)
+    total = ingest(args.input, args.output, args.batch_size, args.fmt, args.prefix)
+    print(f"Обработано лауреатов: {total}")
+
+
+if __name__ == "__main__":
+    main()
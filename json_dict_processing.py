@@ -1,4 +1,21 @@
-from typing import Any, Callable, Dict, List, Tuple, Union
+from collections import Counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from vocabulary import vocabulary
+
+# счетчики извлечения полей: (поле, "ok" | "none" | "error") -> число записей.
+# None - не считаем (см. enable_field_counts)
+_FIELD_COUNTS: Optional[Counter] = None
 
 
 def extract_nested_value(obj: Any, keys: List[str], none: Any = None) -> Any:
@@ -40,6 +57,9 @@ def process_dictionary_with_config(
         config: конфигурация вида:
                 - {атрибут: [путь, к, данным]} — без трансформации,
                 - {атрибут: ([путь, к, данным], обработка)} — с трансформацией
+                - {атрибут: ([путь, к, данным], вложенный_конфиг)} — список
+                  словарей по пути обрабатывается вложенным конфигом
+                  (пустой или отсутствующий список дает [])
 
     Returns:
         плоский словарь с извлечёнными и преобразованными значениями
@@ -49,7 +69,13 @@ def process_dictionary_with_config(
         if isinstance(spec, tuple):
             path_list, transform = spec
             raw_value = extract_nested_value(dictionary, path_list)
-            if raw_value is not None:
+            if isinstance(transform, dict):
+                result[attr_name] = (
+                    process_list_of_dicts_with_config(raw_value, transform)
+                    if raw_value
+                    else []
+                )
+            elif raw_value is not None:
                 try:
                     result[attr_name] = transform(raw_value)
                 except (ValueError, TypeError):
@@ -78,22 +104,284 @@ def process_list_of_dicts_with_config(
     return [process_dictionary_with_config(item, config) for item in list_of_dicts]
 
 
+def _compile_path(keys: List[str]) -> Callable[[Any], Any]:
+    """
+    функция один раз разбирает путь с индексами списков и возвращает
+    функцию доступа, повторяющую поведение extract_nested_value.
+
+    Args:
+        keys: список ключей или индексов для последовательного доступа
+
+    Returns:
+        функция, принимающая объект и возвращающая значение по пути или None
+    """
+    # индексы списков разрешаются заранее, чтобы не вызывать isdigit/int
+    hops = tuple((key, int(key) if key.isdigit() else None) for key in keys)
+
+    def getter(obj: Any) -> Any:
+        current = obj
+        for key, idx in hops:
+            if isinstance(current, dict) and key in current:
+                current = current[key]
+            elif idx is not None and isinstance(current, list):
+                if idx < len(current):
+                    current = current[idx]
+                else:
+                    return None
+            else:
+                return None
+        return current
+
+    return getter
+
+
+def compile_config(
+    config: Dict[str, Union[List[str], Tuple[List[str], Callable]]],
+    counts: Optional[Counter] = None,
+    name: str = "",
+    record: Optional[type] = None,
+    categorical: Iterable[str] = (),
+) -> Callable[[Dict], Dict[str, Any]]:
+    """
+    функция компилирует конфигурацию в план извлечения: генерируется
+    специализированная функция, в которой пути уже развернуты в цепочки
+    обращений по ключам, поэтому на каждую запись не приходится
+    ни проверок спецификации, ни обхода списка ключей.
+    результат совпадает с process_dictionary_with_config.
+
+    Args:
+        config: конфигурация обработки полей
+        counts: если задан, план считает в нем по каждому полю записи
+                со значением ("ok"), без значения ("none") и с ошибкой
+                преобразования ("error"); ключи - ("имя.поле", вид)
+        name: имя конфига для ключей counts
+        record: если задан, план вместо словаря заполняет объект этого
+                класса (см. records.record_type): поля пишутся атрибутами,
+                вложенные списки - объектами классов из record.nested
+        categorical: поля (и во вложенных конфигах тоже), строки которых
+                     интернируются в общий словарь поля (vocabulary.vocabulary):
+                     у всех записей одно значение - один объект строки,
+                     а коды значений общие для группировок
+
+    Returns:
+        функция, принимающая словарь и возвращающая плоский словарь
+        (или объект record)
+    """
+    namespace: Dict[str, Any] = {
+        "_MISSING": (KeyError, TypeError, IndexError),
+        "_counts": counts,
+        "_record": record,
+        "_new": object.__new__,
+    }
+    lines = ["def plan(d):", "    r = _new(_record)" if record else "    r = {}"]
+    nested = {} if record is None else record.nested
+    categorical = frozenset(categorical)
+    if record is not None:
+        categorical |= record.categorical
+    for i, (attr_name, spec) in enumerate(config.items()):
+        if isinstance(spec, tuple):
+            path_list, transform = spec
+        else:
+            path_list, transform = spec, None
+
+        if any(key.isdigit() for key in path_list):
+            # в пути есть индексы списков - используем заранее собранный доступ
+            namespace[f"_get{i}"] = _compile_path(path_list)
+            lines.append(f"    v = _get{i}(d)")
+        else:
+            access = "d" + "".join(f"[{key!r}]" for key in path_list)
+            lines += [
+                "    try:",
+                f"        v = {access}",
+                "    except _MISSING:",
+                "        v = None",
+            ]
+
+        field = f"{name}.{attr_name}" if name else attr_name
+        if counts is not None:
+            for kind in ("ok", "none", "error"):
+                namespace[f"_{kind}{i}"] = (field, kind)
+
+        if isinstance(transform, dict):
+            # вложенный конфиг - подпроцессор для списка словарей
+            sub_record = nested.get(attr_name)
+            if counts is None:
+                sub = get_processor(
+                    transform, True, record=sub_record, categorical=categorical
+                )
+            else:
+                # свой подпроцессор, чтобы поля считались под именем родителя
+                sub = create_processor(
+                    transform, True, counts, field, sub_record, categorical
+                )
+                lines.append(f"    _counts[_ok{i} if v else _none{i}] += 1")
+            namespace[f"_sub{i}"] = sub
+            lines.append(f"    v = _sub{i}(v) if v else []")
+        else:
+            if transform is not None:
+                namespace[f"_transform{i}"] = transform
+                lines += [
+                    "    if v is not None:",
+                    "        try:",
+                    f"            v = _transform{i}(v)",
+                    "        except (ValueError, TypeError):",
+                    "            v = None",
+                ]
+                if counts is not None:
+                    # запись с ошибкой считается только как error
+                    lines += [
+                        f"            _counts[_error{i}] += 1",
+                        "        else:",
+                        f"            _counts[_none{i} if v is None else _ok{i}] += 1",
+                        "    else:",
+                        f"        _counts[_none{i}] += 1",
+                    ]
+            elif counts is not None:
+                lines.append(f"    _counts[_none{i} if v is None else _ok{i}] += 1")
+            if attr_name in categorical:
+                # одинаковые значения из разных записей - один объект строки
+                # (dict.setdefault словаря поля, без вызова Python-функции)
+                namespace[f"_intern{i}"] = vocabulary(attr_name).canonical.setdefault
+                lines.append(f"    if v.__class__ is str: v = _intern{i}(v, v)")
+        if record is None:
+            lines.append(f"    r[{attr_name!r}] = v")
+        else:
+            lines.append(f"    r.{attr_name} = v")
+    lines.append("    return r")
+
+    exec("\n".join(lines), namespace)
+    return namespace["plan"]
+
+
 def create_processor(
     config: Dict[str, Union[List[str], Tuple[List[str], Callable]]],
     list_processor: bool = False,
+    counts: Optional[Counter] = None,
+    name: str = "",
+    record: Optional[type] = None,
+    categorical: Iterable[str] = (),
 ) -> Callable:
     """
     создает готовый процессор с предзагруженной конфигурацией.
+    конфигурация компилируется один раз (см. compile_config),
+    поэтому на каждую запись приходится только проход по готовому плану.
 
     Args:
         config: конфигурация обработки полей
         list_processor: если True - процессор принимает список словарей
                         если False — один словарь
+        counts, name: счетчики извлечения полей (см. compile_config)
+        record: класс записей вместо словарей (см. compile_config)
+        categorical: интернируемые поля (см. compile_config)
 
     Returns:
         функция-процессор, принимающая данные и возвращающая результат
     """
+    plan = compile_config(config, counts, name, record, categorical)
     if list_processor:
-        return lambda data_list: process_list_of_dicts_with_config(data_list, config)
+        return lambda data_list: [plan(item) for item in data_list]
     else:
-        return lambda data_dict: process_dictionary_with_config(data_dict, config)
+        return plan
+
+
+class CompiledConfig:
+    """
+    скомпилированный конфиг, который можно передать в другой процесс:
+    сгенерированный план не сериализуется, поэтому pickle передает
+    сам конфиг, а план собирается заново при распаковке.
+    все функции-трансформации в конфиге должны быть обычными функциями
+    модулей (не lambda), иначе конфиг не сериализуется.
+
+    Args:
+        config: конфигурация обработки полей
+        list_processor: если True - принимает список словарей
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Union[List[str], Tuple[List[str], Callable]]],
+        list_processor: bool = False,
+    ):
+        self.config = config
+        self.list_processor = list_processor
+        self._processor = create_processor(config, list_processor)
+
+    def __call__(self, data: Any) -> Any:
+        return self._processor(data)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"config": self.config, "list_processor": self.list_processor}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["config"], state["list_processor"])
+
+
+# реестр процессоров: (id конфига, list_processor, со счетчиками,
+# класс записей, интернируемые поля) -> (конфиг, процессор); конфиг
+# хранится рядом, чтобы его id не мог достаться другому объекту
+_PROCESSORS: Dict[
+    Tuple[int, bool, bool, Optional[type], FrozenSet[str]], Tuple[Dict, Callable]
+] = {}
+
+
+def get_processor(
+    config: Dict[str, Union[List[str], Tuple[List[str], Callable]]],
+    list_processor: bool = False,
+    name: str = "",
+    record: Optional[type] = None,
+    categorical: Iterable[str] = (),
+) -> Callable:
+    """
+    возвращает процессор для конфигурации из реестра, собирая его
+    при первом обращении. конфиг определяется по идентичности объекта,
+    поэтому изменения конфига после первого вызова не учитываются.
+    пока включены счетчики полей (enable_field_counts), отдается
+    процессор, который их ведет.
+
+    Args:
+        config: конфигурация обработки полей
+        list_processor: если True - процессор принимает список словарей
+                        если False — один словарь
+        name: имя конфига в счетчиках полей
+        record: класс записей вместо словарей (см. compile_config)
+        categorical: интернируемые поля (см. compile_config)
+
+    Returns:
+        функция-процессор, принимающая данные и возвращающая результат
+    """
+    counts = _FIELD_COUNTS
+    categorical = frozenset(categorical)
+    key = (id(config), list_processor, counts is not None, record, categorical)
+    entry = _PROCESSORS.get(key)
+    if entry is None:
+        processor = create_processor(
+            config, list_processor, counts, name, record, categorical
+        )
+        entry = (config, processor)
+        _PROCESSORS[key] = entry
+    return entry[1]
+
+
+def enable_field_counts(counts: Optional[Counter] = None) -> Counter:
+    """
+    включает счетчики извлечения полей для процессоров из get_processor
+    (см. compile_config); считается только в текущем процессе
+
+    Args:
+        counts: куда считать (по умолчанию новый Counter)
+
+    Returns:
+        Counter со счетчиками ("имя.поле", "ok" | "none" | "error") -> число
+    """
+    global _FIELD_COUNTS
+    _FIELD_COUNTS = Counter() if counts is None else counts
+    # процессоры со счетчиками привязаны к прежнему Counter - собираем заново
+    for key in [key for key in _PROCESSORS if key[2]]:
+        del _PROCESSORS[key]
+    return _FIELD_COUNTS
+
+
+def disable_field_counts() -> None:
+    """выключает счетчики полей: get_processor снова отдает обычные процессоры"""
+    global _FIELD_COUNTS
+    _FIELD_COUNTS = None
@@ -1,5 +1,7 @@
-from json_dict_processing import create_processor
+from json_dict_processing import get_processor
+from prizes_configs import CONFIG_PRIZE
 from typing import Optional
+from vocabulary import CATEGORICAL_FIELDS
 
 
 def process_year(year_string: str) -> Optional[int]:
@@ -15,32 +17,12 @@ def process_year(year_string: str) -> Optional[int]:
 
 def process_persons(laureate: dict) -> dict:
     """для обработки призов людей"""
-    processor = person_processor()
-    result = processor(laureate)
-    prizes = laureate.get("nobelPrizes", [])
-    if prizes:
-        from prizes_configs import prize_processor
-
-        prize_proc = prize_processor()
-        result["prizes_relevant"] = prize_proc(prizes)
-    else:
-        result["prizes_relevant"] = []
-    return result
+    return person_processor()(laureate)
 
 
 def process_orgs(laureate: dict) -> dict:
     """для обработки призов организаций"""
-    processor = org_processor()
-    result = processor(laureate)
-    prizes = laureate.get("nobelPrizes", [])
-    if prizes:
-        from prizes_configs import prize_processor
-
-        prize_proc = prize_processor()
-        result["prizes_relevant"] = prize_proc(prizes)
-    else:
-        result["prizes_relevant"] = []
-    return result
+    return org_processor()(laureate)
 
 
 CONFIG_PERSON = {
@@ -50,8 +32,8 @@ CONFIG_PERSON = {
     "birth_year": (["birth", "date"], process_year),
     "country_birth": ["birth", "place", "country", "en"],
     "country_now": ["birth", "place", "countryNow", "en"],
-    # обрабатывается процессором призов, который вы задаете в конфиге для призов
-    "prizes_relevant": (["nobelPrizes"], lambda prizes: prizes),
+    # список призов обрабатывается вложенным конфигом призов
+    "prizes_relevant": (["nobelPrizes"], CONFIG_PRIZE),
 }
 
 CONFIG_ORG = {
@@ -60,14 +42,18 @@ CONFIG_ORG = {
     "founded_year": (["founded", "date"], process_year),
     "country_founded": ["founded", "place", "country", "en"],
     "country_now": ["founded", "place", "countryNow", "en"],
-    # обрабатывается процессором призов, который вы задаете в конфиге для призов
-    "prizes_relevant": (["nobelPrizes"], lambda prizes: prizes),
+    # список призов обрабатывается вложенным конфигом призов
+    "prizes_relevant": (["nobelPrizes"], CONFIG_PRIZE),
 }
 
 
 def person_processor():
-    return create_processor(CONFIG_PERSON, list_processor=False)
+    return get_processor(
+        CONFIG_PERSON, False, name="person", categorical=CATEGORICAL_FIELDS
+    )
 
 
 def org_processor():
-    return create_processor(CONFIG_ORG, list_processor=False)
+    return get_processor(
+        CONFIG_ORG, False, name="org", categorical=CATEGORICAL_FIELDS
+    )
@@ -0,0 +1,22 @@
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    модуль, который импортируется по-настоящему при первом обращении
+    к атрибуту: тяжелые зависимости (numpy, matplotlib, requests)
+    не замедляют импорт и запуск команд, которым они не нужны
+    """
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        # дальше атрибуты берутся напрямую, без __getattr__
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """уже загруженный модуль или LazyModule, который загрузит его позже"""
+    return sys.modules.get(name) or LazyModule(name)
@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import profiling
+from core import get_laureate_data
+from json_dict_processing import CompiledConfig
+
+# меньше этого количества записей пул процессов не окупается
+PARALLEL_THRESHOLD = 20_000
+CHUNK_SIZE = 2_000
+
+# функция обработки записи в процессе пула (задается через _init_worker)
+_worker_func: Optional[Callable[[Any], Any]] = None
+
+
+def _init_worker(func: Callable[[Any], Any]) -> None:
+    global _worker_func
+    _worker_func = func
+
+
+def _process_chunk(chunk: List[Any]) -> List[Any]:
+    return [_worker_func(item) for item in chunk]
+
+
+def parallel_map(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    max_workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    ordered: bool = True,
+    threshold: int = PARALLEL_THRESHOLD,
+) -> List[Any]:
+    """
+    функция применяет func к каждой записи в пуле процессов: записи
+    режутся на куски по chunk_size, func передается в процессы один раз
+    (поэтому должна сериализоваться pickle - функция модуля
+    или CompiledConfig, но не lambda).
+    меньше threshold записей, один процесс или одно ядро - обычный цикл.
+
+    Args:
+        func: обработка одной записи
+        items: записи
+        max_workers: число процессов (по умолчанию - число ядер)
+        chunk_size: размер куска
+        ordered: True - результаты в порядке записей, False - в порядке
+                 готовности кусков (внутри куска порядок сохраняется)
+        threshold: минимальное число записей для пула
+
+    Returns:
+        список результатов
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(items) < threshold:
+        return [func(item) for item in items]
+
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    result: List[Any] = []
+    workers = min(workers, len(chunks))
+    # процессы пула не инструментируются, замеряется вся обработка целиком
+    with profiling.span("process.parallel", records=len(items), workers=workers):
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(func,)
+        ) as pool:
+            if ordered:
+                for processed in pool.map(_process_chunk, chunks):
+                    result.extend(processed)
+            else:
+                futures = [pool.submit(_process_chunk, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    result.extend(future.result())
+    return result
+
+
+def process_list_of_dicts_parallel(
+    list_of_dicts: Sequence[Dict],
+    config: Dict[str, Union[List[str], Tuple[List[str], Callable]]],
+    max_workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    ordered: bool = True,
+    threshold: int = PARALLEL_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    параллельный process_list_of_dicts_with_config (см. parallel_map);
+    конфиг компилируется один раз в каждом процессе
+    """
+    processor = CompiledConfig(config)
+    return parallel_map(
+        processor, list_of_dicts, max_workers, chunk_size, ordered, threshold
+    )
+
+
+def get_laureate_data_parallel(
+    laureates: Sequence[Dict],
+    max_workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    ordered: bool = True,
+    threshold: int = PARALLEL_THRESHOLD,
+) -> List[Dict]:
+    """параллельный core.get_laureate_data по списку лауреатов (см. parallel_map)"""
+    return parallel_map(
+        get_laureate_data, laureates, max_workers, chunk_size, ordered, threshold
+    )
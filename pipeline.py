@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, TextIO
+
+import core
+import profiling
+from http_cache import ResponseCache
+
+# асинхронный конвейер загрузки: страницы качаются, разбираются,
+# обрабатываются и попадают в накопители анализов одновременно, а не
+# этап за этапом, как в core.load_data:
+#
+#   fetch -> [очередь] -> decode -> [очередь] -> process -> [очередь] -> analyze
+#
+# очереди ограничены (queue_size страниц): если следующий этап не успевает,
+# предыдущий ждет места в очереди и не качает/не разбирает лишнего
+
+# сколько страниц может ждать в каждой очереди между этапами
+QUEUE_SIZE = 4
+# метка конца потока страниц в очереди
+_DONE = object()
+
+
+class StageMetrics:
+    """
+    замеры одного этапа конвейера
+
+    Attributes:
+        name: имя этапа
+        items: сколько страниц прошло через этап
+        records: сколько лауреатов в этих страницах (у fetch - 0)
+        nbytes: сколько байт скачано (только у fetch)
+        busy: суммарное время работы этапа, с (у fetch запросы идут
+              одновременно, поэтому busy может быть больше wall)
+        blocked: сколько этап ждал места в очереди следующего, с
+        wall: от начала до конца этапа, с
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.records = 0
+        self.nbytes = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def wall(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    def throughput(self) -> float:
+        """лауреатов в секунду за время этапа (у fetch - страниц)"""
+        count = self.items if self.name == "fetch" else self.records
+        return count / self.wall if self.wall > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "items": self.items,
+            "records": self.records,
+            "bytes": self.nbytes,
+            "busy_s": self.busy,
+            "blocked_s": self.blocked,
+            "wall_s": self.wall,
+            "throughput": self.throughput(),
+        }
+
+    def __repr__(self) -> str:
+        return f"StageMetrics({self.as_dict()!r})"
+
+
+class PipelineResult(NamedTuple):
+    """
+    laureates: обработанные лауреаты в порядке АПИ (пусто при keep=False)
+    results: результаты анализов {имя: результат}, как у report.run_analyses
+    metrics: замеры этапов fetch, decode, process, analyze
+    wall: время всего конвейера, с
+    """
+
+    laureates: List[Any]
+    results: Dict[str, Any]
+    metrics: Dict[str, StageMetrics]
+    wall: float
+
+
+def _timed(func: Callable, *args: Any) -> tuple:
+    # выполняется в потоке пула: время самой работы без ожидания в очереди пула
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+async def _put(queue: asyncio.Queue, item: Any, metrics: StageMetrics) -> None:
+    start = time.perf_counter()
+    await queue.put(item)
+    metrics.blocked += time.perf_counter() - start
+
+
+def _decode_page(content: Any) -> List[dict]:
+    # страницы из кеша уже разобраны
+    page = content if isinstance(content, dict) else json.loads(content)
+    return page.get("laureates", [])
+
+
+def _process_page(process: Callable[[dict], Any], page: List[dict]) -> List[Any]:
+    with profiling.span("process", records=len(page)):
+        return [process(laureate) for laureate in page]
+
+
+def _analyze_page(adders: List[Callable], page: List[Any]) -> None:
+    for item in page:
+        prizes = item.get("prizes_relevant", [])
+        for add in adders:
+            add(item, prizes)
+
+
+async def _fetch_stage(
+    out: asyncio.Queue,
+    metrics: StageMetrics,
+    executor: Executor,
+    url: str,
+    page_size: int,
+    max_fetches: int,
+    retries: int,
+    backoff: float,
+    cache: Optional[ResponseCache],
+) -> None:
+    """
+    первая страница нужна целиком (meta.count и шаг), остальные качаются
+    окном из max_fetches одновременных запросов; страницы уходят дальше
+    в порядке offset. пока следующий этап не забрал страницу, новые
+    запросы не начинаются
+    """
+    loop = asyncio.get_running_loop()
+    session = core._make_session(max_fetches)
+
+    def fetch(offset: int, limit: int) -> Any:
+        params = {"offset": offset, "limit": limit}
+        if cache is not None:
+            return core._get_json(session, url, params, retries, backoff, cache)
+        return core._get_content(session, url, params, retries, backoff)
+
+    def account(content: Any, elapsed: float) -> None:
+        metrics.items += 1
+        metrics.busy += elapsed
+        if not isinstance(content, dict):
+            metrics.nbytes += len(content)
+
+    metrics.started = time.perf_counter()
+    try:
+        content, elapsed = await loop.run_in_executor(
+            executor, _timed, fetch, 0, page_size
+        )
+        account(content, elapsed)
+        if not isinstance(content, dict):
+            content = json.loads(content)
+        meta = content.get("meta", {})
+        # сервер может урезать limit - шагаем по тому, что он вернул
+        step = meta.get("limit") or page_size
+        total = meta.get("count", len(content.get("laureates", [])))
+        await _put(out, content, metrics)
+
+        offsets = iter(range(step, total, step))
+        window: deque = deque()
+        for offset in offsets:
+            window.append(
+                loop.run_in_executor(executor, _timed, fetch, offset, step)
+            )
+            if len(window) >= max_fetches:
+                break
+        while window:
+            content, elapsed = await window.popleft()
+            account(content, elapsed)
+            await _put(out, content, metrics)
+            offset = next(offsets, None)
+            if offset is not None:
+                window.append(
+                    loop.run_in_executor(executor, _timed, fetch, offset, step)
+                )
+    finally:
+        session.close()
+        metrics.finished = time.perf_counter()
+    await out.put(_DONE)
+
+
+async def _map_stage(
+    source: asyncio.Queue,
+    out: Optional[asyncio.Queue],
+    metrics: StageMetrics,
+    executor: Executor,
+    func: Callable,
+    *args: Any,
+) -> None:
+    """этап, который обрабатывает каждую страницу func в executor"""
+    loop = asyncio.get_running_loop()
+    while True:
+        page = await source.get()
+        if page is _DONE:
+            break
+        if metrics.started is None:
+            metrics.started = time.perf_counter()
+        result, elapsed = await loop.run_in_executor(
+            executor, _timed, func, *args, page
+        )
+        metrics.items += 1
+        metrics.busy += elapsed
+        metrics.records += len(result if result is not None else page)
+        if out is not None:
+            await _put(out, result, metrics)
+    metrics.finished = time.perf_counter()
+    if metrics.started is None:
+        metrics.started = metrics.finished
+    if out is not None:
+        await out.put(_DONE)
+
+
+async def run_pipeline_async(
+    url: str = core.URL_LAUREATES_API,
+    page_size: int = core.PAGE_SIZE,
+    names: Optional[Sequence[str]] = None,
+    max_fetches: int = core.MAX_WORKERS,
+    queue_size: int = QUEUE_SIZE,
+    process: Callable[[dict], Any] = core.get_laureate_data,
+    keep: bool = True,
+    cache: Optional[ResponseCache] = None,
+    retries: int = core.RETRIES,
+    backoff: float = core.BACKOFF,
+) -> PipelineResult:
+    """
+    загружает и обрабатывает лауреатов конвейером и сразу считает анализы
+
+    Args:
+        url: адрес эндпоинта лауреатов
+        page_size: сколько записей запрашивать за раз
+        names: какие анализы считать (по умолчанию все из report.REGISTRY)
+        max_fetches: сколько страниц качать одновременно
+        queue_size: сколько страниц может ждать между этапами
+        process: обработка сырого лауреата (core.get_laureate_data
+                 или core.get_laureate_record)
+        keep: сохранять обработанных лауреатов в результате
+        cache: дисковый кеш ответов (None - всегда качать из сети)
+        retries: число повторов запроса страницы при ошибке
+        backoff: базовая пауза перед повтором, в секундах
+
+    Returns:
+        PipelineResult: лауреаты, результаты анализов и замеры этапов
+    """
+    import report
+
+    names = list(report.REGISTRY) if names is None else list(names)
+    unknown = [name for name in names if name not in report.REGISTRY]
+    if unknown:
+        raise ValueError(f"неизвестные анализы: {unknown}")
+    accumulators = [report.REGISTRY[name]["accumulator"]() for name in names]
+    laureates: List[Any] = []
+    adders = [acc.add for acc in accumulators]
+    if keep:
+        adders.append(lambda item, prizes: laureates.append(item))
+
+    metrics = {
+        name: StageMetrics(name) for name in ("fetch", "decode", "process", "analyze")
+    }
+    queues = [asyncio.Queue(queue_size) for _ in range(3)]
+    # сеть - в пуле потоков по числу одновременных запросов; разбор,
+    # обработка и анализы - в одном потоке: из-за GIL больше потоков
+    # на Python-коде не ускоряют, а порядок страниц сохраняется
+    network = ThreadPoolExecutor(max_fetches, thread_name_prefix="fetch")
+    cpu = ThreadPoolExecutor(1, thread_name_prefix="cpu")
+    start = time.perf_counter()
+    tasks = [
+        asyncio.ensure_future(coroutine)
+        for coroutine in (
+            _fetch_stage(
+                queues[0],
+                metrics["fetch"],
+                network,
+                url,
+                page_size,
+                max_fetches,
+                retries,
+                backoff,
+                cache,
+            ),
+            _map_stage(queues[0], queues[1], metrics["decode"], cpu, _decode_page),
+            _map_stage(
+                queues[1], queues[2], metrics["process"], cpu, _process_page, process
+            ),
+            _map_stage(queues[2], None, metrics["analyze"], cpu, _analyze_page, adders),
+        )
+    ]
+    try:
+        with profiling.span("pipeline", url=url, page_size=page_size):
+            await asyncio.gather(*tasks)
+    except BaseException:
+        # ошибка одного этапа останавливает остальные (иначе они ждали бы
+        # очередь вечно)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        network.shutdown(wait=False, cancel_futures=True)
+        cpu.shutdown(wait=True)
+    wall = time.perf_counter() - start
+    with profiling.span("analyze.result", analyses=names):
+        results = dict(zip(names, [acc.result() for acc in accumulators]))
+    return PipelineResult(laureates, results, metrics, wall)
+
+
+def run_pipeline(*args: Any, **kwargs: Any) -> PipelineResult:
+    """run_pipeline_async для синхронного кода (см. его аргументы)"""
+    return asyncio.run(run_pipeline_async(*args, **kwargs))
+
+
+def print_metrics(result: PipelineResult, file: Optional[TextIO] = None) -> None:
+    """печатает замеры этапов конвейера таблицей"""
+    file = file or sys.stdout
+    print(f"Конвейер: {result.wall:.3f} c", file=file)
+    print(
+        f"  {'этап':<10} {'страниц':>8} {'лауреатов':>10} {'работа, c':>10}"
+        f" {'ожидание, c':>12} {'время, c':>9} {'в секунду':>10}",
+        file=file,
+    )
+    for stage in result.metrics.values():
+        print(
+            f"  {stage.name:<10} {stage.items:>8} {stage.records:>10}"
+            f" {stage.busy:>10.3f} {stage.blocked:>12.3f} {stage.wall:>9.3f}"
+            f" {stage.throughput():>10.1f}",
+            file=file,
+        )
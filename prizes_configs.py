@@ -1,14 +1,21 @@
-from json_dict_processing import create_processor
+from typing import Optional
+
+from json_dict_processing import get_processor
+from vocabulary import CATEGORICAL_FIELDS
+
+
+def process_award_year(year_string: str) -> Optional[int]:
+    """год награждения из строки; обычная функция, а не lambda,
+    чтобы конфиг можно было передать в другой процесс (pickle)"""
+    return int(year_string[:4]) if year_string and year_string[:4].isdigit() else None
+
 
 # конфиг для обработки приза
 CONFIG_PRIZE = {
     "prize_amount": ["prizeAmount"],
     "prize_amount_adjusted": ["prizeAmountAdjusted"],
     # мейби это лишняя обработка, но я не знаю как записан год
-    "award_year": (
-        ["awardYear"],
-        lambda s: int(s[:4]) if s and s[:4].isdigit() else None,
-    ),
+    "award_year": (["awardYear"], process_award_year),
     "category_en": ["category", "en"],
     "prize_status": ["prizeStatus"],
 }
@@ -16,4 +23,6 @@ CONFIG_PRIZE = {
 
 # процессор для обработки списка призов
 def prize_processor():
-    return create_processor(CONFIG_PRIZE, list_processor=True)
+    return get_processor(
+        CONFIG_PRIZE, True, name="prize", categorical=CATEGORICAL_FIELDS
+    )
@@ -0,0 +1,275 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+import json_dict_processing
+
+# включенный трассировщик (см. enable); None - инструментирование выключено
+# и span ничего не делает
+_TRACER: Optional["Tracer"] = None
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """
+    сборщик замеров: интервалы span (время, поток, аргументы и, если
+    включен tracemalloc, память), накопленные таймеры для мест, где
+    интервал на каждый вызов слишком дорог, и счетчики извлечения полей
+    из json_dict_processing.
+
+    Args:
+        memory: отслеживать выделения памяти через tracemalloc (заметно
+                замедляет работу). память общая на процесс, поэтому
+                в многопоточных участках цифры приблизительные
+        fields: вести счетчики извлечения полей конфигов
+    """
+
+    def __init__(self, memory: bool = False, fields: bool = True):
+        self.memory = memory
+        self.fields = fields
+        # законченные интервалы: (имя, начало нс, длительность нс, id потока,
+        # аргументы, прирост памяти, пик памяти)
+        self.spans: List[tuple] = []
+        # накопленные таймеры: имя -> [вызовы, нс]
+        self.timers: Dict[str, List[int]] = {}
+        self.field_counts: Counter = Counter()
+        self.pid = os.getpid()
+        self.origin = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.fields:
+            json_dict_processing.enable_field_counts(self.field_counts)
+
+    def stop(self) -> None:
+        if self.fields:
+            json_dict_processing.disable_field_counts()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        """интервал с именем name; args попадают в трассу как есть"""
+        memory = self.memory and tracemalloc.is_tracing()
+        if memory:
+            # пик считается для каждого вложенного интервала отдельно:
+            # перед сбросом пика родителю запоминаем, сколько он уже видел
+            stack = self._local.__dict__.setdefault("stack", [])
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1] = max(stack[-1], peak)
+            tracemalloc.reset_peak()
+            stack.append(current)
+            start_memory = current
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            allocated = peak_allocated = None
+            if memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(stack.pop(), peak)
+                if stack:
+                    stack[-1] = max(stack[-1], peak)
+                allocated = current - start_memory
+                peak_allocated = peak - start_memory
+            record = (
+                name,
+                start - self.origin,
+                duration,
+                threading.get_ident(),
+                args,
+                allocated,
+                peak_allocated,
+            )
+            with self._lock:
+                self.spans.append(record)
+
+    def add_time(self, name: str, nanoseconds: int, calls: int = 1) -> None:
+        """добавляет время к накопленному таймеру name"""
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0])
+            timer[0] += calls
+            timer[1] += nanoseconds
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        сводка по именам интервалов и таймеров в порядке первого появления
+
+        Returns:
+            список словарей name, calls, total_ms, mean_ms, max_ms
+            и, если отслеживалась память, allocated_kb и peak_kb
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        spans = sorted(self.spans, key=lambda record: record[1])
+        for name, _, duration, _, _, allocated, peak in spans:
+            row = rows.setdefault(
+                name, {"name": name, "calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            row["calls"] += 1
+            row["total_ms"] += duration / 1e6
+            row["max_ms"] = max(row["max_ms"], duration / 1e6)
+            if allocated is not None:
+                row["allocated_kb"] = row.get("allocated_kb", 0) + allocated / 1024
+                row["peak_kb"] = max(row.get("peak_kb", 0), peak / 1024)
+        for name, (calls, total) in self.timers.items():
+            rows[name] = {
+                "name": name,
+                "calls": calls,
+                "total_ms": total / 1e6,
+                "max_ms": None,
+            }
+        for row in rows.values():
+            row["mean_ms"] = row["total_ms"] / row["calls"] if row["calls"] else 0.0
+        return list(rows.values())
+
+    def print_summary(self, file: Optional[TextIO] = None) -> None:
+        """печатает сводку по интервалам и счетчикам полей таблицей"""
+        print("Замеры:", file=file)
+        header = f"  {'этап':<36} {'вызовы':>8} {'всего, мс':>11} {'ср., мс':>9}"
+        header += f" {'макс., мс':>10}"
+        if self.memory:
+            header += f" {'память, КБ':>11} {'пик, КБ':>9}"
+        print(header, file=file)
+        for row in self.summary():
+            # у накопленных таймеров нет отдельных интервалов и максимума
+            max_ms = "-" if row["max_ms"] is None else f"{row['max_ms']:.2f}"
+            line = (
+                f"  {row['name']:<36} {row['calls']:>8} {row['total_ms']:>11.2f}"
+                f" {row['mean_ms']:>9.3f} {max_ms:>10}"
+            )
+            if self.memory and "allocated_kb" in row:
+                line += f" {row['allocated_kb']:>11.1f} {row['peak_kb']:>9.1f}"
+            print(line, file=file)
+
+        if self.field_counts:
+            print("\nИзвлечение полей:", file=file)
+            print(f"  {'поле':<44} {'ok':>8} {'none':>8} {'error':>6}", file=file)
+            fields = dict.fromkeys(field for field, _ in self.field_counts)
+            for field in sorted(fields):
+                counts = [self.field_counts[field, kind] for kind in ("ok", "none")]
+                errors = self.field_counts[field, "error"]
+                print(
+                    f"  {field:<44} {counts[0]:>8} {counts[1]:>8} {errors:>6}",
+                    file=file,
+                )
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        замеры в формате Chrome trace (chrome://tracing, Perfetto):
+        интервалы - события "X", сводка таймеров и счетчики полей - в otherData
+        """
+        events = []
+        for name, start, duration, tid, args, allocated, peak in self.spans:
+            event_args = dict(args)
+            if allocated is not None:
+                event_args["allocated_bytes"] = allocated
+                event_args["peak_bytes"] = peak
+            events.append(
+                {
+                    "name": name,
+                    "cat": name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": start / 1000,
+                    "dur": duration / 1000,
+                    "pid": self.pid,
+                    "tid": tid,
+                    "args": event_args,
+                }
+            )
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "timers": {
+                    name: {"calls": calls, "total_ms": total / 1e6}
+                    for name, (calls, total) in self.timers.items()
+                },
+                "field_counts": {
+                    f"{field}:{kind}": count
+                    for (field, kind), count in sorted(self.field_counts.items())
+                },
+            },
+        }
+
+    def save_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False, default=str)
+
+
+def enable(memory: bool = False, fields: bool = True) -> Tracer:
+    """
+    включает инструментирование: span в модулях конвейера начинают
+    записывать интервалы в новый Tracer (см. Tracer)
+
+    Returns:
+        включенный Tracer
+    """
+    global _TRACER
+    disable()
+    _TRACER = Tracer(memory, fields)
+    _TRACER.start()
+    return _TRACER
+
+
+def disable() -> Optional[Tracer]:
+    """выключает инструментирование и возвращает прежний Tracer"""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is not None:
+        tracer.stop()
+    return tracer
+
+
+def active() -> Optional[Tracer]:
+    """включенный Tracer или None"""
+    return _TRACER
+
+
+def span(name: str, **args: Any):
+    """
+    интервал для трассы, если инструментирование включено (см. enable),
+    иначе пустой контекст без накладных расходов на замеры:
+
+        with profiling.span("fetch", url=url):
+            ...
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, **args)
+
+
+@contextmanager
+def profiled(
+    memory: bool = False,
+    fields: bool = True,
+    trace_path: Optional[str] = None,
+    summary: Optional[TextIO] = sys.stderr,
+) -> Iterator[Tracer]:
+    """
+    инструментирование на время блока: в конце сводка печатается
+    в summary (None - не печатать), трасса пишется в trace_path
+    """
+    tracer = enable(memory, fields)
+    try:
+        yield tracer
+    finally:
+        disable()
+        if trace_path is not None:
+            tracer.save_chrome_trace(trace_path)
+        if summary is not None:
+            tracer.print_summary(file=summary)
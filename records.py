@@ -0,0 +1,215 @@
+import keyword
+from collections.abc import ItemsView, MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from json_dict_processing import get_processor
+from laureates_configs import CONFIG_ORG, CONFIG_PERSON
+from prizes_configs import CONFIG_PRIZE
+from vocabulary import CATEGORICAL_FIELDS, vocabulary
+
+# поля, которые дописывают к лауреатам core.get_laureate_data
+# и dataset_helpers.add_migration_field
+LAUREATE_EXTRA_FIELDS = ("type_", "country_of_origin_adjusted", "has_migrated")
+# метка незаданного поля (None - обычное значение поля)
+_UNSET = object()
+
+
+class Record(MutableMapping):
+    """
+    компактная запись с полями в __slots__ вместо словаря: поля читаются
+    атрибутами (record.country_now), а для существующего кода запись
+    ведет себя как словарь из core.get_laureate_data (record["id"],
+    record.get(...), in, итерация по заданным полям, сравнение со словарем).
+    незаданное поле отсутствует, как отсутствующий ключ словаря;
+    ключи не из fields хранятся в отдельном словаре _extra.
+    классы создаются по конфигам функцией record_type.
+
+    выигрыш записей - только в памяти. record.get написан на Python
+    и медленнее dict.get, а накопители анализов читают поля через .get,
+    поэтому report.run_analyses по записям медленнее, чем по словарям;
+    быстрый доступ к полю у записи - атрибутом
+    """
+
+    __slots__ = ("_extra",)
+
+    # поля в порядке ключей словаря
+    fields: Tuple[str, ...] = ()
+    _field_set: frozenset = frozenset()
+    # поля, строки которых интернируются в словари полей (vocabulary)
+    categorical: frozenset = frozenset()
+    # поле со вложенным конфигом -> класс записей его элементов
+    nested: Dict[str, type] = {}
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        for source in (values or {}, kwargs):
+            for key, value in source.items():
+                self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        extra = getattr(self, "_extra", None)
+        if extra is None:
+            raise KeyError(key)
+        return extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # быстрее, чем Mapping.get через исключение KeyError
+        if key in self._field_set:
+            return getattr(self, key, default)
+        extra = getattr(self, "_extra", None)
+        return default if extra is None else extra.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._field_set:
+            return hasattr(self, key)
+        extra = getattr(self, "_extra", None)
+        return extra is not None and key in extra
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._field_set:
+            setattr(self, key, value)
+            return
+        extra = getattr(self, "_extra", None)
+        if extra is None:
+            extra = self._extra = {}
+        extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._field_set:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        extra = getattr(self, "_extra", None)
+        if extra is None:
+            raise KeyError(key)
+        del extra[key]
+
+    def _pairs(self) -> List[Tuple[str, Any]]:
+        pairs = [
+            (field, value)
+            for field in self.fields
+            if (value := getattr(self, field, _UNSET)) is not _UNSET
+        ]
+        extra = getattr(self, "_extra", None)
+        if extra:
+            pairs.extend(extra.items())
+        return pairs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([key for key, _ in self._pairs()])
+
+    def __len__(self) -> int:
+        return len(self._pairs())
+
+    def items(self) -> ItemsView:
+        # пары собираются одним списком, а не через __iter__ и __getitem__
+        # по каждому ключу, как в Mapping.items (fingerprint, dict(record))
+        return _RecordItems(self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """обычный словарь, вложенные записи - тоже словари"""
+        return {
+            key: (
+                [item.to_dict() for item in value]
+                if key in self.nested and isinstance(value, list)
+                else value
+            )
+            for key, value in self.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        """запись из словаря (вложенные списки словарей - тоже в записи)"""
+        record = cls()
+        for key, value in data.items():
+            item_type = cls.nested.get(key)
+            if item_type is not None and isinstance(value, list):
+                value = [item_type.from_dict(item) for item in value]
+            elif key in cls.categorical and value.__class__ is str:
+                value = vocabulary(key).intern(value)
+            record[key] = value
+        return record
+
+
+class _RecordItems(ItemsView):
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        return iter(self._mapping._pairs())
+
+
+def record_type(
+    name: str,
+    config: Dict,
+    extra_fields: Iterable[str] = (),
+    nested: Optional[Dict[str, type]] = None,
+) -> type:
+    """
+    создает класс записей (подкласс Record) с полями из конфига обработки
+
+    Args:
+        name: имя класса (класс нужно сохранить в переменную модуля
+              с тем же именем, иначе записи не сериализуются pickle)
+        config: конфиг обработки (ключи - поля записи)
+        extra_fields: поля, которые дописываются после обработки
+        nested: поле со вложенным конфигом -> класс записей его элементов
+
+    Returns:
+        новый класс
+    """
+    fields = tuple(config) + tuple(f for f in extra_fields if f not in config)
+    bad = [
+        field
+        for field in fields
+        if not field.isidentifier() or keyword.iskeyword(field) or field[0] == "_"
+    ]
+    if bad:
+        raise ValueError(f"поля нельзя сделать атрибутами: {bad}")
+    namespace = {
+        "__slots__": fields,
+        "__module__": __name__,
+        "fields": fields,
+        "_field_set": frozenset(fields),
+        "categorical": CATEGORICAL_FIELDS & frozenset(fields),
+        "nested": dict(nested or {}),
+    }
+    return type(name, (Record,), namespace)
+
+
+Prize = record_type("Prize", CONFIG_PRIZE)
+Person = record_type(
+    "Person", CONFIG_PERSON, LAUREATE_EXTRA_FIELDS, {"prizes_relevant": Prize}
+)
+Organization = record_type(
+    "Organization", CONFIG_ORG, LAUREATE_EXTRA_FIELDS, {"prizes_relevant": Prize}
+)
+
+RECORD_TYPES = {"person": Person, "organization": Organization}
+
+
+def process_person_record(laureate: dict) -> Person:
+    """как laureates_configs.process_persons, но возвращает Person"""
+    return get_processor(CONFIG_PERSON, False, "person", Person)(laureate)
+
+
+def process_org_record(laureate: dict) -> Organization:
+    """как laureates_configs.process_orgs, но возвращает Organization"""
+    return get_processor(CONFIG_ORG, False, "org", Organization)(laureate)
+
+
+def to_record(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    обработанный лауреат (словарь из core.get_laureate_data) в виде записи;
+    лауреаты неизвестного типа остаются словарями
+    """
+    record_class = RECORD_TYPES.get(item.get("type_"))
+    return item if record_class is None else record_class.from_dict(item)
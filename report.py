@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TextIO
+
+import profiling
+from aggregations import (
+    RecordAccumulator,
+    SummaryAccumulator,
+    accumulate,
+    bind_derived,
+    print_summary,
+)
+from dataset_helpers import (
+    AgeAccumulator,
+    CountriesAccumulator,
+    GenderTrendsAccumulator,
+    MultipleLaureatesAccumulator,
+    RefusalsAccumulator,
+    plot_age_by_category,
+    plot_countries_and_categories,
+    plot_gender_trends,
+    plot_multiple_laureates,
+    print_age_by_category,
+    print_countries_and_categories,
+    print_gender_trends,
+    print_multiple_laureates,
+    print_refusals,
+    show_age_by_category,
+    show_countries_and_categories,
+    show_gender_trends,
+    show_multiple_laureates,
+    show_refusals,
+)
+from figure_cache import FigureCache, figure_key
+from lazy import lazy_module
+from result_cache import memoized
+
+# pyplot и numpy загружаются при первом обращении, а не при импорте отчета
+plt = lazy_module("matplotlib.pyplot")
+np = lazy_module("numpy")
+
+# имя анализа -> {"accumulator": фабрика накопителя, "show": вывод для ноутбука,
+# "text": текстовый вывод, "plot": генератор графиков}; порядок - как в ноутбуке
+REGISTRY: Dict[str, Dict[str, Optional[Callable]]] = {}
+
+
+def register(
+    name: str,
+    factory: Callable[[], RecordAccumulator],
+    show: Callable[[Any], None],
+    text: Optional[Callable[..., None]] = None,
+    plot: Optional[Callable[[Any], Iterator[plt.Figure]]] = None,
+) -> None:
+    """
+    добавляет анализ в отчет
+
+    Args:
+        name: имя анализа (ключ в результатах run_analyses)
+        factory: создает новый накопитель (см. aggregations.RecordAccumulator)
+        show: печатает и показывает графики результата (plt.show), как в ноутбуке
+        text: печатает результат текстом, принимает file=
+        plot: отдает графики результата по одному, не показывая их
+    """
+    REGISTRY[name] = {"accumulator": factory, "show": show, "text": text, "plot": plot}
+
+
+register("summary", SummaryAccumulator, print_summary, print_summary)
+register(
+    "multiple",
+    MultipleLaureatesAccumulator,
+    show_multiple_laureates,
+    print_multiple_laureates,
+    plot_multiple_laureates,
+)
+register(
+    "countries",
+    CountriesAccumulator,
+    show_countries_and_categories,
+    print_countries_and_categories,
+    plot_countries_and_categories,
+)
+register(
+    "age",
+    AgeAccumulator,
+    show_age_by_category,
+    print_age_by_category,
+    plot_age_by_category,
+)
+register(
+    "gender",
+    GenderTrendsAccumulator,
+    show_gender_trends,
+    print_gender_trends,
+    plot_gender_trends,
+)
+register("refusals", RefusalsAccumulator, show_refusals, print_refusals)
+
+
+class _TimedAccumulator(RecordAccumulator):
+    """
+    накопитель-обертка для инструментирования: время add копится
+    в таймер "analyze.<имя>.add" (интервал на каждую запись слишком дорог),
+    result замеряется интервалом
+    """
+
+    def __init__(self, name: str, accumulator: RecordAccumulator, tracer):
+        self.name = name
+        self.accumulator = accumulator
+        self.tracer = tracer
+        self.calls = 0
+        self.elapsed = 0
+        self.derived = accumulator.derived
+
+    def use_derived(self, columns: Dict[str, Any]) -> None:
+        self.accumulator.use_derived(columns)
+
+    def add(self, item: Dict, prizes: List[Dict]) -> None:
+        start = time.perf_counter_ns()
+        self.accumulator.add(item, prizes)
+        self.elapsed += time.perf_counter_ns() - start
+        self.calls += 1
+
+    def result(self) -> Any:
+        self.tracer.add_time(f"analyze.{self.name}.add", self.elapsed, self.calls)
+        with self.tracer.span(f"analyze.{self.name}.result"):
+            return self.accumulator.result()
+
+
+@memoized
+def run_analyses(
+    laureates_data, names: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """
+    функция считает все анализы отчета за один проход по лауреатам и призам
+    (вместо отдельного прохода в каждой analyze_*)
+
+    Args:
+        laureates_data: список обработанных лауреатов или LaureateTable
+        names: какие анализы считать (по умолчанию все из REGISTRY)
+
+    Returns:
+        словарь {имя анализа: результат}
+    """
+    names = list(REGISTRY) if names is None else list(names)
+    unknown = [name for name in names if name not in REGISTRY]
+    if unknown:
+        raise ValueError(f"неизвестные анализы: {unknown}")
+    accumulators = [REGISTRY[name]["accumulator"]() for name in names]
+    from tables import LaureateTable
+
+    if isinstance(laureates_data, LaureateTable):
+        # строки таблицы читаются через колонки медленно, декодируем разом;
+        # производные поля берутся из стадии самой таблицы
+        bind_derived(laureates_data, accumulators)
+        laureates_data = laureates_data.iter_records()
+    tracer = profiling.active()
+    if tracer is not None:
+        accumulators = [
+            _TimedAccumulator(name, acc, tracer)
+            for name, acc in zip(names, accumulators)
+        ]
+    with profiling.span("analyze", analyses=names):
+        return dict(zip(names, accumulate(laureates_data, accumulators)))
+
+
+class PyplotRenderer:
+    """вывод как в ноутбуке: print и plt.show после каждого графика"""
+
+    def render(self, results: Dict[str, Any]) -> None:
+        for name, analysis in REGISTRY.items():
+            if name in results:
+                analysis["show"](results[name])
+
+
+class TextRenderer:
+    """
+    только текст, без графиков
+
+    Args:
+        stream: куда писать (по умолчанию sys.stdout)
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+    def render(self, results: Dict[str, Any]) -> None:
+        for name, analysis in REGISTRY.items():
+            if name in results and analysis["text"] is not None:
+                analysis["text"](results[name], file=self.stream)
+
+
+def _to_json(value: Any) -> Any:
+    """числа NumPy и прочие незнакомые json типы"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class JsonRenderer:
+    """
+    результаты анализов одним JSON-объектом {имя анализа: результат}
+
+    Args:
+        path: файл для записи; если не задан, render возвращает строку
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+
+    def render(self, results: Dict[str, Any]) -> Optional[str]:
+        if self.path is None:
+            return json.dumps(results, ensure_ascii=False, default=_to_json)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, default=_to_json)
+        return None
+
+
+def _use_agg() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _save_figures(
+    name: str, result: Any, directory: str, fmt: str, dpi: int
+) -> List[str]:
+    """рисует графики одного анализа и сохраняет их в файлы <имя>_<номер>.<fmt>"""
+    paths = []
+    for number, fig in enumerate(REGISTRY[name]["plot"](result), start=1):
+        path = os.path.join(directory, f"{name}_{number}.{fmt}")
+        fig.savefig(path, format=fmt, dpi=dpi)
+        plt.close(fig)
+        paths.append(path)
+    return paths
+
+
+class FigureRenderer:
+    """
+    графики в файлы через бэкенд Agg, без plt.show. анализы рисуются
+    параллельно в пуле процессов (pyplot не потокобезопасен);
+    анализы, добавленные через register, видны процессам пула только
+    при запуске через fork.
+
+    с кешем (figure_cache.FigureCache) графики анализа, у которого
+    результат и функция графиков не изменились, копируются из кеша
+    без matplotlib и перерисовки.
+
+    Args:
+        directory: папка для файлов (создается при необходимости)
+        fmt: формат файлов (png, svg, pdf, ...)
+        dpi: разрешение
+        max_workers: число процессов; 1 - рисовать в текущем процессе
+        cache: кеш файлов графиков по содержимому
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fmt: str = "png",
+        dpi: int = 100,
+        max_workers: Optional[int] = None,
+        cache: Optional[FigureCache] = None,
+    ):
+        self.directory = directory
+        self.fmt = fmt
+        self.dpi = dpi
+        self.max_workers = max_workers
+        self.cache = cache
+
+    def _from_cache(self, name: str, key: str) -> Optional[List[str]]:
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        paths = []
+        for number, source in enumerate(cached, start=1):
+            path = os.path.join(self.directory, f"{name}_{number}.{self.fmt}")
+            shutil.copyfile(source, path)
+            paths.append(path)
+        return paths
+
+    def render(self, results: Dict[str, Any]) -> Dict[str, List[str]]:
+        """
+        Returns:
+            словарь {имя анализа: пути к файлам графиков}
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        names = [
+            name
+            for name, analysis in REGISTRY.items()
+            if name in results and analysis["plot"] is not None
+        ]
+        paths: Dict[str, List[str]] = {}
+        keys: Dict[str, str] = {}
+        if self.cache is not None:
+            with profiling.span("render.cache", analyses=names):
+                for name in names:
+                    keys[name] = figure_key(
+                        REGISTRY[name]["plot"],
+                        results[name],
+                        self.fmt,
+                        self.dpi,
+                        _to_json,
+                    )
+                    cached = self._from_cache(name, keys[name])
+                    if cached is not None:
+                        paths[name] = cached
+
+        pending = [name for name in names if name not in paths]
+        args = [
+            (name, results[name], self.directory, self.fmt, self.dpi)
+            for name in pending
+        ]
+        workers = self.max_workers or min(len(pending), os.cpu_count() or 1)
+        if workers <= 1 or len(pending) <= 1:
+            if pending and "matplotlib.pyplot" not in sys.modules:
+                # без экрана: pyplot еще не загружен, интерактивный бэкенд
+                # не нужен
+                _use_agg()
+            paths.update((name, _save_figures(*a)) for name, a in zip(pending, args))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_use_agg) as pool:
+                paths.update(zip(pending, pool.map(_save_figures, *zip(*args))))
+
+        if self.cache is not None:
+            for name in pending:
+                self.cache.put(keys[name], paths[name], self.fmt)
+        return {name: paths[name] for name in names}
+
+
+def render_report(results: Dict[str, Any], renderer=None) -> Any:
+    """
+    выводит результаты run_analyses в порядке REGISTRY
+
+    Args:
+        results: результат run_analyses
+        renderer: PyplotRenderer (по умолчанию), TextRenderer, JsonRenderer,
+                  FigureRenderer или любой объект с методом render(results)
+    """
+    renderer = renderer or PyplotRenderer()
+    with profiling.span("render", renderer=type(renderer).__name__):
+        return renderer.render(results)
+
+
+def run_report(
+    laureates_data, names: Optional[Sequence[str]] = None, renderer=None
+) -> Any:
+    """
+    весь отчет ноутбука: то же, что print_laureates_analysis и все analyze_*
+    подряд, но с одним проходом по данным (renderer - см. render_report)
+    """
+    return render_report(run_analyses(laureates_data, names), renderer)
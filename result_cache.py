@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import functools
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from disk_cache import evict, plain, touch, write_file
+
+# дисковая мемоизация анализов: результат функции, помеченной memoized,
+# хранится по ключу из отпечатка набора данных (содержимое обработанных
+# лауреатов), версии кода (модуль функции и импортируемые им модули
+# проекта) и остальных аргументов. кеш выключен, пока не вызван enable
+# (или блок cached) - до этого memoized ничего не делает:
+#
+#     with result_cache.cached(".cache/results"):
+#         report.run_analyses(data)   # второй запуск на тех же данных - с диска
+#
+# модуль импортируют aggregations и dataset_helpers, поэтому hashlib, json,
+# marshal, pickle и re грузятся только при работе включенного кеша
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "results")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def dataset_fingerprint(laureates_data: Iterable[Any]) -> str:
+    """
+    отпечаток содержимого набора лауреатов (список, записи records,
+    LaureateIndex или LaureateTable): одинаковые данные в том же порядке -
+    тот же отпечаток. порядок ключей в записях входит в отпечаток:
+    у записей из одного и того же core.get_laureate_data он одинаковый,
+    а иной порядок дает лишь промах кеша
+    """
+    import hashlib
+    import marshal
+
+    # LaureateTable не может появиться без импорта tables, а сам tables
+    # здесь не импортируется (он тянет numpy)
+    tables = sys.modules.get("tables")
+    if tables is not None and isinstance(laureates_data, tables.LaureateTable):
+        laureates_data = laureates_data.iter_records()
+    if not isinstance(laureates_data, list):
+        laureates_data = list(laureates_data)
+    try:
+        # marshal обходит словари и списки на уровне C, в ~8 раз быстрее
+        # json.dumps; формат 2 - без ссылок на повторные объекты, поэтому
+        # байты зависят только от содержимого, а не от того, какие строки
+        # общие (vocabulary). формат зависит от версии Python - при ее смене
+        # кеш лишь промахивается
+        payload = marshal.dumps(laureates_data, 2)
+    except ValueError:
+        # записи records.Record, числа NumPy и прочее, чего marshal не знает
+        import json
+
+        payload = json.dumps(laureates_data, ensure_ascii=False, default=plain)
+        payload = payload.encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _function_version(func: Callable) -> str:
+    # код самой функции - для аргументов-функций (get_first_prize_age)
+    import hashlib
+    import inspect
+
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = ""
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def _imported_names(source: str) -> Iterator[str]:
+    # модули из import, from ... import и lazy_module("...") - в том числе
+    # внутри функций, где модули импортируются лениво
+    import re
+
+    pattern = r"^\s*(?:from\s+(\w+)|import\s+([\w, ]+))|lazy_module\(\s*[\"'](\w+)"
+    for match in re.finditer(pattern, source, re.M):
+        from_name, import_names, lazy_name = match.groups()
+        for name in (import_names or from_name or lazy_name).split(","):
+            # import numpy as np -> numpy
+            yield from name.split()[:1]
+
+
+def _project_sources(func: Callable) -> Dict[str, bytes]:
+    """
+    исходники модуля функции и всех модулей проекта (файлов из той же
+    папки), которые он импортирует прямо или через другие модули
+
+    Returns:
+        {имя модуля: код}; пусто, если у модуля функции нет файла
+    """
+    module = sys.modules.get(func.__module__)
+    path = getattr(module, "__file__", None)
+    if not path:
+        return {}
+    directory = os.path.dirname(os.path.abspath(path))
+    sources: Dict[str, bytes] = {}
+    pending = [os.path.splitext(os.path.basename(path))[0]]
+    while pending:
+        name = pending.pop()
+        if name in sources:
+            continue
+        try:
+            with open(os.path.join(directory, f"{name}.py"), "rb") as f:
+                sources[name] = f.read()
+        except OSError:
+            # не модуль проекта: стандартная библиотека или пакет
+            continue
+        pending.extend(_imported_names(sources[name].decode("utf-8", "replace")))
+    return sources
+
+
+def _code_version(func: Callable) -> str:
+    # версия анализа по коду всех модулей проекта, от которых он зависит:
+    # правка накопителя из report.REGISTRY или помощника (accumulate,
+    # group_by, _laureate_countries) дает новый ключ, а не старый результат
+    import hashlib
+
+    sources = _project_sources(func)
+    if not sources:
+        return _function_version(func)
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        digest.update(name.encode() + b"\0" + sources[name] + b"\0")
+    return digest.hexdigest()
+
+
+def _param(value: Any) -> Any:
+    """аргументы-функции (get_first_prize_age) - по имени и коду"""
+    if callable(value):
+        name = getattr(value, "__qualname__", "")
+        return [f"{getattr(value, '__module__', '')}.{name}", _function_version(value)]
+    return value
+
+
+class ResultCache:
+    """
+    дисковый кеш результатов анализов (pickle) по ключу memoized.
+    размер кеша ограничен вытеснением давно не использованных записей.
+
+    Args:
+        directory: папка кеша
+        max_bytes: предельный размер кеша на диске
+    """
+
+    def __init__(
+        self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # попадания и промахи (для замеров и проверок)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Returns:
+            (True, результат) или (False, None), если записи нет
+        """
+        import pickle
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except (OSError, EOFError, AttributeError, ImportError, pickle.UnpicklingError):
+            self.misses += 1
+            return False, None
+        touch(path)
+        self.hits += 1
+        return True, result
+
+    def put(self, key: str, result: Any) -> None:
+        """сохраняет результат под ключом key"""
+        import pickle
+
+        data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        write_file(self._path(key), data)
+        self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        """удаляет самые давно использованные записи сверх max_bytes"""
+        evict(self.directory, self.max_bytes, ".pickle", keep)
+
+    def clear(self) -> None:
+        """удаляет все записи кеша"""
+        for name in os.listdir(self.directory):
+            if name.endswith(".pickle"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultCache({self.directory!r}, попаданий {self.hits}, "
+            f"промахов {self.misses})"
+        )
+
+
+_CACHE: Optional[ResultCache] = None
+
+
+def enable(
+    directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+) -> ResultCache:
+    """включает кеш результатов для всех функций memoized"""
+    global _CACHE
+    _CACHE = ResultCache(directory, max_bytes)
+    return _CACHE
+
+
+def disable() -> Optional[ResultCache]:
+    """выключает кеш результатов и возвращает прежний ResultCache"""
+    global _CACHE
+    cache, _CACHE = _CACHE, None
+    return cache
+
+
+def active() -> Optional[ResultCache]:
+    """включенный ResultCache или None"""
+    return _CACHE
+
+
+@contextmanager
+def cached(
+    directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+) -> Iterator[ResultCache]:
+    """кеш результатов на время блока (прежний восстанавливается в конце)"""
+    global _CACHE
+    previous = _CACHE
+    cache = enable(directory, max_bytes)
+    try:
+        yield cache
+    finally:
+        _CACHE = previous
+
+
+def memoized(
+    func: Optional[Callable] = None, *, version: Optional[str] = None
+) -> Callable:
+    """
+    декоратор анализа: первый аргумент - набор лауреатов, остальные -
+    параметры. при включенном кеше (enable) результат берется с диска,
+    если набор, версия функции и параметры те же; иначе считается
+    и сохраняется. без кеша функция вызывается как есть.
+
+    Args:
+        func: функция анализа (результат должен сериализоваться pickle
+              и не зависеть ни от чего, кроме аргументов)
+        version: версия функции для ключа (по умолчанию - хеш кода ее
+                 модуля и импортируемых им модулей проекта, см.
+                 _code_version)
+
+    набор-итератор (например, ingest.iter_jsonl) при включенном кеше
+    читается в список: отпечаток нужен до подсчета
+    """
+
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+        # версия и сигнатура считаются при первом вызове с кешем
+        state: dict = {}
+
+        @functools.wraps(func)
+        def wrapper(laureates_data, *args, **kwargs):
+            cache = _CACHE
+            if cache is None:
+                return func(laureates_data, *args, **kwargs)
+            import hashlib
+            import json
+
+            if not state:
+                import inspect
+
+                state["version"] = version or _code_version(func)
+                state["signature"] = inspect.signature(func)
+            if not hasattr(laureates_data, "__len__"):
+                laureates_data = list(laureates_data)
+            # параметры по именам, с умолчаниями: f(d, 5) и f(d, n=5) - один ключ
+            bound = state["signature"].bind(laureates_data, *args, **kwargs)
+            bound.apply_defaults()
+            params = {
+                key: _param(value)
+                for key, value in list(bound.arguments.items())[1:]
+            }
+            payload = json.dumps(
+                [name, state["version"], params, dataset_fingerprint(laureates_data)],
+                ensure_ascii=False,
+                sort_keys=True,
+                default=plain,
+            )
+            key = hashlib.sha256(payload.encode()).hexdigest()
+            found, result = cache.get(key)
+            if found:
+                return result
+            result = func(laureates_data, *args, **kwargs)
+            cache.put(key, result)
+            return result
+
+        return wrapper
+
+    return decorator if func is None else decorator(func)
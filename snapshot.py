@@ -0,0 +1,198 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from laureates_configs import CONFIG_PERSON, CONFIG_ORG
+from prizes_configs import CONFIG_PRIZE
+
+SNAPSHOT_VERSION = 1
+# пропуск в целочисленной колонке и в колонке кодов строк
+MISSING = -1
+
+LAUREATE_STRING_FIELDS = (
+    "id",
+    "name",
+    "type_",
+    "gender",
+    "country_birth",
+    "country_founded",
+    "country_now",
+)
+LAUREATE_INT_FIELDS = ("birth_year", "founded_year")
+PRIZE_STRING_FIELDS = ("category_en", "prize_status")
+PRIZE_INT_FIELDS = ("award_year", "prize_amount", "prize_amount_adjusted")
+
+# какие ключи есть у записи каждого типа (в порядке процессоров из core)
+RECORD_KEYS = {
+    "person": [*CONFIG_PERSON, "type_"],
+    "organization": [*CONFIG_ORG, "type_"],
+    "unknown": ["id", "type_"],
+}
+PRIZE_KEYS = list(CONFIG_PRIZE)
+
+
+# узкие типы для целочисленных колонок (годы помещаются в int16)
+INT_DTYPES = {
+    "birth_year": np.int16,
+    "founded_year": np.int16,
+    "award_year": np.int16,
+    "prize_amount": np.int64,
+    "prize_amount_adjusted": np.int64,
+}
+
+
+def _encode_strings(values: List[Optional[str]]) -> Tuple[np.ndarray, List[str]]:
+    """словарное кодирование: коды (MISSING для None) и словарь"""
+    vocab: Dict[str, int] = {}
+    codes = [MISSING if v is None else vocab.setdefault(v, len(vocab)) for v in values]
+    dtype = np.int16 if len(vocab) < np.iinfo(np.int16).max else np.int32
+    return np.asarray(codes, dtype=dtype), list(vocab)
+
+
+def _encode_ints(values: List[Optional[int]], dtype: Any) -> np.ndarray:
+    return np.fromiter(
+        (MISSING if v is None else v for v in values), dtype=dtype, count=len(values)
+    )
+
+
+def encode_columns(laureates_data: List[Dict]) -> Dict[str, Any]:
+    """
+    функция раскладывает обработанных лауреатов (вывод core.load_data)
+    по колонкам: строки кодируются словарем, годы - int16, пропуски - MISSING.
+    призы разворачиваются в отдельную таблицу со ссылкой на лауреата.
+    берутся только поля из конфигов, производные поля не сохраняются.
+
+    Returns:
+        словарь {"laureates": {поле: массив}, "prizes": {поле: массив},
+        "vocab": {"таблица.поле": [строки]}}
+    """
+    prizes = []
+    parents = []
+    for idx, item in enumerate(laureates_data):
+        for prize in item.get("prizes_relevant") or []:
+            prizes.append(prize)
+            parents.append(idx)
+
+    snapshot = {"laureates": {}, "prizes": {}, "vocab": {}}
+    for table, records, string_fields, int_fields in (
+        ("laureates", laureates_data, LAUREATE_STRING_FIELDS, LAUREATE_INT_FIELDS),
+        ("prizes", prizes, PRIZE_STRING_FIELDS, PRIZE_INT_FIELDS),
+    ):
+        for field in string_fields:
+            codes, snapshot["vocab"][f"{table}.{field}"] = _encode_strings(
+                [r.get(field) for r in records]
+            )
+            snapshot[table][field] = codes
+        for field in int_fields:
+            snapshot[table][field] = _encode_ints(
+                [r.get(field) for r in records], INT_DTYPES[field]
+            )
+    snapshot["prizes"]["laureate"] = np.asarray(parents, dtype=np.int32)
+    return snapshot
+
+
+def write_snapshot(snapshot: Dict[str, Any], directory: str) -> None:
+    """
+    функция пишет колонки (в формате encode_columns) в папку:
+    по файлу .npy на колонку и meta.json со словарями
+    """
+    os.makedirs(directory, exist_ok=True)
+    columns = []
+    for table in ("laureates", "prizes"):
+        for field, column in snapshot[table].items():
+            name = f"{table}.{field}"
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(column))
+            columns.append(name)
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "n_laureates": len(snapshot["laureates"]["id"]),
+        "n_prizes": len(snapshot["prizes"]["laureate"]),
+        "columns": sorted(columns),
+        "vocab": snapshot["vocab"],
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+def save_snapshot(laureates_data: List[Dict], directory: str) -> None:
+    """
+    функция сохраняет обработанных лауреатов в колоночном виде
+    (см. encode_columns и write_snapshot)
+
+    Args:
+        laureates_data: список обработанных лауреатов
+        directory: папка снимка (создается при необходимости)
+    """
+    write_snapshot(encode_columns(laureates_data), directory)
+
+
+def load_snapshot(directory: str, mmap: bool = True) -> Dict[str, Any]:
+    """
+    функция загружает снимок: колонки отображаются в память (mmap),
+    а не читаются целиком, поэтому загрузка почти мгновенная.
+
+    Returns:
+        словарь {"laureates": {поле: массив}, "prizes": {поле: массив},
+        "vocab": {"таблица.поле": [строки]}}
+    """
+    with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta["version"] != SNAPSHOT_VERSION:
+        raise ValueError(f"неподдерживаемая версия снимка: {meta['version']}")
+
+    snapshot = {"laureates": {}, "prizes": {}, "vocab": meta["vocab"]}
+    for name in meta["columns"]:
+        table, field = name.split(".", 1)
+        snapshot[table][field] = np.load(
+            os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None
+        )
+    return snapshot
+
+
+def _decode_column(snapshot: Dict[str, Any], table: str, field: str) -> List[Any]:
+    column = snapshot[table][field].tolist()
+    vocab = snapshot["vocab"].get(f"{table}.{field}")
+    if vocab is None:
+        return [None if v == MISSING else v for v in column]
+    return [None if c == MISSING else vocab[c] for c in column]
+
+
+def snapshot_to_records(snapshot: Dict[str, Any]) -> List[Dict]:
+    """
+    функция собирает из снимка список словарей в том же виде,
+    что возвращает core.load_data
+    """
+    laureate_columns = {
+        field: _decode_column(snapshot, "laureates", field)
+        for field in LAUREATE_STRING_FIELDS + LAUREATE_INT_FIELDS
+    }
+    prize_columns = {
+        field: _decode_column(snapshot, "prizes", field) for field in PRIZE_KEYS
+    }
+
+    n_laureates = len(laureate_columns["id"])
+    prizes_by_laureate: List[List[Dict]] = [[] for _ in range(n_laureates)]
+    for i, parent in enumerate(snapshot["prizes"]["laureate"].tolist()):
+        prizes_by_laureate[parent].append(
+            {field: prize_columns[field][i] for field in PRIZE_KEYS}
+        )
+
+    records = []
+    for idx in range(n_laureates):
+        keys = RECORD_KEYS.get(laureate_columns["type_"][idx], RECORD_KEYS["unknown"])
+        record = {}
+        for key in keys:
+            if key == "prizes_relevant":
+                record[key] = prizes_by_laureate[idx]
+            else:
+                record[key] = laureate_columns[key][idx]
+        records.append(record)
+    return records
+
+
+def load_records(directory: str) -> List[Dict]:
+    """загружает снимок и сразу собирает список лауреатов"""
+    return snapshot_to_records(load_snapshot(directory))
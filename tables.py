@@ -0,0 +1,326 @@
+from abc import abstractmethod
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from aggregations import encode
+from snapshot import (
+    LAUREATE_INT_FIELDS,
+    MISSING,
+    PRIZE_INT_FIELDS,
+    PRIZE_KEYS,
+    RECORD_KEYS,
+    encode_columns,
+    load_snapshot,
+    write_snapshot,
+)
+from vocabulary import CATEGORICAL_FIELDS, vocabulary
+
+
+class _Table:
+    """общая часть таблиц: колонки NumPy и словари категориальных колонок"""
+
+    name = ""
+
+    def __init__(self, columns: Dict[str, np.ndarray], vocab: Dict[str, List[str]]):
+        self.columns = columns
+        # словари только своей таблицы, без префикса "таблица."
+        prefix = f"{self.name}."
+        self.vocab = {
+            key[len(prefix) :]: values
+            for key, values in vocab.items()
+            if key.startswith(prefix)
+        }
+        # добавленные через строки поля (например, add_migration_field)
+        self._extras: Dict[int, Dict[str, Any]] = {}
+        self._extra_fields: set = set()
+        self._code_index: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def column(self, field: str) -> np.ndarray:
+        """сырая колонка: коды для строковых полей, числа для остальных"""
+        return self.columns[field]
+
+    def code(self, field: str, value: Optional[str]) -> int:
+        """код значения в категориальной колонке (MISSING, если такого нет)"""
+        if field not in self._code_index:
+            self._code_index[field] = {v: i for i, v in enumerate(self.vocab[field])}
+        return self._code_index[field].get(value, MISSING)
+
+    def decoded(self, field: str) -> List[Any]:
+        """колонка целиком в виде списка значений Python (None для пропусков)"""
+        column = self.columns[field].tolist()
+        vocab = self.vocab.get(field)
+        if vocab is None:
+            return [None if v == MISSING else v for v in column]
+        return [None if c == MISSING else vocab[c] for c in column]
+
+    def value(self, field: str, idx: int) -> Any:
+        """значение одного поля одной строки"""
+        raw = int(self.columns[field][idx])
+        if raw == MISSING:
+            return None
+        vocab = self.vocab.get(field)
+        return raw if vocab is None else vocab[raw]
+
+
+class _RowView(MutableMapping):
+    """
+    строка таблицы, которая ведет себя как словарь из core.load_data:
+    значения читаются из колонок, новые ключи пишутся в таблицу отдельно
+    """
+
+    __slots__ = ("_table", "_idx")
+
+    def __init__(self, table: _Table, idx: int):
+        self._table = table
+        self._idx = idx
+
+    @abstractmethod
+    def _keys(self) -> List[str]:
+        """поля строки без добавленных ключей"""
+
+    def _get(self, key: str) -> Any:
+        return self._table.value(key, self._idx)
+
+    def __getitem__(self, key: str) -> Any:
+        extra = self._table._extras.get(self._idx)
+        if extra is not None and key in extra:
+            return extra[key]
+        if key in self._keys():
+            return self._get(key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._table._extras.setdefault(self._idx, {})[key] = value
+        self._table._extra_fields.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        extras = self._table._extras
+        extra = extras.get(self._idx, {})
+        if key not in extra:
+            raise KeyError(key)
+        del extra[key]
+        if not extra:
+            del extras[self._idx]
+        # поле больше не добавленное, если его нет ни в одной строке
+        if not any(key in other for other in extras.values()):
+            self._table._extra_fields.discard(key)
+
+    def __iter__(self) -> Iterator[str]:
+        keys = self._keys()
+        yield from keys
+        for key in self._table._extras.get(self._idx, {}):
+            if key not in keys:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class PrizeRow(_RowView):
+    __slots__ = ()
+
+    def _keys(self) -> List[str]:
+        return PRIZE_KEYS
+
+
+class LaureateRow(_RowView):
+    __slots__ = ()
+
+    def _keys(self) -> List[str]:
+        type_ = self._table.value("type_", self._idx)
+        return RECORD_KEYS.get(type_, RECORD_KEYS["unknown"])
+
+    def _get(self, key: str) -> Any:
+        if key == "prizes_relevant":
+            return self._table.prizes_of(self._idx)
+        return self._table.value(key, self._idx)
+
+
+class PrizeTable(_Table):
+    """
+    таблица призов: одна строка на приз, колонка laureate -
+    номер строки лауреата в LaureateTable
+    """
+
+    name = "prizes"
+
+    def __getitem__(self, idx: int) -> PrizeRow:
+        return PrizeRow(self, idx)
+
+    def __iter__(self) -> Iterator[PrizeRow]:
+        return (PrizeRow(self, idx) for idx in range(len(self)))
+
+
+class LaureateTable(_Table):
+    """
+    колоночная таблица лауреатов на массивах NumPy: годы - int16,
+    строки (страна, пол, тип, ...) - коды категорий со словарями.
+    призы лежат в связанной PrizeTable (self.prizes).
+
+    итерация и индексирование отдают LaureateRow, совместимые со словарями,
+    поэтому функции из dataset_helpers и aggregations работают без изменений,
+    а колонки можно обрабатывать векторно.
+    """
+
+    name = "laureates"
+
+    def __init__(self, snapshot: Dict[str, Any]):
+        super().__init__(snapshot["laureates"], snapshot["vocab"])
+        self.prizes = PrizeTable(snapshot["prizes"], snapshot["vocab"])
+        # призы лауреата i - строки prizes[offsets[i]:offsets[i + 1]]
+        parents = np.asarray(self.prizes.columns["laureate"])
+        if len(parents) > 1 and np.any(parents[1:] < parents[:-1]):
+            order = np.argsort(parents, kind="stable")
+            self.prizes.columns = {
+                field: np.asarray(column)[order]
+                for field, column in self.prizes.columns.items()
+            }
+            parents = self.prizes.columns["laureate"]
+        counts = np.bincount(parents, minlength=len(self))
+        self.prize_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    @classmethod
+    def from_records(cls, laureates_data: List[Dict]) -> "LaureateTable":
+        """таблица из вывода core.load_data"""
+        return cls(encode_columns(laureates_data))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "LaureateTable":
+        """таблица из снимка, сохраненного save_snapshot или save"""
+        return cls(load_snapshot(directory, mmap))
+
+    def save(self, directory: str) -> None:
+        """сохраняет таблицу как снимок (см. snapshot)"""
+        vocab = {}
+        for table in (self, self.prizes):
+            for field, values in table.vocab.items():
+                vocab[f"{table.name}.{field}"] = values
+        write_snapshot(
+            {"laureates": self.columns, "prizes": self.prizes.columns, "vocab": vocab},
+            directory,
+        )
+
+    def prize_counts(self) -> np.ndarray:
+        """количество призов у каждого лауреата"""
+        return np.diff(self.prize_offsets)
+
+    def prizes_of(self, idx: int) -> List[PrizeRow]:
+        start, stop = self.prize_offsets[idx], self.prize_offsets[idx + 1]
+        return [PrizeRow(self.prizes, i) for i in range(start, stop)]
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __getitem__(self, idx: int) -> LaureateRow:
+        return LaureateRow(self, idx)
+
+    def __iter__(self) -> Iterator[LaureateRow]:
+        return (LaureateRow(self, idx) for idx in range(len(self)))
+
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        лауреаты по одному в виде обычных словарей, как из core.load_data:
+        колонки декодируются один раз целиком, а не по значению
+        на каждое обращение, как у LaureateRow
+        """
+        columns = {field: self.decoded(field) for field in self.columns}
+        prize_columns = {field: self.prizes.decoded(field) for field in PRIZE_KEYS}
+        prize_extras = self.prizes._extras
+        offsets = self.prize_offsets.tolist()
+        types = columns["type_"]
+        for idx in range(len(self)):
+            record = {}
+            for key in RECORD_KEYS.get(types[idx], RECORD_KEYS["unknown"]):
+                if key != "prizes_relevant":
+                    record[key] = columns[key][idx]
+                    continue
+                prizes = []
+                for i in range(offsets[idx], offsets[idx + 1]):
+                    prize = {field: prize_columns[field][i] for field in PRIZE_KEYS}
+                    if i in prize_extras:
+                        prize.update(prize_extras[i])
+                    prizes.append(prize)
+                record[key] = prizes
+            if idx in self._extras:
+                record.update(self._extras[idx])
+            yield record
+
+    def to_records(self) -> List[Dict]:
+        """обратно в список словарей, как из core.load_data"""
+        return list(self.iter_records())
+
+
+def columns_of(
+    data: Union[LaureateTable, List[Dict]],
+    laureate_fields: Sequence[str] = (),
+    prize_fields: Sequence[str] = (),
+) -> Dict[str, Dict[str, Tuple[np.ndarray, Optional[List[Any]]]]]:
+    """
+    функция отдает нужные поля лауреатов и призов в виде колонок для group_by:
+    строковые поля - (коды, словарь), числовые - (значения, None),
+    пропуски (None и пустые строки) - MISSING.
+    у LaureateTable колонки берутся как есть, список словарей кодируется
+    за один проход.
+
+    Returns:
+        {"laureates": {поле: (массив, словарь)},
+         "prizes": {поле: (массив, словарь), "laureate": (номера лауреатов, None)}}
+    """
+    int_fields = set(LAUREATE_INT_FIELDS) | set(PRIZE_INT_FIELDS)
+    result: Dict[str, Dict[str, Tuple[np.ndarray, Optional[List[Any]]]]] = {
+        "laureates": {},
+        "prizes": {},
+    }
+
+    def from_values(field: str, values: List[Any]) -> Tuple[np.ndarray, Any]:
+        if field in int_fields:
+            ints = [MISSING if v is None else v for v in values]
+            return np.asarray(ints, dtype=np.int64), None
+        if field in CATEGORICAL_FIELDS:
+            # коды из общего словаря поля: значения уже интернированы
+            # при извлечении, а словарь не строится заново на каждый вызов
+            vocab = vocabulary(field)
+            return vocab.encode(values, missing=(None, "")), list(vocab.values)
+        return encode(values, missing=(None, ""))
+
+    if isinstance(data, LaureateTable):
+        for table, fields in (
+            (data, laureate_fields),
+            (data.prizes, tuple(prize_fields) + ("laureate",)),
+        ):
+            for field in fields:
+                if field in table.columns and field not in table._extra_fields:
+                    column = np.asarray(table.columns[field])
+                    vocab = table.vocab.get(field)
+                    if vocab is not None and "" in vocab:
+                        column = np.where(
+                            column == vocab.index(""), MISSING, column
+                        )
+                    result[table.name][field] = (column, vocab)
+                else:
+                    values = [row.get(field) for row in table]
+                    result[table.name][field] = from_values(field, values)
+        return result
+
+    prize_lists = [item.get("prizes_relevant", []) for item in data]
+    prizes = [prize for item_prizes in prize_lists for prize in item_prizes]
+    parents = np.repeat(
+        np.arange(len(prize_lists)), [len(p) for p in prize_lists]
+    ).astype(np.int64)
+
+    for field in laureate_fields:
+        values = [item.get(field) for item in data]
+        result["laureates"][field] = from_values(field, values)
+    for field in prize_fields:
+        values = [prize.get(field) for prize in prizes]
+        result["prizes"][field] = from_values(field, values)
+    result["prizes"]["laureate"] = (parents, None)
+    return result
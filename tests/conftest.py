@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# модули проекта лежат в корне репозитория, без пакета
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import MockLaureatesAPI, make_laureates  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def raw_laureates():
+    """синтетические сырые лауреаты (те же, что в бенчмарках)"""
+    return make_laureates(230, seed=7)
+
+
+@pytest.fixture
+def api(raw_laureates):
+    """мок-сервер АПИ с links.next"""
+    with MockLaureatesAPI(raw_laureates) as server:
+        yield server
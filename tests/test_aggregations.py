@@ -0,0 +1,110 @@
+import os
+import subprocess
+import sys
+
+import core
+from aggregations import (
+    HyperLogLog,
+    UniqueRecords,
+    fingerprint,
+    summarize_laureates,
+    unique_count,
+)
+
+
+def test_unique_count_distinguishes_types():
+    data = [{"a": 1}, {"a": 1.0}, {"a": True}, {"a": "1"}, {"a": 1}]
+    assert unique_count(data) == 4
+
+
+def test_unique_count_ignores_key_order_and_nests():
+    data = [
+        {"a": 1, "b": [{"x": "y"}]},
+        {"b": [{"x": "y"}], "a": 1},
+        {"a": 1, "b": [{"x": "z"}]},
+        {"a": 1, "b": ({"x": "y"},)},
+    ]
+    assert unique_count(data) == 3
+
+
+def test_unique_count_unhashable_values():
+    data = [
+        {"a": {1, 2}},
+        {"a": {2, 1}},
+        {"a": bytearray(b"x")},
+        {"a": bytearray(b"x")},
+        {"a": bytearray(b"y")},
+    ]
+    assert unique_count(data) == 3
+
+
+def test_unique_count_is_exact_on_hash_collisions(monkeypatch):
+    import aggregations
+
+    # все записи с одним хешем: точность держится на сравнении представлений
+    monkeypatch.setattr(aggregations, "hash", lambda value: 0, raising=False)
+    unique = UniqueRecords()
+    for item in [{"a": 1}, {"a": 2}, {"a": 1}, {"a": 3}]:
+        unique.add(item)
+    assert len(unique) == 3
+
+
+def test_unique_count_scalars_and_empty():
+    assert unique_count([]) == 0
+    assert unique_count([1, 2, 2, "2"]) == 3
+
+
+def test_approximate_unique_count(raw_laureates):
+    data = [core.get_laureate_data(item) for item in raw_laureates] * 3
+    exact = unique_count(data)
+    assert exact == len(raw_laureates)
+    assert abs(unique_count(data, approximate=True) - exact) <= 0.05 * exact
+
+
+def test_hyperloglog_merge():
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(range(0, 6000))
+    right.update(range(4000, 10000))
+    assert abs(left.merge(right).count() - 10000) < 300
+
+
+def test_fingerprint_is_order_independent_and_typed():
+    assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 1.0})
+    assert fingerprint({"a": 1}) != fingerprint({"a": "1"})
+    assert fingerprint({"a": [1]}) != fingerprint({"a": (1,)})
+    assert fingerprint({"a": {2, 1}}) == fingerprint({"a": {1, 2}})
+    assert fingerprint(1).bit_length() <= 64
+    assert fingerprint(1, digest_size=16).bit_length() > 64
+
+
+def test_fingerprint_cache():
+    record = {"a": "b"}
+    cache = {}
+    value = fingerprint(record, cache)
+    assert cache[id(record)] == (record, value)
+    assert fingerprint(record, cache) == value
+
+
+def test_fingerprint_is_stable_across_processes():
+    code = "from aggregations import fingerprint; print(fingerprint({'a': ['x', 1]}))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    values = set()
+    for seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=root,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        values.add(proc.stdout.strip())
+    assert values == {str(fingerprint({"a": ["x", 1]}))}
+
+
+def test_summary_unique_matches_unique_count(raw_laureates):
+    data = [core.get_laureate_data(item) for item in raw_laureates]
+    data += data[:10]
+    assert summarize_laureates(data)["unique"] == unique_count(data)
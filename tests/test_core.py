@@ -0,0 +1,87 @@
+import pytest
+import requests
+
+import core
+from benchmarks import MockLaureatesAPI
+
+
+def _flatten(pages):
+    return [laureate for page in pages for laureate in page]
+
+
+def test_pages_follow_links_next(api, raw_laureates):
+    pages = list(core.iter_laureate_pages(api.url, page_size=50))
+    assert [len(page) for page in pages] == [50, 50, 50, 50, 30]
+    assert _flatten(pages) == raw_laureates
+    assert api.offsets == [0, 50, 100, 150, 200]
+
+
+def test_pages_fall_back_to_meta(raw_laureates):
+    with MockLaureatesAPI(raw_laureates, links=False) as api:
+        pages = list(core.iter_laureate_pages(api.url, page_size=50))
+    assert _flatten(pages) == raw_laureates
+    assert api.offsets == [0, 50, 100, 150, 200]
+
+
+def test_meta_fallback_uses_server_limit(raw_laureates):
+    # сервер урезал limit до 40 - следующая страница с offset 40, а не 100
+    with MockLaureatesAPI(raw_laureates, links=False, max_limit=40) as api:
+        pages = list(core.iter_laureate_pages(api.url, page_size=100))
+    assert _flatten(pages) == raw_laureates
+    assert api.offsets[:3] == [0, 40, 80]
+
+
+def test_iter_laureates_processes_records(api, raw_laureates):
+    laureates = list(core.iter_laureates(api.url, page_size=64))
+    assert laureates == [core.get_laureate_data(item) for item in raw_laureates]
+    assert laureates == core.load_data(api.url, page_size=64)
+
+
+def test_parallel_fetch_keeps_offset_order(raw_laureates):
+    # поздние страницы отвечают быстрее ранних - порядок все равно по offset
+    latency = lambda offset: 0.2 - offset / 2000  # noqa: E731
+    with MockLaureatesAPI(raw_laureates, latency=latency) as api:
+        pages = core.fetch_laureate_pages_parallel(api.url, 25, max_workers=8)
+    assert _flatten(pages) == raw_laureates
+    assert [len(page) for page in pages] == [25] * 9 + [5]
+
+
+def test_parallel_fetch_steps_by_server_limit(raw_laureates):
+    with MockLaureatesAPI(raw_laureates, max_limit=30) as api:
+        pages = core.fetch_laureate_pages_parallel(api.url, 100, max_workers=4)
+    assert _flatten(pages) == raw_laureates
+    assert sorted(api.offsets) == list(range(0, 230, 30))
+
+
+def test_server_errors_are_retried(raw_laureates):
+    with MockLaureatesAPI(raw_laureates, errors={50: [503, 429]}) as api:
+        pages = core.fetch_laureate_pages_parallel(
+            api.url, 50, max_workers=2, retries=3, backoff=0.01
+        )
+    assert _flatten(pages) == raw_laureates
+    assert api.offsets.count(50) == 3
+
+
+def test_client_errors_are_not_retried(raw_laureates):
+    with MockLaureatesAPI(raw_laureates, errors={50: [404] * 10}) as api:
+        with pytest.raises(requests.HTTPError):
+            core.fetch_laureate_pages_parallel(
+                api.url, 50, max_workers=2, retries=3, backoff=10
+            )
+    # без повторов и без пауз backoff
+    assert api.offsets.count(50) == 1
+
+
+def test_retries_give_up_after_limit(raw_laureates):
+    with MockLaureatesAPI(raw_laureates, errors={0: [500] * 10}) as api:
+        with core._make_session(1) as session:
+            for get in (core._get_json, core._get_content):
+                with pytest.raises(requests.HTTPError):
+                    get(session, api.url, {"offset": 0}, retries=2, backoff=0.01)
+    assert api.offsets == [0] * 6
+
+
+def test_load_data_default_is_one_request(api, raw_laureates):
+    laureates = core.load_data(api.url)
+    assert len(api.offsets) == 1
+    assert laureates == [core.get_laureate_data(item) for item in raw_laureates]
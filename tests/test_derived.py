@@ -0,0 +1,89 @@
+import core
+import dataset_helpers
+import report
+import derived
+from tables import LaureateTable
+from derived import DerivedField, DerivedFields, derived_fields
+
+
+def test_repeated_call_recomputes_nothing(raw_laureates):
+    data = [core.get_laureate_data(item) for item in raw_laureates]
+    dataset_helpers.add_migration_field(data)
+    stage = derived_fields(data)
+    computed = stage.computed
+    assert computed == 2 * len(data)
+
+    dataset_helpers.add_migration_field(data)
+    assert derived_fields(data) is stage
+    assert stage.computed == computed
+
+    derived.release(data)
+    assert derived_fields(data) is not stage
+
+
+def test_held_stage_recomputes_only_changes(raw_laureates):
+    data = [core.get_laureate_data(item) for item in raw_laureates]
+    dataset_helpers.add_migration_field(data)
+    stage = derived_fields(data)
+    computed = stage.computed
+
+    data[5]["country_now"] = "Atlantis"
+    dataset_helpers.add_migration_field(data)
+    assert stage.computed - computed == 1
+    assert bool(data[5]["has_migrated"]) == (
+        data[5]["country_of_origin_adjusted"] not in (None, "Atlantis")
+    )
+
+
+def test_prize_level_field():
+    data = [
+        {"id": "1", "prizes_relevant": [{"award_year": 1921}, {"award_year": 1935}]},
+        {"id": "2", "prizes_relevant": []},
+    ]
+    fields = {
+        "decade": DerivedField(
+            "decade", ("award_year",), lambda year: (year // 10) * 10, "prize"
+        )
+    }
+    stage = DerivedFields(data, fields)
+    assert stage.column("decade") == [[1920, 1930], []]
+
+    data[0]["prizes_relevant"][1]["award_year"] = 1940
+    assert stage.refresh() == 1
+    stage.materialize(["decade"])
+    assert [prize["decade"] for prize in data[0]["prizes_relevant"]] == [1920, 1940]
+
+
+def test_age_and_decade_fields(raw_laureates):
+    data = [core.get_laureate_data(item) for item in raw_laureates]
+    stage = derived_fields(data)
+    get_age = dataset_helpers.get_first_prize_age
+    assert stage.column("age_at_award") == [
+        [get_age(item, prize) for prize in item["prizes_relevant"]] for item in data
+    ]
+    computed = stage.computed
+
+    result = dataset_helpers.count_age_by_category(
+        data, dataset_helpers.get_first_prize_age
+    )
+    trends = dataset_helpers.count_gender_trends(data)
+    assert stage.computed == computed + len(data)  # только decade
+
+    dataset_helpers.count_age_by_category(data, dataset_helpers.get_first_prize_age)
+    dataset_helpers.count_gender_trends(data)
+    assert stage.computed == computed + len(data)
+
+    # своя функция возраста вызывается сама, значения стадии к ней не относятся
+    def age_next_year(item, prize):
+        age = dataset_helpers.get_first_prize_age(item, prize)
+        return None if age is None else age + 1
+
+    shifted = dataset_helpers.count_age_by_category(data, age_next_year)
+    assert shifted["mean"] == [mean + 1 for mean in result["mean"]]
+
+    table = LaureateTable.from_records(data)
+    assert dataset_helpers.count_gender_trends(table) == trends
+    assert report.run_analyses(table, ["age", "gender"]) == {
+        "age": result,
+        "gender": trends,
+    }
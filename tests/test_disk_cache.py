@@ -0,0 +1,50 @@
+import os
+
+import disk_cache
+from figure_cache import FigureCache
+from result_cache import ResultCache
+
+
+def _write(directory, name, size, used):
+    path = os.path.join(directory, name)
+    disk_cache.write_file(path, b"x" * size)
+    os.utime(path, (used, used))
+    return path
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    directory = str(tmp_path)
+    _write(directory, "old.body", 60, 100)
+    _write(directory, "old.meta.json", 10, 500)
+    _write(directory, "new.body", 60, 300)
+    _write(directory, "new.meta.json", 10, 50)
+    _write(directory, "fresh.body", 60, 400)
+    # чужой недописанный файл не учитывается и не удаляется
+    _write(directory, "old.body.123.tmp", 1000, 1)
+
+    disk_cache.evict(directory, 150, ".body", keep="fresh")
+    assert sorted(os.listdir(directory)) == [
+        "fresh.body",
+        "new.body",
+        "new.meta.json",
+        "old.body.123.tmp",
+    ]
+
+    disk_cache.evict(directory, 10, ".body", keep="fresh")
+    assert sorted(os.listdir(directory)) == ["fresh.body", "old.body.123.tmp"]
+
+
+def test_caches_share_eviction(tmp_path):
+    results = ResultCache(str(tmp_path / "results"), max_bytes=1)
+    results.put("a", list(range(100)))
+    results.put("b", list(range(100)))
+    assert results.get("a") == (False, None)
+    assert results.get("b") == (True, list(range(100)))
+
+    source = tmp_path / "plot.png"
+    source.write_bytes(b"png" * 100)
+    figures = FigureCache(str(tmp_path / "figures"), max_bytes=1)
+    figures.put("a", [str(source)], "png")
+    figures.put("b", [str(source), str(source)], "png")
+    assert figures.get("a") is None
+    assert len(figures.get("b")) == 2
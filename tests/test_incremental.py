@@ -0,0 +1,60 @@
+import copy
+
+import pytest
+
+import core
+import report
+from dataset_helpers import get_first_prize_age
+from incremental import INCREMENTAL, IncrementalReport, _SparseState
+
+
+def _results(laureates):
+    return report.run_analyses(laureates, list(INCREMENTAL))
+
+
+def test_update_matches_full_recount(raw_laureates, tmp_path):
+    data = [core.get_laureate_data(item) for item in raw_laureates]
+    state = IncrementalReport()
+    state.update(data)
+    assert repr(state.results()) == repr(_results(data))
+
+    changed = copy.deepcopy(data[10:] + data[:3])
+    changed[0]["gender"] = "female" if changed[0].get("gender") == "male" else "male"
+    stats = state.update(changed)
+    assert stats["removed"] == 7 and stats["changed"] == 1
+    assert repr(state.results()) == repr(_results(changed))
+
+    path = str(tmp_path / "state.pickle")
+    state.save(path)
+    assert repr(IncrementalReport.load(path).results()) == repr(state.results())
+
+
+def test_sparse_state_without_is_relevant_fails_on_creation():
+    class Broken(_SparseState):
+        accumulator = dict
+
+    with pytest.raises(TypeError):
+        Broken()
+
+
+def test_age_update_recomputes_only_changed_categories(raw_laureates):
+    data = [core.get_laureate_data(item) for item in raw_laureates]
+    state = IncrementalReport(["age"])
+    state.update(data)
+    state.results()
+    ages = state.states["age"]
+    before = dict(ages._stats)
+
+    changed = copy.deepcopy(data)
+    item = next(
+        i
+        for i in changed
+        if i["prizes_relevant"] and get_first_prize_age(i, i["prizes_relevant"][0])
+    )
+    item["birth_year"] -= 1
+    state.update(changed)
+    assert repr(state.results()["age"]) == repr(_results(changed)["age"])
+
+    touched = {prize["category_en"] for prize in item["prizes_relevant"]}
+    for name, stats in ages._stats.items():
+        assert (stats is before[name]) == (name not in touched)
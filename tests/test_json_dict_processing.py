@@ -0,0 +1,39 @@
+from collections import Counter
+
+from json_dict_processing import compile_config, process_dictionary_with_config
+
+CONFIG = {
+    "year": (["year"], int),
+    "name": ["name", "en"],
+    "prizes": (["prizes"], {"amount": (["amount"], int)}),
+}
+
+RECORDS = [
+    {"year": "1901", "name": {"en": "A"}, "prizes": [{"amount": "10"}]},
+    {"year": "unknown", "name": {}, "prizes": [{"amount": "x"}, {}]},
+    {"prizes": []},
+    {"year": None, "name": {"en": "B"}},
+]
+
+
+def test_counts_add_up_per_field():
+    counts = Counter()
+    plan = compile_config(CONFIG, counts, "laureate")
+    results = [plan(record) for record in RECORDS]
+    assert results == [
+        process_dictionary_with_config(record, CONFIG) for record in RECORDS
+    ]
+
+    totals = Counter()
+    for (field, _), count in counts.items():
+        totals[field] += count
+    n_prizes = sum(len(record.get("prizes", [])) for record in RECORDS)
+    assert totals == {
+        "laureate.year": len(RECORDS),
+        "laureate.name": len(RECORDS),
+        "laureate.prizes": len(RECORDS),
+        "laureate.prizes.amount": n_prizes,
+    }
+    assert counts["laureate.year", "error"] == 1
+    assert counts["laureate.year", "none"] == 2
+    assert counts["laureate.prizes.amount", "error"] == 1
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+import core
+import pipeline
+import report
+from benchmarks import MockLaureatesAPI, make_laureates
+
+
+@pytest.fixture(scope="module")
+def slow_api():
+    # 30 страниц по 20 с задержкой: фетчер может уйти вперед обработки
+    with MockLaureatesAPI(make_laureates(600, seed=3), latency=0.01) as server:
+        yield server
+
+
+def test_matches_load_data_and_run_analyses(api):
+    result = pipeline.run_pipeline(api.url, page_size=40, max_fetches=4)
+    expected = core.load_data(api.url, page_size=40)
+    assert result.laureates == expected
+    assert repr(result.results) == repr(report.run_analyses(expected))
+
+
+def test_order_kept_when_later_pages_answer_first(raw_laureates):
+    latency = lambda offset: 0.1 - offset / 4000  # noqa: E731
+    with MockLaureatesAPI(raw_laureates, latency=latency, max_limit=25) as api:
+        result = pipeline.run_pipeline(api.url, page_size=100, max_fetches=8)
+    expected = [core.get_laureate_data(item) for item in raw_laureates]
+    assert result.laureates == expected
+
+
+def test_selected_analyses_without_records(api):
+    names = list(report.REGISTRY)[:2]
+    result = pipeline.run_pipeline(api.url, 50, names=names, keep=False)
+    assert result.laureates == []
+    assert list(result.results) == names
+
+
+def test_unknown_analysis_rejected(api):
+    with pytest.raises(ValueError):
+        pipeline.run_pipeline(api.url, 50, names=["nope"])
+    assert api.requests_count == 0
+
+
+def test_stage_metrics(api, raw_laureates):
+    result = pipeline.run_pipeline(api.url, page_size=50)
+    metrics = result.metrics
+    assert list(metrics) == ["fetch", "decode", "process", "analyze"]
+    assert metrics["fetch"].items == 5
+    assert metrics["fetch"].nbytes > 0
+    for name in ("decode", "process", "analyze"):
+        assert metrics[name].items == 5
+        assert metrics[name].records == len(raw_laureates)
+        assert metrics[name].throughput() > 0
+    for stage in metrics.values():
+        assert 0 < stage.wall <= result.wall
+        assert stage.busy > 0 and stage.blocked >= 0
+        assert stage.as_dict()["name"] == stage.name
+
+
+def test_backpressure_blocks_fetch(slow_api):
+    def slow_process(laureate):
+        time.sleep(0.002)
+        return core.get_laureate_data(laureate)
+
+    result = pipeline.run_pipeline(
+        slow_api.url, 20, max_fetches=4, queue_size=1, process=slow_process
+    )
+    assert len(result.laureates) == 600
+    # обработка медленнее сети - фетчер ждет места в очереди
+    assert result.metrics["fetch"].blocked > result.metrics["process"].blocked
+
+
+def test_stage_error_cancels_pipeline(slow_api):
+    seen = []
+
+    def failing(laureate):
+        seen.append(laureate)
+        if len(seen) > 30:
+            raise KeyError("broken record")
+        return core.get_laureate_data(laureate)
+
+    before = slow_api.requests_count
+    with pytest.raises(KeyError):
+        pipeline.run_pipeline(
+            slow_api.url, 20, max_fetches=2, queue_size=1, process=failing
+        )
+    # ошибка на второй странице: остальные этапы отменены, фетчер
+    # не выкачал все 30 страниц, и никто не висит на очереди
+    assert slow_api.requests_count - before < 30
+    assert len(seen) == 31
+
+
+def test_fetch_error_propagates(raw_laureates):
+    with MockLaureatesAPI(raw_laureates, errors={100: [404]}) as api:
+        with pytest.raises(requests.HTTPError):
+            pipeline.run_pipeline(api.url, 50, max_fetches=2, backoff=10)
+
+
+def test_runs_inside_event_loop(api, raw_laureates):
+    async def main():
+        return await pipeline.run_pipeline_async(api.url, 100)
+
+    result = asyncio.run(main())
+    assert len(result.laureates) == len(raw_laureates)
+
+
+def test_print_metrics(api, capsys):
+    pipeline.print_metrics(pipeline.run_pipeline(api.url, 100))
+    out = capsys.readouterr().out
+    for name in ("fetch", "decode", "process", "analyze"):
+        assert name in out
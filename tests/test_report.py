@@ -0,0 +1,97 @@
+import pytest
+
+import core
+import report
+from aggregations import RecordAccumulator, accumulate
+
+
+@pytest.fixture(scope="module")
+def laureates(raw_laureates):
+    return [core.get_laureate_data(item) for item in raw_laureates]
+
+
+def test_registry_accumulators_are_complete():
+    for name, analysis in report.REGISTRY.items():
+        assert isinstance(analysis["accumulator"](), RecordAccumulator), name
+
+
+def test_accumulator_without_result_fails_on_creation():
+    class Counting(RecordAccumulator):
+        def add(self, item, prizes):
+            pass
+
+    with pytest.raises(TypeError):
+        Counting()
+
+
+def test_accumulate_feeds_every_accumulator(laureates):
+    class Count(RecordAccumulator):
+        def __init__(self):
+            self.laureates = self.prizes = 0
+
+        def add(self, item, prizes):
+            self.laureates += 1
+            self.prizes += len(prizes)
+
+        def result(self):
+            return self.laureates, self.prizes
+
+    first, second = accumulate(laureates, [Count(), Count()])
+    prizes = sum(len(item.get("prizes_relevant", [])) for item in laureates)
+    assert first == second == (len(laureates), prizes)
+
+
+def test_countries_same_rule_without_migration_fields():
+    import dataset_helpers
+
+    data = [
+        {
+            "id": "1",
+            "type_": "person",
+            "country_birth": "France",
+            "prizes_relevant": [{"category_en": "Physics", "award_year": 1903}],
+        },
+        {
+            "id": "2",
+            "type_": "organization",
+            "country_founded": "Switzerland",
+            "country_now": "Switzerland",
+            "prizes_relevant": [{"category_en": "Peace", "award_year": 1917}],
+        },
+    ]
+    expected = dataset_helpers.count_countries_and_categories(data)
+    assert ("France", 1) in expected["top_countries"]
+    assert report.run_analyses(data, ["countries"])["countries"] == expected
+
+
+def test_single_pass_matches_separate_functions(laureates):
+    import dataset_helpers
+    from aggregations import summarize_laureates
+
+    results = report.run_analyses(laureates)
+    assert results["summary"] == summarize_laureates(laureates)
+    assert results["countries"] == dataset_helpers.count_countries_and_categories(
+        laureates
+    )
+    assert results["refusals"] == dataset_helpers.count_refusals(laureates)
+    assert results["multiple"] == dataset_helpers.count_multiple_laureates(laureates)
+
+
+def test_gender_trends_without_persons():
+    import dataset_helpers
+
+    data = [
+        {
+            "id": "1",
+            "gender": "female",
+            "prizes_relevant": [{"category_en": "Peace", "award_year": 2001}],
+        },
+        {
+            "id": "2",
+            "type_": "organization",
+            "prizes_relevant": [{"category_en": "Peace", "award_year": 2002}],
+        },
+    ]
+    trends = dataset_helpers.count_gender_trends(data)
+    assert trends["total_counts"] == [] and trends["total_recent"] == []
+    assert report.run_analyses(data, ["gender"])["gender"] == trends
@@ -0,0 +1,72 @@
+import importlib
+import sys
+import textwrap
+
+import pytest
+
+import report
+import result_cache
+
+ACCUMULATOR = """
+class CountAccumulator:
+    def __init__(self):
+        self.total = 0
+
+    def add(self, item):
+        self.total += {step}
+"""
+
+ANALYSIS = """
+from result_cache import memoized
+
+
+@memoized
+def count(laureates_data):
+    from cache_accumulator import CountAccumulator
+
+    accumulator = CountAccumulator()
+    for item in laureates_data:
+        accumulator.add(item)
+    return accumulator.total
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """модуль анализа и его накопитель в отдельной папке проекта"""
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def load(step):
+        (tmp_path / "cache_accumulator.py").write_text(
+            textwrap.dedent(ACCUMULATOR.format(step=step))
+        )
+        (tmp_path / "cache_analysis.py").write_text(ANALYSIS)
+        for name in ("cache_accumulator", "cache_analysis"):
+            sys.modules.pop(name, None)
+        importlib.invalidate_caches()
+        return importlib.import_module("cache_analysis")
+
+    yield load
+    for name in ("cache_accumulator", "cache_analysis"):
+        sys.modules.pop(name, None)
+
+
+def test_editing_accumulator_invalidates_entry(project, tmp_path):
+    data = [{"id": str(i)} for i in range(5)]
+    with result_cache.cached(str(tmp_path / "cache")) as cache:
+        assert project(step=1).count(data) == 5
+        assert project(step=1).count(data) == 5
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # правка только накопителя, модуль анализа тот же
+        assert project(step=10).count(data) == 50
+        assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_version_covers_registry_modules():
+    sources = result_cache._project_sources(report.run_analyses.__wrapped__)
+    for analysis in report.REGISTRY.values():
+        assert analysis["accumulator"].__module__ in sources
+    # tables импортируется лениво, внутри функций
+    assert {"report", "aggregations", "dataset_helpers", "tables"} <= set(sources)
+    assert "numpy" not in sources
@@ -0,0 +1,51 @@
+import pytest
+
+import core
+from tables import LaureateTable, _RowView, columns_of
+
+
+def test_rows_read_like_processed_dicts(raw_laureates):
+    data = [core.get_laureate_data(item) for item in raw_laureates]
+    table = LaureateTable.from_records(data)
+    assert len(table) == len(data)
+    assert list(table.iter_records()) == data
+    assert dict(table[3]) == data[3]
+
+
+def test_row_view_without_keys_fails_on_creation(raw_laureates):
+    class BrokenRow(_RowView):
+        __slots__ = ()
+
+    table = LaureateTable.from_records([core.get_laureate_data(raw_laureates[0])])
+    with pytest.raises(TypeError):
+        BrokenRow(table, 0)
+
+
+def test_set_delete_iterate_round_trip(raw_laureates):
+    data = [core.get_laureate_data(item) for item in raw_laureates[:5]]
+    table = LaureateTable.from_records(data)
+    first, second = table[0], table[1]
+    keys = list(first)
+
+    first["migration"] = True
+    second["migration"] = False
+    first["gender"] = "other"
+    assert list(first) == keys + ["migration"]
+    assert first["gender"] == "other"
+    assert table._extra_fields == {"migration", "gender"}
+    genders = columns_of(table, ["gender"])["laureates"]["gender"]
+    assert "other" in genders[1]
+
+    del first["migration"]
+    del first["gender"]
+    assert list(first) == keys and len(first) == len(keys)
+    assert dict(first) == data[0]
+    assert table._extra_fields == {"migration"}
+    with pytest.raises(KeyError):
+        del first["migration"]
+
+    del second["migration"]
+    assert table._extras == {} and table._extra_fields == set()
+    assert list(table.iter_records()) == data
+    genders = columns_of(table, ["gender"])["laureates"]["gender"]
+    assert "other" not in genders[1]
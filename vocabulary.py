@@ -0,0 +1,116 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from lazy import lazy_module
+
+np = lazy_module("numpy")
+
+# категориальные поля: разных значений мало, а повторяются они в каждой
+# записи - при извлечении строки интернируются в словарь поля
+CATEGORICAL_FIELDS = frozenset(
+    {
+        "gender",
+        "country_birth",
+        "country_now",
+        "country_founded",
+        "category_en",
+        "prize_status",
+    }
+)
+
+
+class Vocabulary:
+    """
+    словарь одного категориального поля: значение <-> целый код.
+    код - номер значения в порядке первого появления и со временем
+    не меняется; None (и значения из missing в encode) - код -1.
+
+    интернирование - dict.setdefault на уровне C, поэтому годится для
+    горячего пути извлечения; коды раздаются лениво, при первом запросе
+    """
+
+    __slots__ = ("canonical", "_values", "_codes")
+
+    def __init__(self, values: Iterable[Any] = ()):
+        # значение -> его единственный экземпляр (в порядке появления)
+        self.canonical: Dict[Any, Any] = {}
+        self._values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+        for value in values:
+            self.intern(value)
+
+    def intern(self, value: Any) -> Any:
+        """единственный экземпляр значения (одинаковые строки - один объект)"""
+        if value is None:
+            return None
+        return self.canonical.setdefault(value, value)
+
+    def _sync(self) -> None:
+        # новые значения из canonical получают следующие коды
+        if len(self._values) < len(self.canonical):
+            for value in islice(self.canonical, len(self._values), None):
+                self._codes[value] = len(self._values)
+                self._values.append(value)
+
+    @property
+    def values(self) -> List[Any]:
+        """значения по кодам (обратный словарь): values[code]"""
+        self._sync()
+        return self._values
+
+    def code(self, value: Any) -> int:
+        """код значения (новое значение добавляется), -1 для None"""
+        if value is None:
+            return -1
+        self.intern(value)
+        self._sync()
+        return self._codes[value]
+
+    def value(self, code: int) -> Optional[Any]:
+        """значение по коду, None для -1"""
+        return None if code < 0 else self.values[code]
+
+    def encode(
+        self, values: Sequence[Any], missing: Sequence[Any] = (None,)
+    ) -> "np.ndarray":
+        """
+        коды значений массивом NumPy (как aggregations.encode, но коды
+        общие для всех вызовов); значения из missing - код -1
+        """
+        values = values if isinstance(values, list) else list(values)
+        setdefault = self.canonical.setdefault
+        for value in dict.fromkeys(values):
+            if value not in missing:
+                setdefault(value, value)
+        self._sync()
+        # словарь поля маленький - копия с пропусками дешевле проверок
+        # на каждое значение, а map с __getitem__ идет на уровне C
+        lookup = dict(self._codes)
+        lookup.update(dict.fromkeys(missing, -1))
+        return np.fromiter(map(lookup.__getitem__, values), np.int64, len(values))
+
+    def decode(self, codes: Iterable[int]) -> List[Optional[Any]]:
+        """значения по кодам, None для -1"""
+        values = self.values
+        return [None if code < 0 else values[code] for code in codes]
+
+    def __len__(self) -> int:
+        return len(self.canonical)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self.canonical
+
+    def __repr__(self) -> str:
+        return f"Vocabulary({len(self)} значений)"
+
+
+# словари полей процесса: имя поля -> Vocabulary (см. vocabulary)
+VOCABULARIES: Dict[str, Vocabulary] = {}
+
+
+def vocabulary(field: str) -> Vocabulary:
+    """общий словарь поля field (создается при первом обращении)"""
+    vocab = VOCABULARIES.get(field)
+    if vocab is None:
+        vocab = VOCABULARIES[field] = Vocabulary()
+    return vocab